@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark de carga de la tabla ventas: to_sql (ruta anterior) vs carga masiva.
+
+Uso:
+    python benchmarks/bench_bulk_load.py [filas]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+# Agregar el directorio del proyecto al path para poder importar el paquete src
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.database import DatabaseManager
+
+
+def generar_ventas(filas, seed=42):
+    """Genera un DataFrame sintético de ventas limpias"""
+    rng = np.random.default_rng(seed)
+    productos = np.array([f"Producto{i:03d}" for i in range(200)])
+    df = pd.DataFrame({
+        'fecha': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 1460, filas), unit='D'),
+        'producto': productos[rng.integers(0, len(productos), filas)],
+        'cantidad': rng.integers(1, 20, filas),
+        'precio_unitario': rng.integers(100, 100000, filas) / 100,
+    })
+    df['total'] = df['cantidad'] * df['precio_unitario']
+    return df
+
+
+def cargar_con_to_sql(db, df):
+    """Ruta anterior: DELETE + to_sql con los PRAGMAs por defecto"""
+    with db.get_connection() as conn:
+        conn.execute("DELETE FROM ventas")
+        df.to_sql('ventas', conn, if_exists='append', index=False)
+
+
+def medir(nombre, funcion):
+    inicio = time.perf_counter()
+    funcion()
+    duracion = time.perf_counter() - inicio
+    print(f"{nombre:<22} {duracion:8.2f} s")
+    return duracion
+
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    df = generar_ventas(filas)
+    print(f"Cargando {filas:,} filas en la tabla ventas\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_to_sql = DatabaseManager(os.path.join(tmp, "to_sql.db"))
+        db_bulk = DatabaseManager(os.path.join(tmp, "bulk.db"))
+
+        t_to_sql = medir("to_sql", lambda: cargar_con_to_sql(db_to_sql, df))
+        t_bulk = medir("bulk_insert_ventas", lambda: db_bulk.bulk_insert_ventas(df, replace=True))
+
+    print(f"\nAceleración: {t_to_sql / t_bulk:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Benchmark del agregado producto × mes de SalesAnalyzer: serial vs procesos.
+
+Uso:
+    python benchmarks/bench_parallel_aggregation.py [filas] [n_jobs]
+"""
+
+import os
+import sys
+import time
+
+# Agregar el directorio del proyecto al path para poder importar el paquete src
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.bench_bulk_load import generar_ventas
+from src.analyzer import SalesAnalyzer
+
+
+def medir(nombre, analyzer):
+    inicio = time.perf_counter()
+    analyzer.get_resumen_completo()
+    duracion = time.perf_counter() - inicio
+    print(f"{nombre:<22} {duracion:8.2f} s")
+    return duracion
+
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    n_jobs = int(sys.argv[2]) if len(sys.argv) > 2 else -1
+    df = generar_ventas(filas)
+    df['producto'] = df['producto'].astype('category')
+    print(f"Agregando {filas:,} filas (n_jobs={n_jobs}, núcleos={os.cpu_count()})\n")
+
+    t_serial = medir("serial", SalesAnalyzer(df))
+    t_paralelo = medir("paralelo", SalesAnalyzer(df, n_jobs=n_jobs, parallel_min_rows=0))
+
+    print(f"\nAceleración: {t_serial / t_paralelo:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
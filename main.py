@@ -4,21 +4,22 @@ import os
 import sys
 from src.data_processor import DataProcessor
 from src.analyzer import SalesAnalyzer
-from src.database import DatabaseManager
+from src.database import get_database
 
 def main():
     """Script principal para análisis de ventas"""
     
     # Configuración de rutas
     input_file = "data/raw/ventas.csv"
-    clean_file = "data/processed/ventas_clean.csv"
+    clean_file = "data/processed/ventas_clean.feather"
+    rejected_file = "data/processed/ventas_rechazadas.csv"
     
     print("=== ANÁLISIS DE VENTAS ===")
     
     try:
         # 1. Carga y limpieza de datos
         print("\n1. Cargando y limpiando datos...")
-        processor = DataProcessor()
+        processor = DataProcessor(quarantine_path=rejected_file)
         
         if not os.path.exists(input_file):
             print(f"Error: Archivo {input_file} no encontrado")
@@ -28,11 +29,14 @@ def main():
         # Crear directorio si no existe
         os.makedirs("data/processed", exist_ok=True)
         
-        # Procesar datos
-        processor.load_data(input_file)
-        processor.clean_data()
-        processor.calculate_totals()
-        processor.save_clean_data(clean_file)
+        # Procesar datos (reutiliza la caché si ventas.csv no cambió)
+        if processor.load_cache(clean_file, input_file) is not None:
+            print(f"Usando caché de datos limpios: {clean_file}")
+        else:
+            processor.load_data(input_file)
+            processor.clean_data()
+            processor.calculate_totals()
+            processor.save_cache(clean_file, input_file)
         
         df_clean = processor.get_clean_data()
         print(f"Datos procesados: {len(df_clean)} filas válidas")
@@ -55,7 +59,7 @@ def main():
         
         # 3. Guardar en base de datos
         print("\n3. Guardando en base de datos...")
-        db = DatabaseManager()
+        db = get_database()
         db.insert_ventas_data(df_clean)
         db.save_analysis_results(results)
         
@@ -1,48 +1,72 @@
 -- Consultas SQL para análisis de ventas
+-- mes y dia_semana son columnas generadas de ventas con índices propios
+--
+-- Cada consulta lleva una etiqueta "-- name:" y parámetros con nombre que
+-- src/queries.py enlaza al ejecutarla. Un filtro "(:param IS NULL OR ...)"
+-- se quita del SQL si el parámetro no se indica, para que SQLite siga usando
+-- los índices de cobertura y las búsquedas por rango de fecha:
+--   :desde / :hasta  rango de fechas, desde <= fecha < hasta
+--   :producto        un solo producto
+--   :limit           número de filas (cada consulta tiene su valor por defecto)
 
+-- name: top_productos_cantidad
 -- 1. Top 3 productos más vendidos por cantidad
-SELECT 
+SELECT
     producto,
     SUM(cantidad) as cantidad_total
 FROM ventas
+WHERE (:desde IS NULL OR fecha >= :desde)
+  AND (:hasta IS NULL OR fecha < :hasta)
 GROUP BY producto
-ORDER BY cantidad_total DESC
-LIMIT 3;
+ORDER BY cantidad_total DESC, producto
+LIMIT COALESCE(:limit, 3);
 
+-- name: top_productos_facturacion
 -- 2. Top 3 productos por facturación
-SELECT 
+SELECT
     producto,
     SUM(total) as facturacion_total,
     ROUND(SUM(total), 2) as facturacion_formateada
 FROM ventas
+WHERE (:desde IS NULL OR fecha >= :desde)
+  AND (:hasta IS NULL OR fecha < :hasta)
 GROUP BY producto
-ORDER BY facturacion_total DESC
-LIMIT 3;
+ORDER BY facturacion_total DESC, producto
+LIMIT COALESCE(:limit, 3);
 
+-- name: facturacion_mensual
 -- 3. Facturación mensual
-SELECT 
-    strftime('%Y-%m', fecha) as mes,
+SELECT
+    mes,
     SUM(total) as facturacion_total,
     COUNT(*) as numero_ventas,
     ROUND(AVG(total), 2) as venta_promedio
 FROM ventas
-GROUP BY strftime('%Y-%m', fecha)
+WHERE (:desde IS NULL OR fecha >= :desde)
+  AND (:hasta IS NULL OR fecha < :hasta)
+  AND (:producto IS NULL OR producto = :producto)
+GROUP BY mes
 ORDER BY mes;
 
+-- name: resumen_productos
 -- 4. Resumen por producto (cantidad, facturación, precio promedio)
-SELECT 
+SELECT
     producto,
     SUM(cantidad) as cantidad_total,
     SUM(total) as facturacion_total,
     ROUND(AVG(precio_unitario), 2) as precio_promedio,
     COUNT(*) as numero_transacciones
 FROM ventas
+WHERE (:desde IS NULL OR fecha >= :desde)
+  AND (:hasta IS NULL OR fecha < :hasta)
+  AND (:producto IS NULL OR producto = :producto)
 GROUP BY producto
 ORDER BY facturacion_total DESC;
 
+-- name: ventas_dia_semana
 -- 5. Ventas por día de la semana
-SELECT 
-    CASE strftime('%w', fecha)
+SELECT
+    CASE dia_semana
         WHEN '0' THEN 'Domingo'
         WHEN '1' THEN 'Lunes'
         WHEN '2' THEN 'Martes'
@@ -54,48 +78,66 @@ SELECT
     SUM(total) as facturacion_total,
     COUNT(*) as numero_ventas
 FROM ventas
-GROUP BY strftime('%w', fecha)
+WHERE (:desde IS NULL OR fecha >= :desde)
+  AND (:hasta IS NULL OR fecha < :hasta)
+  AND (:producto IS NULL OR producto = :producto)
+GROUP BY dia_semana
 ORDER BY facturacion_total DESC;
 
+-- name: ventas_sobre_promedio
 -- 6. Productos con ventas por encima del promedio
-WITH promedio_ventas AS (
-    SELECT AVG(total) as venta_promedio
+WITH ventas_filtradas AS (
+    SELECT producto, total
     FROM ventas
+    WHERE (:desde IS NULL OR fecha >= :desde)
+      AND (:hasta IS NULL OR fecha < :hasta)
+      AND (:producto IS NULL OR producto = :producto)
+),
+promedio_ventas AS (
+    SELECT AVG(total) as venta_promedio
+    FROM ventas_filtradas
 )
-SELECT 
+SELECT
     v.producto,
     v.total,
     p.venta_promedio,
     ROUND(v.total - p.venta_promedio, 2) as diferencia_promedio
-FROM ventas v
+FROM ventas_filtradas v
 CROSS JOIN promedio_ventas p
 WHERE v.total > p.venta_promedio
-ORDER BY v.total DESC;
+ORDER BY v.total DESC
+LIMIT COALESCE(:limit, -1);
 
+-- name: crecimiento_mensual
 -- 7. Análisis de crecimiento mensual
 WITH ventas_mensuales AS (
-    SELECT 
-        strftime('%Y-%m', fecha) as mes,
+    SELECT
+        mes,
         SUM(total) as facturacion_total
     FROM ventas
-    GROUP BY strftime('%Y-%m', fecha)
+    WHERE (:desde IS NULL OR fecha >= :desde)
+      AND (:hasta IS NULL OR fecha < :hasta)
+      AND (:producto IS NULL OR producto = :producto)
+    GROUP BY mes
     ORDER BY mes
 )
-SELECT 
+SELECT
     mes,
     facturacion_total,
     LAG(facturacion_total) OVER (ORDER BY mes) as facturacion_anterior,
     ROUND(
-        (facturacion_total - LAG(facturacion_total) OVER (ORDER BY mes)) / 
+        (facturacion_total - LAG(facturacion_total) OVER (ORDER BY mes)) /
         LAG(facturacion_total) OVER (ORDER BY mes) * 100, 2
     ) as crecimiento_porcentual
 FROM ventas_mensuales;
 
+-- name: resultados_guardados
 -- 8. Resultados guardados del análisis
-SELECT 
+SELECT
     tipo_analisis,
     resultado,
     valor,
     fecha_calculo
 FROM analisis_resultados
-ORDER BY fecha_calculo DESC;
\ No newline at end of file
+ORDER BY fecha_calculo DESC
+LIMIT COALESCE(:limit, -1);
@@ -1,10 +1,16 @@
 """
 Paquete de análisis de ventas.
 """
-# Solo importar las clases principales, no el visualizer automáticamente
-from .data_processor import DataProcessor
-from .analyzer import SalesAnalyzer
-from .database import DatabaseManager
+import importlib
+
+# Las clases principales se importan al usarlas por primera vez (PEP 562):
+# "import src.gui..." no carga pandas ni el resto del paquete, y el visualizer
+# (matplotlib/seaborn) nunca se importa automáticamente
+_EXPORTS = {
+    "DataProcessor": ".data_processor",
+    "SalesAnalyzer": ".analyzer",
+    "DatabaseManager": ".database",
+}
 
 __version__ = "1.0.0"
 __author__ = "Sales Analytics Team"
@@ -14,3 +20,15 @@ __all__ = [
     "SalesAnalyzer", 
     "DatabaseManager",
 ]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
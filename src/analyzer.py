@@ -1,13 +1,210 @@
 import pandas as pd
+import numpy as np
+import json
+import os
+from collections import OrderedDict
+from .parallel import PARALLEL_MIN_ROWS, parallel_cubo, resolve_n_jobs
+
+# Claves del agregado base; cualquier otra agrupación se deriva de él
+CLAVES_CUBO = ('producto', 'año_mes')
+
+# Frecuencias de serie temporal soportadas: diaria, semanal (semanas de lunes
+# a domingo, etiquetadas por el domingo como resample('W')) y mensual
+FRECUENCIAS = ('D', 'W', 'M')
+
+# Versión del formato JSON de IncrementalSalesAnalyzer.save
+ESTADO_VERSION = 1
+
+# Columnas que leen los agregados; su contenido forma parte de la huella de la caché
+COLUMNAS_HUELLA = ('fecha', 'producto', 'cantidad', 'total')
+
+
+def _checksum_columna(serie):
+    """Suma ponderada por posición de los valores de una columna (módulo 2**64)
+    
+    Detecta ediciones in-place e intercambios de filas; en columnas NumPy
+    cuesta unos pocos milisegundos por millón de filas. Otros tipos (texto,
+    nulables) usan pd.util.hash_pandas_object, más lento.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        valores = serie.cat.codes.to_numpy()
+    elif isinstance(serie.dtype, np.dtype) and serie.dtype.kind in 'biufmM':
+        valores = serie.to_numpy()
+    else:
+        valores = pd.util.hash_pandas_object(serie, index=False).to_numpy()
+    valores = valores.view(np.uint64) if valores.itemsize == 8 else valores.astype(np.uint64)
+    pesos = np.arange(1, len(valores) + 1, dtype=np.uint64)
+    return int(np.dot(valores, pesos))
+
 
 class SalesAnalyzer:
     
-    def __init__(self, df):
+    def __init__(self, df, cache_size=32, n_jobs=None, parallel_min_rows=PARALLEL_MIN_ROWS,
+                 verificar_contenido=False):
+        """cache_size: máximo de agregados memoizados (se descartan los menos usados).
+        n_jobs: procesos para agregar DataFrames de al menos parallel_min_rows
+        filas (None o 1 = serial, -1 = todos los núcleos).
+        verificar_contenido: incluir en la huella una suma de control de
+        COLUMNAS_HUELLA para detectar ediciones in-place (recorre las
+        columnas en cada verificación). Por defecto la huella es O(1) y tras
+        editar valores in-place hay que llamar a invalidate().
+        """
+        self._cache = OrderedDict()
+        self._memo_depth = 0
+        self.verificar_contenido = verificar_contenido
+        self.cache_size = cache_size
+        self.n_jobs = resolve_n_jobs(n_jobs)
+        self.parallel_min_rows = parallel_min_rows
+        self.cache_hits = 0
+        self.cache_misses = 0
         self.df = df
     
+    @property
+    def df(self):
+        return self._df
+    
+    @df.setter
+    def df(self, df):
+        """Reemplazar el DataFrame invalida los agregados memoizados"""
+        self._df = df
+        self.invalidate()
+    
+    def invalidate(self):
+        """Descarta los agregados memoizados
+        
+        Se llama automáticamente al reasignar df o al cambiar su forma,
+        columnas, tipos o (con verificar_contenido) valores; sin
+        verificar_contenido hay que llamarlo tras editar valores in-place.
+        """
+        self._cache.clear()
+        self._fingerprint = self._df_fingerprint()
+    
+    def cache_info(self):
+        """Estadísticas de la caché de agregados"""
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'size': len(self._cache),
+            'max_size': self.cache_size
+        }
+    
+    def _df_fingerprint(self):
+        """Huella del DataFrame: identidad, forma, columnas, tipos y suma de control"""
+        df = self._df
+        huella = (id(df), df.shape, tuple(df.columns), tuple(map(str, df.dtypes)))
+        if self.verificar_contenido:
+            huella += tuple(_checksum_columna(df[c]) for c in COLUMNAS_HUELLA if c in df.columns)
+        return huella
+    
+    def _verificar_huella(self):
+        """Invalida la caché si la huella del DataFrame cambió"""
+        if self._df_fingerprint() != self._fingerprint:
+            self.invalidate()
+    
+    def _memo(self, key, compute):
+        """Retorna el valor memoizado para key o lo calcula (caché LRU)
+        
+        La huella se verifica solo en la llamada externa, no en los
+        agregados intermedios que esta calcula.
+        """
+        if self._memo_depth == 0:
+            self._verificar_huella()
+        
+        if key in self._cache:
+            self.cache_hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        
+        self.cache_misses += 1
+        self._memo_depth += 1
+        try:
+            value = compute()
+        finally:
+            self._memo_depth -= 1
+        self._cache[key] = value
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return value
+    
+    @staticmethod
+    def _normalizar_filtro(filtro):
+        """Convierte (desde, hasta) en Timestamps hashables; None = sin filtro"""
+        if filtro is None:
+            return None
+        desde, hasta = filtro
+        return (
+            pd.Timestamp(desde) if desde is not None else None,
+            pd.Timestamp(hasta) if hasta is not None else None
+        )
+    
+    def _get_cubo(self, filtro=None):
+        """Agregado producto × mes calculado en una sola pasada sobre el DataFrame
+        
+        Guarda cantidad, total y número de ventas por (producto, año_mes); el
+        resto de los análisis se derivan de este agregado, que es mucho más
+        chico que el DataFrame original. Conserva los grupos con producto o
+        mes nulo para que los totales por producto incluyan las ventas sin
+        fecha (y los mensuales las ventas sin producto), como un groupby
+        sobre cada columna.
+        """
+        filtro = self._normalizar_filtro(filtro)
+        return self._memo((CLAVES_CUBO, None, filtro), lambda: self._calcular_cubo(filtro))
+    
+    def _mascara_filtro(self, filtro):
+        """Máscara de filas con desde <= fecha < hasta (None si no hay filtro)"""
+        if filtro is None:
+            return None
+        desde, hasta = filtro
+        mask = pd.Series(True, index=self.df.index)
+        if desde is not None:
+            mask &= self.df['fecha'] >= desde
+        if hasta is not None:
+            mask &= self.df['fecha'] < hasta
+        return mask
+    
+    def _calcular_cubo(self, filtro):
+        """Calcula el agregado producto × mes (opcionalmente en un rango de fechas)"""
+        df = self.df
+        mask = self._mascara_filtro(filtro)
+        if mask is not None:
+            df = df[mask]
+        
+        if self.n_jobs > 1 and len(df) >= max(self.parallel_min_rows, 1):
+            return parallel_cubo(df, self.n_jobs)
+        
+        # Clave de mes como Series aparte: no se copia el DataFrame
+        meses = df['fecha'].dt.to_period('M').rename('año_mes')
+        return df.groupby(['producto', meses], observed=True, dropna=False).agg(
+            cantidad=('cantidad', 'sum'),
+            total=('total', 'sum'),
+            ventas=('total', 'size')
+        )
+    
+    def agregar(self, claves, medida, filtro=None):
+        """Agregado memoizado de una medida por claves de agrupación
+        
+        claves: subconjunto de ('producto', 'año_mes').
+        medida: 'cantidad', 'total' o 'ventas' (número de transacciones).
+        filtro: None o (desde, hasta) sobre fecha, con desde <= fecha < hasta.
+        """
+        claves = (claves,) if isinstance(claves, str) else tuple(claves)
+        filtro = self._normalizar_filtro(filtro)
+        
+        def compute():
+            cubo = self._get_cubo(filtro)
+            if claves == CLAVES_CUBO:
+                # Como groupby: sin los grupos con alguna clave nula
+                nulas = np.zeros(len(cubo), dtype=bool)
+                for nivel in range(cubo.index.nlevels):
+                    nulas |= cubo.index.get_level_values(nivel).isna()
+                return cubo[medida][~nulas] if nulas.any() else cubo[medida]
+            return cubo[medida].groupby(level=list(claves), observed=True).sum()
+        
+        return self._memo((claves, medida, filtro), compute)
+    
     def producto_mas_vendido(self):
         """Calcula el producto más vendido por cantidad"""
-        ventas_por_producto = self.df.groupby('producto')['cantidad'].sum()
+        ventas_por_producto = self.agregar('producto', 'cantidad')
         producto_top = ventas_por_producto.idxmax()
         cantidad_top = ventas_por_producto.max()
         
@@ -18,7 +215,7 @@ class SalesAnalyzer:
     
     def producto_mayor_facturacion(self):
         """Calcula el producto con mayor facturación total"""
-        facturacion_por_producto = self.df.groupby('producto')['total'].sum()
+        facturacion_por_producto = self.agregar('producto', 'total')
         producto_top = facturacion_por_producto.idxmax()
         facturacion_top = facturacion_por_producto.max()
         
@@ -29,23 +226,229 @@ class SalesAnalyzer:
     
     def facturacion_por_mes(self):
         """Calcula la facturación total por mes"""
-        # Trabajar con copia para no modificar el DataFrame original
-        df_temp = self.df.copy()
-        df_temp['año_mes'] = df_temp['fecha'].dt.to_period('M')
-        facturacion_mensual = df_temp.groupby('año_mes')['total'].sum()
+        facturacion_mensual = self.agregar('año_mes', 'total')
         
         return facturacion_mensual.to_dict()
     
     def get_top_productos_cantidad(self, top_n=3):
         """Obtiene los top N productos por cantidad"""
-        ventas_por_producto = self.df.groupby('producto')['cantidad'].sum()
+        ventas_por_producto = self.agregar('producto', 'cantidad')
         return ventas_por_producto.nlargest(top_n).to_dict()
     
     def get_top_productos_facturacion(self, top_n=3):
         """Obtiene los top N productos por facturación"""
-        facturacion_por_producto = self.df.groupby('producto')['total'].sum()
+        facturacion_por_producto = self.agregar('producto', 'total')
         return facturacion_por_producto.nlargest(top_n).to_dict()
     
+    def serie_temporal(self, frecuencia='M', medida='total', filtro=None):
+        """Serie de una medida por día, semana o mes, con ceros en periodos sin ventas
+        
+        Se calcula con np.bincount sobre los códigos de periodo de la columna
+        fecha, sin ordenar ni copiar el DataFrame. El índice es un PeriodIndex
+        para 'M' (como facturacion_por_mes) y un DatetimeIndex para 'D' y 'W'.
+        Las filas sin fecha se omiten y los valores nulos suman cero.
+        """
+        if frecuencia not in FRECUENCIAS:
+            raise ValueError(f"Frecuencia no soportada: {frecuencia} (usar {', '.join(FRECUENCIAS)})")
+        filtro = self._normalizar_filtro(filtro)
+        return self._memo(
+            (('fecha', frecuencia), medida, filtro),
+            lambda: self._calcular_serie(frecuencia, medida, filtro)
+        )
+    
+    def _calcular_serie(self, frecuencia, medida, filtro):
+        """Suma la medida por código de periodo (días, semanas o meses desde 1970)"""
+        fechas = self.df['fecha'].to_numpy()
+        valores = None if medida == 'ventas' else self.df[medida].to_numpy(dtype=np.float64, na_value=0.0)
+        mask = self._mascara_filtro(filtro)
+        mask = np.ones(len(fechas), dtype=bool) if mask is None else mask.to_numpy()
+        # Sin fecha no hay periodo: se omiten, como en el groupby de facturacion_por_mes
+        mask &= ~np.isnat(fechas)
+        if not mask.all():
+            fechas = fechas[mask]
+            valores = None if valores is None else valores[mask]
+        if len(fechas) == 0:
+            return pd.Series(dtype=np.float64, name=medida)
+        
+        if frecuencia == 'M':
+            codigos = fechas.astype('datetime64[M]').astype(np.int64)
+        else:
+            codigos = fechas.astype('datetime64[D]').astype(np.int64)
+            if frecuencia == 'W':
+                # 1970-01-01 fue jueves: +3 agrupa de lunes a domingo
+                codigos = (codigos + 3) // 7
+        
+        inicio = codigos.min()
+        sumas = np.bincount(codigos - inicio, weights=valores)
+        ordinales = np.arange(inicio, inicio + len(sumas))
+        
+        if frecuencia == 'M':
+            index = pd.PeriodIndex.from_ordinals(ordinales, freq='M')
+        else:
+            dias = ordinales * 7 + 3 if frecuencia == 'W' else ordinales
+            index = pd.DatetimeIndex(dias.astype('datetime64[D]').astype(fechas.dtype))
+        return pd.Series(sumas, index=index.rename('fecha'), name=medida)
+    
+    def suma_movil(self, ventana, frecuencia='D', medida='total'):
+        """Suma móvil de `ventana` periodos (NaN hasta completar la primera ventana)"""
+        return self.serie_temporal(frecuencia, medida).rolling(ventana).sum()
+    
+    def media_movil(self, ventana, frecuencia='D', medida='total'):
+        """Media móvil de `ventana` periodos (NaN hasta completar la primera ventana)"""
+        return self.serie_temporal(frecuencia, medida).rolling(ventana).mean()
+    
+    def acumulado(self, frecuencia='M', medida='total'):
+        """Total acumulado por periodo"""
+        return self.serie_temporal(frecuencia, medida).cumsum()
+    
+    def crecimiento_mensual(self, medida='total'):
+        """Crecimiento porcentual respecto del mes calendario anterior
+        
+        Coincide con la consulta 7 de queries.sql solo si no hay meses sin
+        ventas: aquí un mes sin ventas vale 0 (crecimiento -100 % y NaN en
+        el mes siguiente), mientras que LAG en SQL compara con el último mes
+        que tuvo ventas.
+        """
+        return self._crecimiento(medida, periodos=1)
+    
+    def crecimiento_interanual(self, medida='total'):
+        """Crecimiento porcentual respecto del mismo mes del año anterior"""
+        return self._crecimiento(medida, periodos=12)
+    
+    def _crecimiento(self, medida, periodos):
+        """Valor, valor de `periodos` meses antes y variación porcentual por mes"""
+        serie = self.serie_temporal('M', medida)
+        anterior = serie.shift(periodos)
+        crecimiento = (serie - anterior) / anterior * 100
+        return pd.DataFrame({
+            medida: serie,
+            'anterior': anterior,
+            # Sin base de comparación (mes anterior en cero) no hay porcentaje
+            'crecimiento_porcentual': crecimiento.replace([np.inf, -np.inf], np.nan)
+        })
+    
+    def get_resumen_completo(self):
+        """Genera resumen completo de análisis (una sola pasada sobre los datos)"""
+        # La huella se verifica una vez para los cinco análisis
+        self._verificar_huella()
+        self._memo_depth += 1
+        try:
+            return {
+                'producto_mas_vendido': self.producto_mas_vendido(),
+                'producto_mayor_facturacion': self.producto_mayor_facturacion(),
+                'facturacion_mensual': self.facturacion_por_mes(),
+                'top_3_cantidad': self.get_top_productos_cantidad(),
+                'top_3_facturacion': self.get_top_productos_facturacion()
+            }
+        finally:
+            self._memo_depth -= 1
+
+
+class IncrementalSalesAnalyzer:
+    """Analizador que se actualiza con lotes de ventas sin guardar el histórico
+    
+    Mantiene sumas y conteos por producto y por mes; cada lote se agrega
+    en O(lote) y el estado puede guardarse en JSON y retomarse después.
+    Ofrece los mismos métodos de consulta que SalesAnalyzer.
+    """
+    
+    MEDIDAS = ('cantidad', 'total', 'ventas')
+    
+    def __init__(self):
+        self.por_producto = {}
+        self.por_mes = {}
+        self.filas_procesadas = 0
+    
+    def update(self, df):
+        """Incorpora un lote limpio (con columna total); sirve como consumidor de process_in_chunks"""
+        if len(df) == 0:
+            return self
+        
+        meses = df['fecha'].dt.to_period('M').rename('año_mes')
+        self._acumular(self.por_producto, df.groupby('producto', observed=True))
+        self._acumular(self.por_mes, df.groupby(meses))
+        self.filas_procesadas += len(df)
+        return self
+    
+    def _acumular(self, destino, grupos):
+        """Suma los agregados de un lote a los acumulados existentes"""
+        lote = grupos.agg(
+            cantidad=('cantidad', 'sum'),
+            total=('total', 'sum'),
+            ventas=('total', 'size')
+        )
+        for clave, cantidad, total, ventas in lote.itertuples(name=None):
+            acumulado = destino.setdefault(clave, {'cantidad': 0, 'total': 0.0, 'ventas': 0})
+            acumulado['cantidad'] += int(cantidad)
+            acumulado['total'] += float(total)
+            acumulado['ventas'] += int(ventas)
+    
+    @classmethod
+    def from_chunks(cls, chunks):
+        """Construye el analizador a partir de un iterable de lotes (p. ej. iter_clean_chunks)"""
+        analyzer = cls()
+        for chunk in chunks:
+            analyzer.update(chunk)
+        return analyzer
+    
+    @staticmethod
+    def _ordenar(acumulados, medida):
+        """Pares (clave, valor) de mayor a menor; empates por clave ascendente"""
+        return sorted(
+            ((clave, valores[medida]) for clave, valores in acumulados.items()),
+            key=lambda par: (-par[1], par[0])
+        )
+    
+    def _top(self, medida, top_n):
+        """Top N productos según una medida acumulada"""
+        if not self.por_producto:
+            raise ValueError("No hay datos procesados")
+        return self._ordenar(self.por_producto, medida)[:top_n]
+    
+    def producto_mas_vendido(self):
+        """Calcula el producto más vendido por cantidad"""
+        producto_top, cantidad_top = self._top('cantidad', 1)[0]
+        
+        return {
+            'producto': producto_top,
+            'cantidad_total': cantidad_top
+        }
+    
+    def producto_mayor_facturacion(self):
+        """Calcula el producto con mayor facturación total"""
+        producto_top, facturacion_top = self._top('total', 1)[0]
+        
+        return {
+            'producto': producto_top,
+            'facturacion_total': facturacion_top
+        }
+    
+    def facturacion_por_mes(self):
+        """Calcula la facturación total por mes"""
+        return {mes: valores['total'] for mes, valores in sorted(self.por_mes.items())}
+    
+    def get_top_productos_cantidad(self, top_n=3):
+        """Obtiene los top N productos por cantidad"""
+        return dict(self._top('cantidad', top_n))
+    
+    def get_top_productos_facturacion(self, top_n=3):
+        """Obtiene los top N productos por facturación"""
+        return dict(self._top('total', top_n))
+    
+    def ticket_promedio_por_producto(self):
+        """Facturación media por venta de cada producto"""
+        return {
+            producto: valores['total'] / valores['ventas']
+            for producto, valores in sorted(self.por_producto.items())
+        }
+    
+    def ticket_promedio_por_mes(self):
+        """Facturación media por venta de cada mes"""
+        return {
+            mes: valores['total'] / valores['ventas']
+            for mes, valores in sorted(self.por_mes.items())
+        }
+    
     def get_resumen_completo(self):
         """Genera resumen completo de análisis"""
         return {
@@ -54,4 +457,37 @@ class SalesAnalyzer:
             'facturacion_mensual': self.facturacion_por_mes(),
             'top_3_cantidad': self.get_top_productos_cantidad(),
             'top_3_facturacion': self.get_top_productos_facturacion()
-        }
\ No newline at end of file
+        }
+    
+    def save(self, path):
+        """Guarda el estado acumulado en JSON (escritura atómica)"""
+        estado = {
+            'version': ESTADO_VERSION,
+            'filas_procesadas': self.filas_procesadas,
+            'por_producto': self.por_producto,
+            'por_mes': {str(mes): valores for mes, valores in self.por_mes.items()}
+        }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(estado, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path):
+        """Restaura un analizador guardado con save"""
+        with open(path, encoding='utf-8') as f:
+            estado = json.load(f)
+        if estado.get('version') != ESTADO_VERSION:
+            raise ValueError(f"Versión de estado no soportada: {estado.get('version')}")
+        
+        analyzer = cls()
+        analyzer.filas_procesadas = estado['filas_procesadas']
+        analyzer.por_producto = estado['por_producto']
+        analyzer.por_mes = {
+            pd.Period(mes, freq='M'): valores for mes, valores in estado['por_mes'].items()
+        }
+        return analyzer
@@ -1,49 +1,185 @@
 import pandas as pd
 import numpy as np
+import json
+import os
 from datetime import datetime
+from .validation import REGLAS_POR_DEFECTO, VALIDA, QuarantineWriter
+
+# Filas por bloque en la lectura por streaming
+DEFAULT_CHUNKSIZE = 100_000
+
+# Esquema declarado del CSV de ventas (fecha,producto,cantidad,precio_unitario).
+# cantidad se lee como entero con nulos (admite negativos que la limpieza
+# descarta) y se compacta a entero sin signo al terminar la limpieza.
+VENTAS_DTYPES = {
+    'producto': 'category',
+    'cantidad': 'Int32',
+    'precio_unitario': 'float64',
+}
+# ISO 8601 acepta '2024-01-05' y '2024-01-05 10:30:00' en la misma columna;
+# los valores que no cumplen se reintentan con el parser flexible
+FECHA_FORMAT = 'ISO8601'
+
+# Clave de metadatos donde la caché Arrow guarda la firma del CSV de origen,
+# del esquema de lectura, de las reglas y del archivo de cuarentena
+CACHE_SOURCE_KEY = b'ventas_source'
+# Clave de metadatos con las filas rechazadas por regla al generar la caché
+CACHE_REJECTIONS_KEY = b'ventas_rechazos'
 
 class DataProcessor:
     
-    def __init__(self):
+    def __init__(self, reglas=None, quarantine_path=None):
+        """reglas: RuleSet de src.validation (por defecto la limpieza histórica).
+        quarantine_path: CSV donde se escriben las filas rechazadas con su motivo.
+        """
         self.df = None
+        self.reglas = reglas if reglas is not None else REGLAS_POR_DEFECTO
+        self.quarantine_path = quarantine_path
+        self.rejection_counts = {}
+        # Esquema usado por load_data; forma parte de la firma de la caché
+        self.read_options = None
     
-    def load_data(self, file_path):
-        """Carga datos desde archivo CSV"""
+    def load_data(self, file_path, dtypes=VENTAS_DTYPES, fecha_format=FECHA_FORMAT):
+        """Carga datos desde archivo CSV usando el esquema declarado
+        
+        Con dtypes=None y fecha_format=None se vuelve a la inferencia de pandas.
+        """
         try:
-            self.df = pd.read_csv(file_path)
+            self.df = pd.read_csv(file_path, dtype=dtypes)
+            self.df = self._parse_fecha(self.df, fecha_format)
+            self.read_options = {'dtypes': dtypes, 'fecha_format': fecha_format}
             return self.df
         except FileNotFoundError:
             raise FileNotFoundError(f"Archivo no encontrado: {file_path}")
         except Exception as e:
             raise Exception(f"Error al cargar datos: {str(e)}")
     
+    def iter_clean_chunks(self, file_path, chunksize=DEFAULT_CHUNKSIZE,
+                          dtypes=VENTAS_DTYPES, fecha_format=FECHA_FORMAT):
+        """Lee el CSV por bloques y entrega cada bloque limpio y con totales.
+        
+        La memoria máxima queda acotada por chunksize y no por el tamaño
+        del archivo; self.df nunca contiene el archivo completo. Los bloques
+        que quedan vacíos tras la limpieza se omiten.
+        """
+        try:
+            reader = pd.read_csv(file_path, chunksize=chunksize, dtype=dtypes)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Archivo no encontrado: {file_path}")
+        except Exception as e:
+            raise Exception(f"Error al cargar datos: {str(e)}")
+        
+        initial_rows = 0
+        final_rows = 0
+        self.rejection_counts = dict.fromkeys(self.reglas.codes, 0)
+        quarantine = self._open_quarantine()
+        with reader:
+            for chunk in reader:
+                initial_rows += len(chunk)
+                chunk = self._parse_fecha(chunk, fecha_format)
+                chunk, chunk_counts = self._clean_frame(chunk, quarantine)
+                for nombre, filas in chunk_counts.items():
+                    self.rejection_counts[nombre] += filas
+                if chunk.empty:
+                    # Bloque sin filas válidas: no se entrega a los consumidores
+                    continue
+                chunk['total'] = chunk['cantidad'] * chunk['precio_unitario']
+                final_rows += len(chunk)
+                yield chunk
+        
+        print(f"Filas eliminadas en limpieza: {initial_rows - final_rows}")
+        self._print_rejections(self.rejection_counts)
+    
+    def process_in_chunks(self, file_path, consumers, chunksize=DEFAULT_CHUNKSIZE, **read_options):
+        """Procesa el CSV por bloques y pasa cada bloque limpio a los consumidores
+        
+        consumers es una lista de callables que reciben el DataFrame del bloque
+        (p. ej. una inserción en SQLite o un acumulador de agregados).
+        Retorna el número de filas válidas procesadas.
+        """
+        total_rows = 0
+        for chunk in self.iter_clean_chunks(file_path, chunksize, **read_options):
+            for consumer in consumers:
+                consumer(chunk)
+            total_rows += len(chunk)
+        return total_rows
+    
     def clean_data(self):
         """Limpia datos nulos e inconsistentes"""
         if self.df is None:
             raise ValueError("No hay datos cargados")
         
         initial_rows = len(self.df)
+        self.df, self.rejection_counts = self._clean_frame(self.df, self._open_quarantine())
+        final_rows = len(self.df)
+        print(f"Filas eliminadas en limpieza: {initial_rows - final_rows}")
+        self._print_rejections(self.rejection_counts)
         
-        # Eliminar filas con valores nulos
-        self.df = self.df.dropna()
+        return self.df
+    
+    @staticmethod
+    def _parse_fecha(df, fecha_format):
+        """Convierte la columna fecha con un formato fijo durante la carga
         
-        # Convertir fecha a datetime
-        self.df['fecha'] = pd.to_datetime(self.df['fecha'], errors='coerce')
-        self.df = self.df.dropna(subset=['fecha'])
+        Solo los valores que no cumplen el formato pasan por el parser
+        flexible (format='mixed'); los que tampoco así se entienden quedan NaT.
+        """
+        if fecha_format is None or 'fecha' not in df.columns:
+            return df
+        fechas = pd.to_datetime(df['fecha'], format=fecha_format, errors='coerce')
+        fallidas = fechas.isna() & df['fecha'].notna()
+        if fallidas.any():
+            fechas[fallidas] = pd.to_datetime(df['fecha'][fallidas], format='mixed', errors='coerce')
+        df['fecha'] = fechas
+        return df
+    
+    def _open_quarantine(self):
+        """Crea el escritor de cuarentena de esta ejecución, si está configurado"""
+        if self.quarantine_path is None:
+            return None
+        return QuarantineWriter(self.quarantine_path)
+    
+    def _clean_frame(self, df, quarantine=None):
+        """Aplica las reglas de limpieza con una sola máscara combinada
         
-        # Filtrar cantidades negativas o cero
-        self.df = self.df[self.df['cantidad'] > 0]
+        Cada regla produce una máscara booleana sobre el DataFrame original;
+        las filas se copian una única vez al final. Retorna el DataFrame limpio
+        y el número de filas descartadas por cada regla (cada fila se atribuye
+        a la primera regla que incumple).
+        """
+        motivos, fechas = self.reglas.evaluate(df)
+        rejection_counts = self.reglas.count_rejections(motivos)
+        if quarantine is not None:
+            quarantine.write(df, motivos, self.reglas)
         
-        # Filtrar precios negativos o cero
-        self.df = self.df[self.df['precio_unitario'] > 0]
+        valid = motivos == VALIDA
+        df = df.take(np.flatnonzero(valid))
         
-        # Eliminar productos vacíos
-        self.df = self.df[self.df['producto'].str.strip() != '']
+        # Convertir fecha a datetime (no-op si ya se parseó al cargar)
+        if not pd.api.types.is_datetime64_any_dtype(df['fecha']):
+            if 'fecha' in fechas:
+                df['fecha'] = fechas['fecha'].to_numpy()[valid]
+            else:
+                df['fecha'] = pd.to_datetime(df['fecha'], errors='coerce')
         
-        final_rows = len(self.df)
-        print(f"Filas eliminadas en limpieza: {initial_rows - final_rows}")
-        
-        return self.df
+        return DataProcessor._compact_dtypes(df), rejection_counts
+    
+    @staticmethod
+    def _print_rejections(rejection_counts):
+        """Muestra el detalle de filas descartadas por regla"""
+        for nombre, filas in rejection_counts.items():
+            if filas:
+                print(f"  - {nombre}: {filas}")
+    
+    @staticmethod
+    def _compact_dtypes(df):
+        """Reduce los tipos de columnas ya validadas al mínimo necesario"""
+        if pd.api.types.is_integer_dtype(df['cantidad']):
+            # Tras la limpieza todas las cantidades son positivas y sin nulos
+            df['cantidad'] = pd.to_numeric(df['cantidad'].astype('int64'), downcast='unsigned')
+        if isinstance(df['producto'].dtype, pd.CategoricalDtype):
+            df['producto'] = df['producto'].cat.remove_unused_categories()
+        return df
     
     def calculate_totals(self):
         """Calcula columna total = cantidad * precio_unitario"""
@@ -63,4 +199,115 @@ class DataProcessor:
             raise ValueError("No hay datos para guardar")
         
         self.df.to_csv(output_path, index=False)
-        print(f"Datos limpios guardados en: {output_path}")
\ No newline at end of file
+        print(f"Datos limpios guardados en: {output_path}")
+    
+    def save_cache(self, cache_path, source_path):
+        """Guarda datos limpios en formato Arrow IPC (Feather) sin comprimir
+        
+        La firma (CSV de origen, esquema de lectura, reglas y cuarentena) se
+        guarda en los metadatos del esquema para que load_cache pueda validar
+        la caché sin leer los datos. Se escribe un único record batch para que
+        cada columna ocupe un bloque contiguo que se pueda mapear sin copiar.
+        """
+        if self.df is None:
+            raise ValueError("No hay datos para guardar")
+        
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        
+        table = pa.Table.from_pandas(self.df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        firma = self._cache_signature(source_path, self.read_options)
+        metadata[CACHE_SOURCE_KEY] = json.dumps(firma).encode()
+        metadata[CACHE_REJECTIONS_KEY] = json.dumps(self.rejection_counts).encode()
+        table = table.replace_schema_metadata(metadata)
+        
+        # Sin compresión para que la lectura pueda mapear el archivo en memoria
+        feather.write_feather(table, cache_path, compression='uncompressed',
+                              chunksize=max(len(table), 1))
+        print(f"Caché de datos limpios guardada en: {cache_path}")
+    
+    def load_cache(self, cache_path, source_path, dtypes=VENTAS_DTYPES, fecha_format=FECHA_FORMAT):
+        """Carga datos limpios desde la caché si su firma sigue vigente
+        
+        La caché se descarta si cambió el CSV de origen, el esquema de
+        lectura (dtypes, fecha_format), las reglas de limpieza, o si el
+        archivo de cuarentena de esta instancia no es el que se generó junto
+        con la caché. Retorna el DataFrame o None.
+        
+        El archivo se mapea en memoria y las columnas numéricas y de fecha sin
+        nulos son vistas de solo lectura sobre el mapeo (sin copia); usar
+        df.copy() antes de modificarlas en el lugar. Se copian los códigos y
+        las categorías de las columnas categóricas, las columnas con nulos y
+        las de texto o con zona horaria.
+        """
+        if not os.path.exists(cache_path):
+            return None
+        
+        import pyarrow as pa
+        
+        firma_actual = self._cache_signature(
+            source_path, {'dtypes': dtypes, 'fecha_format': fecha_format}
+        )
+        try:
+            source = pa.memory_map(cache_path)
+            reader = pa.ipc.open_file(source)
+            metadata = reader.schema.metadata or {}
+            firma = metadata.get(CACHE_SOURCE_KEY)
+            if firma is None or json.loads(firma) != firma_actual:
+                source.close()
+                return None
+            table = reader.read_all()
+        except (pa.ArrowInvalid, OSError):
+            return None
+        
+        # Los arreglos sin copia mantienen abierto el mapeo mientras existan
+        self.df = pd.DataFrame(
+            {name: self._columna_desde_arrow(columna)
+             for name, columna in zip(table.column_names, table.columns)},
+            copy=False
+        )
+        self.read_options = {'dtypes': dtypes, 'fecha_format': fecha_format}
+        self.rejection_counts = json.loads(metadata.get(CACHE_REJECTIONS_KEY, b'{}'))
+        return self.df
+    
+    @staticmethod
+    def _columna_desde_arrow(columna):
+        """Convierte una columna Arrow a pandas sin copiar cuando es posible"""
+        import pyarrow as pa
+        
+        array = columna.chunk(0) if columna.num_chunks == 1 else columna.combine_chunks()
+        tipo = array.type
+        if array.null_count == 0:
+            if pa.types.is_dictionary(tipo):
+                return pd.Categorical.from_codes(
+                    array.indices.to_numpy(zero_copy_only=False),
+                    categories=array.dictionary.to_pandas(),
+                    ordered=tipo.ordered
+                )
+            if (pa.types.is_integer(tipo) or pa.types.is_floating(tipo) or pa.types.is_boolean(tipo)
+                    or (pa.types.is_timestamp(tipo) and tipo.tz is None)):
+                return array.to_numpy(zero_copy_only=False)
+        return array.to_pandas()
+    
+    def _cache_signature(self, source_path, read_options):
+        """Firma completa de la caché: origen, esquema, reglas y cuarentena"""
+        quarantine = None
+        if self.quarantine_path is not None:
+            quarantine = {
+                'path': os.path.abspath(self.quarantine_path),
+                'firma': (self._source_signature(self.quarantine_path)
+                          if os.path.exists(self.quarantine_path) else None),
+            }
+        return {
+            'source': self._source_signature(source_path),
+            'schema': json.loads(json.dumps(read_options, sort_keys=True, default=str)),
+            'reglas': self.reglas.signature(),
+            'quarantine': quarantine,
+        }
+    
+    @staticmethod
+    def _source_signature(source_path):
+        """Firma barata del archivo de origen: tamaño y fecha de modificación"""
+        stat = os.stat(source_path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
@@ -1,13 +1,131 @@
 import sqlite3
+import numpy as np
 import pandas as pd
 import json
 from datetime import datetime
+from contextlib import contextmanager
 import os
+import threading
+import weakref
+from collections import OrderedDict
+from .queries import get_query_registry
+
+# Columnas de la tabla ventas (sin el id autoincremental)
+VENTAS_COLUMNS = ['fecha', 'producto', 'cantidad', 'precio_unitario', 'total']
+
+# Clave natural de una venta: una fila con los mismos valores se considera ya cargada
+VENTAS_NATURAL_KEY = ['fecha', 'producto', 'cantidad', 'precio_unitario']
+
+# Columnas generadas de ventas (nombre -> definición). Son VIRTUAL para poder
+# agregarlas con ALTER TABLE a bases existentes; sus índices las materializan.
+# SQLite (al menos hasta 3.40) nunca usa como índice de cobertura un índice que
+# contiene columnas generadas, sean VIRTUAL o STORED: agrupar por mes o
+# dia_semana recorre el índice en orden (sin ordenar en un B-tree temporal) pero
+# lee cada fila de la tabla para obtener total.
+VENTAS_GENERATED_COLUMNS = {
+    'mes': "TEXT GENERATED ALWAYS AS (strftime('%Y-%m', fecha)) VIRTUAL",
+    'dia_semana': "TEXT GENERATED ALWAYS AS (strftime('%w', fecha)) VIRTUAL",
+}
+
+# Índices secundarios de ventas (nombre -> definición). La carga masiva los
+# elimina antes de insertar y los reconstruye al final.
+VENTAS_INDEXES = {
+    # Clave natural para la carga incremental; también sirve filtros por fecha
+    'idx_ventas_clave': f"ON ventas ({', '.join(VENTAS_NATURAL_KEY)})",
+    # Cubre las agregaciones por producto (consultas 1, 2 y 4 de queries.sql)
+    'idx_ventas_producto': "ON ventas (producto, cantidad, total, precio_unitario)",
+    # Recorrido ordenado para las agregaciones mensuales (consultas 3 y 7); no es
+    # de cobertura por ser mes una columna generada (ver arriba)
+    'idx_ventas_mes': "ON ventas (mes, total)",
+    # Recorrido ordenado para las ventas por día de la semana (consulta 5)
+    'idx_ventas_dia_semana': "ON ventas (dia_semana, total)",
+}
+
+# Tablas resumen mantenidas en cada carga (nombre -> columnas de agrupación).
+# Todas guardan las mismas medidas, de las que se derivan sumas y promedios.
+RESUMEN_TABLES = {
+    'resumen_producto': ['producto'],
+    'resumen_mes': ['mes'],
+    'resumen_producto_mes': ['producto', 'mes'],
+    'resumen_dia_semana': ['dia_semana'],
+}
+RESUMEN_MEASURES = {
+    'cantidad_total': ('INTEGER', 'SUM(cantidad)'),
+    'facturacion_total': ('REAL', 'SUM(total)'),
+    'suma_precio_unitario': ('REAL', 'SUM(precio_unitario)'),
+    'numero_ventas': ('INTEGER', 'COUNT(*)'),
+}
+
+# Filas por lote de executemany en la carga masiva
+BULK_BATCH_SIZE = 50_000
+
+# Una carga sin replace reconstruye los índices solo si el lote tiene al menos
+# esta fracción de las filas existentes; si no, mantenerlos fila a fila cuesta
+# menos que recorrer todo el historial para reconstruirlos.
+BULK_INDEX_REBUILD_RATIO = 0.5
+
+# PRAGMAs aplicados solo durante la carga masiva (se restauran al terminar)
+BULK_LOAD_PRAGMAS = {
+    'journal_mode': 'MEMORY',
+    'synchronous': 'OFF',
+    'cache_size': -262144,  # 256 MB
+}
+
+# PRAGMAs aplicados a cada conexión al abrirla. WAL permite que los lectores
+# no bloqueen al escritor; con WAL, synchronous=NORMAL sigue siendo seguro.
+CONNECTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+}
+
+DEFAULT_DB_PATH = "output/database/ventas.db"
+
+# Conexiones libres que se conservan al terminar su hilo para que el próximo
+# hilo nuevo las reutilice (las demás se cierran)
+IDLE_CONNECTIONS_MAX = 2
+
+# Resultados de consultas guardados en memoria por DatabaseManager (LRU)
+QUERY_CACHE_SIZE = 64
+
+# DatabaseManager compartidos por ruta (ver get_database)
+_shared_managers = {}
+_shared_lock = threading.Lock()
+
+def get_database(db_path=DEFAULT_DB_PATH):
+    """Retorna el DatabaseManager compartido para db_path
+    
+    El esquema se verifica una sola vez por ruta y cada hilo reutiliza su
+    conexión, en lugar de crear un DatabaseManager en cada llamada.
+    """
+    key = os.path.abspath(db_path)
+    with _shared_lock:
+        if key not in _shared_managers:
+            _shared_managers[key] = DatabaseManager(db_path)
+        return _shared_managers[key]
+
+class _ConnectionHolder:
+    """Conexión asignada a un hilo; al terminar el hilo se libera (ver get_connection)"""
+    
+    __slots__ = ('conn', '__weakref__')
+    
+    def __init__(self, conn):
+        self.conn = conn
 
 class DatabaseManager:
     
-    def __init__(self, db_path="output/database/ventas.db"):
+    def __init__(self, db_path=DEFAULT_DB_PATH, persist_query_cache=False):
+        """persist_query_cache: además de en memoria, guarda los resultados de
+        consultas en la tabla cache_consultas (sobreviven entre ejecuciones).
+        """
         self.db_path = db_path
+        self._local = threading.local()
+        self._connections = []
+        self._idle_connections = []
+        self._connections_lock = threading.Lock()
+        self._query_cache = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        self.persist_query_cache = persist_query_cache
+        self._partitions = None
         self.ensure_directory()
         self.create_tables()
     
@@ -18,13 +136,81 @@ class DatabaseManager:
             os.makedirs(directory)
     
     def get_connection(self):
-        """Obtiene conexión a la base de datos"""
-        return sqlite3.connect(self.db_path)
+        """Obtiene la conexión del hilo actual (se abre una vez y se reutiliza)
+        
+        Usar con 'with' confirma o revierte la transacción, pero no cierra la
+        conexión; para cerrarlas todas llamar a close(). Cuando el hilo
+        termina, su conexión vuelve a un grupo de IDLE_CONNECTIONS_MAX
+        conexiones libres (o se cierra) y el próximo hilo nuevo la reutiliza.
+        """
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            with self._connections_lock:
+                conn = self._idle_connections.pop() if self._idle_connections else None
+            if conn is None:
+                # check_same_thread=False para que close() y otros hilos puedan
+                # usarla; en cada momento la usa un solo hilo
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                for pragma, value in CONNECTION_PRAGMAS.items():
+                    conn.execute(f"PRAGMA {pragma} = {value}")
+                with self._connections_lock:
+                    self._connections.append(conn)
+            holder = self._local.holder = _ConnectionHolder(conn)
+            # El holder vive en el almacenamiento local del hilo: se libera al terminar
+            weakref.finalize(
+                holder, self._release_connection, conn,
+                self._connections, self._idle_connections, self._connections_lock
+            )
+        return holder.conn
+    
+    @staticmethod
+    def _release_connection(conn, connections, idle_connections, lock):
+        """Devuelve la conexión de un hilo terminado al grupo libre o la cierra"""
+        with lock:
+            if conn not in connections:
+                return  # ya cerrada por close()
+            if len(idle_connections) < IDLE_CONNECTIONS_MAX:
+                conn.rollback()
+                idle_connections.append(conn)
+                return
+            connections.remove(conn)
+        conn.close()
+    
+    def close(self):
+        """Cierra todas las conexiones abiertas por este DatabaseManager"""
+        with self._connections_lock:
+            connections = list(self._connections)
+            self._connections.clear()
+            self._idle_connections.clear()
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
     
     def create_tables(self):
         """Crea las tablas necesarias"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            existing_tables = {
+                row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            }
+            
+            # Versión de los datos: se incrementa en cada escritura y forma
+            # parte de la clave de la caché de consultas
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS metadatos (
+                    clave TEXT PRIMARY KEY,
+                    valor INTEGER NOT NULL
+                )
+            ''')
+            cursor.execute("INSERT OR IGNORE INTO metadatos (clave, valor) VALUES ('version_datos', 0)")
+            if self.persist_query_cache:
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS cache_consultas (
+                        clave TEXT PRIMARY KEY,
+                        version INTEGER NOT NULL,
+                        resultado BLOB NOT NULL
+                    )
+                ''')
             
             # Tabla de ventas
             cursor.execute('''
@@ -38,6 +224,26 @@ class DatabaseManager:
                 )
             ''')
             
+            self._migrate_ventas(cursor)
+            
+            # Índices secundarios
+            for name, definition in VENTAS_INDEXES.items():
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} {definition}")
+            
+            # Tablas resumen (se reconstruyen si la base ya tenía ventas)
+            for table, keys in RESUMEN_TABLES.items():
+                columns = [f"{key} TEXT" for key in keys]
+                columns += [f"{name} {sql_type}" for name, (sql_type, _) in RESUMEN_MEASURES.items()]
+                cursor.execute(f'''
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        {', '.join(columns)},
+                        PRIMARY KEY ({', '.join(keys)})
+                    )
+                ''')
+            if not set(RESUMEN_TABLES) <= existing_tables:
+                self._refresh_resumenes(conn)
+                self._bump_data_version(conn)
+            
             # Tabla de resultados de análisis
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS analisis_resultados (
@@ -51,16 +257,263 @@ class DatabaseManager:
             
             conn.commit()
     
-    def insert_ventas_data(self, df):
-        """Inserta datos de ventas desde DataFrame"""
+    def _migrate_ventas(self, cursor):
+        """Agrega a ventas las columnas generadas que falten (bases anteriores)"""
+        existing = {row[1] for row in cursor.execute("PRAGMA table_xinfo(ventas)")}
+        for name, definition in VENTAS_GENERATED_COLUMNS.items():
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE ventas ADD COLUMN {name} {definition}")
+    
+    def _refresh_resumenes(self, conn, desde_id=None):
+        """Mantiene las tablas resumen dentro de la transacción actual
+        
+        Con desde_id=None las reconstruye desde cero; si no, agrega solo las
+        ventas con id > desde_id mediante upserts, con costo proporcional a
+        las filas recién insertadas.
+        """
+        measures = ', '.join(expr for _, expr in RESUMEN_MEASURES.values())
+        for table, keys in RESUMEN_TABLES.items():
+            key_list = ', '.join(keys)
+            columns = f"{key_list}, {', '.join(RESUMEN_MEASURES)}"
+            if desde_id is None:
+                conn.execute(f"DELETE FROM {table}")
+                conn.execute(f'''
+                    INSERT INTO {table} ({columns})
+                    SELECT {key_list}, {measures} FROM ventas GROUP BY {key_list}
+                ''')
+            else:
+                updates = ', '.join(f"{name} = {name} + excluded.{name}" for name in RESUMEN_MEASURES)
+                conn.execute(f'''
+                    INSERT INTO {table} ({columns})
+                    SELECT {key_list}, {measures} FROM ventas WHERE id > ? GROUP BY {key_list}
+                    ON CONFLICT ({key_list}) DO UPDATE SET {updates}
+                ''', (desde_id,))
+    
+    @staticmethod
+    def _max_venta_id(conn):
+        """Último id de ventas (las cargas incrementales resumen lo posterior)"""
+        return conn.execute("SELECT COALESCE(MAX(id), 0) FROM ventas").fetchone()[0]
+    
+    @staticmethod
+    def _bump_data_version(conn):
+        """Incrementa la versión de los datos dentro de la transacción actual"""
+        conn.execute("UPDATE metadatos SET valor = valor + 1 WHERE clave = 'version_datos'")
+    
+    @staticmethod
+    def _data_version(conn):
+        """Lee la versión de los datos con la conexión dada"""
+        return conn.execute("SELECT valor FROM metadatos WHERE clave = 'version_datos'").fetchone()[0]
+    
+    def get_data_version(self):
+        """Versión actual de los datos (cambia con cada inserción o borrado)"""
+        with self.get_connection() as conn:
+            return self._data_version(conn)
+    
+    def bump_data_version(self):
+        """Invalida la caché de consultas (p. ej. tras modificar ventas a mano)"""
+        with self.get_connection() as conn:
+            self._bump_data_version(conn)
+    
+    def rebuild_resumenes(self):
+        """Reconstruye las tablas resumen (p. ej. tras modificar ventas a mano)"""
+        with self.get_connection() as conn:
+            self._refresh_resumenes(conn)
+            self._bump_data_version(conn)
+    
+    @property
+    def partitions(self):
+        """Almacén particionado por mes sobre esta base (se crea al usarlo)"""
+        if self._partitions is None:
+            # Import diferido: partitions importa este módulo
+            from .partitions import PartitionedVentasStore
+            self._partitions = PartitionedVentasStore(self)
+        return self._partitions
+    
+    def insert_ventas_data(self, df, incremental=False, particionar=False):
+        """Inserta datos de ventas desde DataFrame
+        
+        Con incremental=True no borra la tabla: solo agrega las filas cuya
+        clave natural (fecha, producto, cantidad, precio_unitario) aún no
+        existe, por lo que recargar el mismo delta no duplica datos.
+        
+        Con particionar=True además actualiza el almacén particionado por mes
+        (self.partitions) con los meses afectados por la carga; una carga
+        completa también elimina las particiones activas de meses que ya no
+        tienen ventas.
+        """
+        if incremental:
+            inserted = self.append_new_ventas(df)
+        else:
+            # Limpiar tabla existente e insertar nuevos datos
+            self.bulk_insert_ventas(df, replace=True)
+            print(f"Insertadas {len(df)} filas en tabla ventas")
+            inserted = len(df)
+        
+        if particionar:
+            meses = set(pd.to_datetime(df['fecha']).dt.to_period('M').dropna())
+            if not incremental:
+                activas = self.partitions.particiones()
+                meses |= set(activas.loc[activas['archivo'].isna(), 'periodo'])
+            self.partitions.sync_months(meses)
+        return inserted
+    
+    def bulk_insert_ventas(self, df, replace=False, batch_size=BULK_BATCH_SIZE):
+        """Carga masiva de ventas en una sola transacción
+        
+        Inserta con executemany por lotes y con PRAGMAs de carga masiva
+        temporales. Con replace=True, o si el lote es grande respecto de la
+        tabla (BULK_INDEX_REBUILD_RATIO), los índices secundarios se
+        eliminan y se reconstruyen al final en lugar de mantenerlos fila a
+        fila; un agregado pequeño los mantiene para no pagar O(historial).
+        """
+        columns = ', '.join(VENTAS_COLUMNS)
+        placeholders = ', '.join('?' for _ in VENTAS_COLUMNS)
+        insert_sql = f"INSERT INTO ventas ({columns}) VALUES ({placeholders})"
+        
+        with self.get_connection() as conn, self._bulk_load_pragmas(conn):
+            conn.execute("BEGIN")
+            try:
+                desde_id = self._max_venta_id(conn)
+                if replace:
+                    conn.execute("DELETE FROM ventas")
+                # El último id aproxima las filas existentes sin recorrer la tabla
+                rebuild_indexes = replace or len(df) >= desde_id * BULK_INDEX_REBUILD_RATIO
+                if rebuild_indexes:
+                    for name in VENTAS_INDEXES:
+                        conn.execute(f"DROP INDEX IF EXISTS {name}")
+                
+                for start in range(0, len(df), batch_size):
+                    batch = df.iloc[start:start + batch_size]
+                    conn.executemany(insert_sql, self._ventas_records(batch))
+                
+                if rebuild_indexes:
+                    for name, definition in VENTAS_INDEXES.items():
+                        conn.execute(f"CREATE INDEX {name} {definition}")
+                self._refresh_resumenes(conn, None if replace else desde_id)
+                self._bump_data_version(conn)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        
+        return len(df)
+    
+    @contextmanager
+    def _bulk_load_pragmas(self, conn):
+        """Aplica BULK_LOAD_PRAGMAS y restaura los valores previos al salir
+        
+        En modo WAL no se cambia journal_mode: salir de WAL requiere acceso
+        exclusivo y bloquearía a los lectores de otros hilos.
+        """
+        previous = {
+            pragma: conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+            for pragma in BULK_LOAD_PRAGMAS
+        }
+        if str(previous.get('journal_mode')).lower() == 'wal':
+            del previous['journal_mode']
+        for pragma in previous:
+            value = BULK_LOAD_PRAGMAS[pragma]
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        try:
+            yield conn
+        finally:
+            for pragma, value in previous.items():
+                conn.execute(f"PRAGMA {pragma} = {value}")
+    
+    def clear_ventas(self):
+        """Elimina todas las filas de la tabla ventas"""
         with self.get_connection() as conn:
-            # Limpiar tabla existente
             conn.execute("DELETE FROM ventas")
-            
-            # Insertar nuevos datos
-            df.to_sql('ventas', conn, if_exists='append', index=False)
-            
-        print(f"Insertadas {len(df)} filas en tabla ventas")
+            self._refresh_resumenes(conn)
+            self._bump_data_version(conn)
+    
+    def append_ventas_data(self, df):
+        """Agrega filas a la tabla ventas sin borrar las existentes
+        
+        Pensado como consumidor de DataProcessor.process_in_chunks.
+        """
+        with self.get_connection() as conn:
+            desde_id = self._max_venta_id(conn)
+            self._insert_ventas(conn, df)
+            self._refresh_resumenes(conn, desde_id)
+            self._bump_data_version(conn)
+    
+    @classmethod
+    def _insert_ventas(cls, conn, df):
+        """Inserta las filas de df en ventas dentro de la transacción actual"""
+        columns = ', '.join(VENTAS_COLUMNS)
+        placeholders = ', '.join('?' for _ in VENTAS_COLUMNS)
+        conn.executemany(
+            f"INSERT INTO ventas ({columns}) VALUES ({placeholders})",
+            cls._ventas_records(df)
+        )
+    
+    def append_new_ventas(self, df):
+        """Agrega solo las filas nuevas según la clave natural (carga idempotente)
+        
+        El delta se vuelca en una tabla temporal y se inserta con un
+        anti-join sobre idx_ventas_clave: el costo depende del tamaño del
+        delta y no del historial acumulado. Retorna las filas insertadas.
+        """
+        key_match = ' AND '.join(f'v.{col} = s.{col}' for col in VENTAS_NATURAL_KEY)
+        columns = ', '.join(VENTAS_COLUMNS)
+        placeholders = ', '.join('?' for _ in VENTAS_COLUMNS)
+        
+        with self.get_connection() as conn:
+            conn.execute('''
+                CREATE TEMP TABLE IF NOT EXISTS ventas_staging (
+                    fecha DATE,
+                    producto TEXT,
+                    cantidad INTEGER,
+                    precio_unitario REAL,
+                    total REAL
+                )
+            ''')
+            conn.execute("DELETE FROM ventas_staging")
+            desde_id = self._max_venta_id(conn)
+            conn.executemany(
+                f"INSERT INTO ventas_staging ({columns}) VALUES ({placeholders})",
+                self._ventas_records(df)
+            )
+            cursor = conn.execute(f'''
+                INSERT INTO ventas ({columns})
+                SELECT {columns} FROM ventas_staging s
+                WHERE NOT EXISTS (SELECT 1 FROM ventas v WHERE {key_match})
+            ''')
+            inserted = cursor.rowcount
+            conn.execute("DELETE FROM ventas_staging")
+            self._refresh_resumenes(conn, desde_id)
+            self._bump_data_version(conn)
+        
+        print(f"Insertadas {inserted} filas nuevas en tabla ventas "
+              f"({len(df) - inserted} ya existentes)")
+        return inserted
+    
+    @staticmethod
+    def _ventas_records(df):
+        """Convierte el DataFrame en tuplas de tipos nativos para sqlite3
+        
+        Las fechas se guardan como texto 'YYYY-MM-DD HH:MM:SS' (el formato
+        que usaba to_sql) para que la clave natural sea comparable con las
+        filas cargadas anteriormente.
+        """
+        fechas = df['fecha']
+        if pd.api.types.is_datetime64_any_dtype(fechas):
+            # Hay pocas fechas distintas: se formatean solo los valores únicos
+            codes, uniques = pd.factorize(fechas)
+            # NaT tiene código -1: el None agregado al final lo guarda como NULL
+            formateadas = np.append(uniques.strftime('%Y-%m-%d %H:%M:%S').to_numpy(dtype=object), None)
+            fechas = formateadas[codes]
+        else:
+            fechas = fechas.to_numpy(dtype=object)
+        
+        return list(zip(
+            fechas.tolist(),
+            df['producto'].tolist(),
+            df['cantidad'].astype('int64').tolist(),
+            df['precio_unitario'].astype('float64').tolist(),
+            df['total'].astype('float64').tolist()
+        ))
     
     def save_analysis_results(self, analysis_results):
         """Guarda resultados de análisis en BD"""
@@ -91,31 +544,157 @@ class DatabaseManager:
                     VALUES (?, ?, ?)
                 ''', (f'top_3_cantidad_puesto_{i}', producto, float(cantidad)))
             
+            self._bump_data_version(conn)
             conn.commit()
         
         print("Resultados de análisis guardados en BD")
     
     def get_top_productos_query(self, limit=3):
-        """Consulta SQL para obtener top productos"""
-        query = f'''
-            SELECT producto, SUM(cantidad) as cantidad_total
-            FROM ventas
-            GROUP BY producto
-            ORDER BY cantidad_total DESC
-            LIMIT {limit}
+        """Consulta SQL para obtener top productos (desde resumen_producto)"""
+        query = '''
+            SELECT producto, cantidad_total
+            FROM resumen_producto
+            ORDER BY cantidad_total DESC, producto
+            LIMIT ?
         '''
         
+        return self.read_sql(query, (limit,))
+    
+    def read_sql(self, query, params=(), dtype_backend=None):
+        """Ejecuta una consulta de lectura con caché de resultados
+        
+        La clave es (consulta, parámetros, dtype_backend, versión de los
+        datos): mientras no haya escrituras se retorna una copia del
+        resultado anterior sin volver a ejecutar la consulta.
+        """
+        params_key = tuple(sorted(params.items())) if isinstance(params, dict) else tuple(params)
+        opciones = {} if dtype_backend is None else {'dtype_backend': dtype_backend}
+        
         with self.get_connection() as conn:
-            return pd.read_sql_query(query, conn)
+            version = self._data_version(conn)
+            key = (query, params_key, dtype_backend)
+            with self._query_cache_lock:
+                cached = self._query_cache.get(key)
+                if cached is not None and cached[0] == version:
+                    self._query_cache.move_to_end(key)
+                    return cached[1].copy()
+            
+            df = self._load_persisted_result(conn, key, version) if self.persist_query_cache else None
+            if df is None:
+                df = pd.read_sql_query(query, conn, params=params, **opciones)
+                if self.persist_query_cache:
+                    self._persist_result(conn, key, version, df)
+        
+        with self._query_cache_lock:
+            self._query_cache[key] = (version, df)
+            self._query_cache.move_to_end(key)
+            if len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return df.copy()
+    
+    @staticmethod
+    def _persisted_key(key):
+        """Clave de texto para la tabla cache_consultas"""
+        return json.dumps(key, default=str)
+    
+    def _load_persisted_result(self, conn, key, version):
+        """Resultado guardado en cache_consultas para esta versión, o None"""
+        row = conn.execute(
+            "SELECT resultado FROM cache_consultas WHERE clave = ? AND version = ?",
+            (self._persisted_key(key), version)
+        ).fetchone()
+        if row is None:
+            return None
+        
+        import pyarrow as pa
+        table = pa.ipc.open_file(pa.py_buffer(row[0])).read_all()
+        if key[2] == 'pyarrow':
+            return table.to_pandas(types_mapper=pd.ArrowDtype)
+        return table.to_pandas()
+    
+    def _persist_result(self, conn, key, version, df):
+        """Guarda el resultado en cache_consultas como Arrow IPC"""
+        import pyarrow as pa
+        
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_consultas (clave, version, resultado) VALUES (?, ?, ?)",
+            (self._persisted_key(key), version, sink.getvalue().to_pybytes())
+        )
+        conn.commit()
+    
+    def clear_query_cache(self):
+        """Vacía la caché de consultas en memoria (y la persistida, si existe)"""
+        with self._query_cache_lock:
+            self._query_cache.clear()
+        if self.persist_query_cache:
+            with self.get_connection() as conn:
+                conn.execute("DELETE FROM cache_consultas")
+    
+    def run_query(self, name, dtype_backend=None, **params):
+        """Ejecuta una consulta con nombre de sql/queries.sql (ver src.queries)
+        
+        Parámetros opcionales: desde, hasta, producto y limit.
+        """
+        return get_query_registry().run(self, name, dtype_backend, **params)
+    
+    def run_all_queries(self, dtype_backend=None, **params):
+        """Ejecuta todas las consultas de sql/queries.sql con los mismos filtros"""
+        return get_query_registry().run_all(self, dtype_backend, **params)
     
     def get_facturacion_mensual_query(self):
-        """Consulta SQL para facturación mensual"""
+        """Consulta SQL para facturación mensual (desde resumen_mes)"""
         query = '''
-            SELECT strftime('%Y-%m', fecha) as mes, SUM(total) as facturacion_total
-            FROM ventas
-            GROUP BY strftime('%Y-%m', fecha)
+            SELECT mes, facturacion_total
+            FROM resumen_mes
             ORDER BY mes
         '''
         
-        with self.get_connection() as conn:
-            return pd.read_sql_query(query, conn)
\ No newline at end of file
+        return self.read_sql(query)
+    
+    def get_resumen_productos_query(self):
+        """Resumen por producto: cantidad, facturación, precio promedio y transacciones"""
+        query = '''
+            SELECT producto, cantidad_total, facturacion_total,
+                   ROUND(suma_precio_unitario / numero_ventas, 2) as precio_promedio,
+                   numero_ventas as numero_transacciones
+            FROM resumen_producto
+            ORDER BY facturacion_total DESC
+        '''
+        
+        return self.read_sql(query)
+    
+    def get_producto_mes_query(self, producto=None):
+        """Cantidad y facturación por producto y mes (opcionalmente de un producto)"""
+        query = '''
+            SELECT producto, mes, cantidad_total, facturacion_total, numero_ventas
+            FROM resumen_producto_mes
+            WHERE ? IS NULL OR producto = ?
+            ORDER BY producto, mes
+        '''
+        
+        return self.read_sql(query, (producto, producto))
+    
+    def get_ventas_dia_semana_query(self):
+        """Facturación y número de ventas por día de la semana"""
+        query = '''
+            SELECT
+                CASE dia_semana
+                    WHEN '0' THEN 'Domingo'
+                    WHEN '1' THEN 'Lunes'
+                    WHEN '2' THEN 'Martes'
+                    WHEN '3' THEN 'Miércoles'
+                    WHEN '4' THEN 'Jueves'
+                    WHEN '5' THEN 'Viernes'
+                    WHEN '6' THEN 'Sábado'
+                END as dia_semana,
+                facturacion_total,
+                numero_ventas
+            FROM resumen_dia_semana
+            ORDER BY facturacion_total DESC
+        '''
+        
+        return self.read_sql(query)
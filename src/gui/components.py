@@ -222,3 +222,99 @@ class DataPreviewTable(ttk.Treeview):
         for idx, row in df.head(max_rows).iterrows():
             values = [str(val) for val in row]
             self.insert('', tk.END, values=values)
+
+
+def format_bytes(num_bytes):
+    """Formatea un tamaño en bytes (B, KB, MB, GB)."""
+    if num_bytes < 1024:
+        return f"{num_bytes} B"
+    for unidad in ("KB", "MB", "GB"):
+        num_bytes /= 1024
+        if num_bytes < 1024 or unidad == "GB":
+            return f"{num_bytes:.1f} {unidad}"
+
+
+class LoadingFrame(tk.Frame):
+    """Frame de carga de archivo: progreso por bytes, cancelar y vista previa."""
+    
+    def __init__(self, parent, filename, on_cancel, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.config(bg=BG_COLOR)
+        
+        # Título
+        self.title_label = tk.Label(
+            self,
+            text=f"Cargando {filename}...",
+            font=(FONT_FAMILY, FONT_SIZE_SUBTITLE, "bold"),
+            fg=TEXT_COLOR,
+            bg=BG_COLOR
+        )
+        self.title_label.pack(anchor=tk.W, pady=(0, 10))
+        
+        # Barra de progreso (bytes leídos / tamaño del archivo)
+        self.progress_bar = ttk.Progressbar(
+            self,
+            mode='determinate',
+            maximum=100,
+            length=400
+        )
+        self.progress_bar.pack(fill=tk.X, pady=5)
+        
+        # Bytes leídos y botón cancelar
+        status_frame = tk.Frame(self, bg=BG_COLOR)
+        status_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        self.status_label = tk.Label(
+            status_frame,
+            text="Iniciando...",
+            font=(FONT_FAMILY, FONT_SIZE_NORMAL),
+            fg=DARK_GRAY,
+            bg=BG_COLOR
+        )
+        self.status_label.pack(side=tk.LEFT)
+        
+        self.cancel_btn = tk.Button(
+            status_frame,
+            text="Cancelar",
+            font=(FONT_FAMILY, FONT_SIZE_NORMAL),
+            bg=LIGHT_GRAY,
+            fg=TEXT_COLOR,
+            activebackground=DARK_GRAY,
+            activeforeground="white",
+            cursor="hand2",
+            padx=20,
+            pady=6,
+            relief=tk.FLAT,
+            command=on_cancel
+        )
+        self.cancel_btn.pack(side=tk.RIGHT)
+        
+        # Vista previa (se llena con el primer bloque)
+        self.preview_label = tk.Label(
+            self,
+            text="Vista previa de los datos:",
+            font=(FONT_FAMILY, FONT_SIZE_NORMAL, "bold"),
+            fg=TEXT_COLOR,
+            bg=BG_COLOR
+        )
+        self.preview_label.pack(anchor=tk.W, pady=(10, 5))
+        
+        preview_frame = tk.Frame(self, bg=BG_COLOR)
+        preview_frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.preview_table = DataPreviewTable(preview_frame)
+        self.preview_table.pack(fill=tk.BOTH, expand=True)
+    
+    def update_progress(self, leidos, total):
+        """Actualiza la barra con los bytes leídos."""
+        self.progress_bar['value'] = 100 * leidos / total if total else 100
+        self.status_label.config(text=f"{format_bytes(leidos)} de {format_bytes(total)}")
+    
+    def show_preview(self, df, max_rows=5):
+        """Muestra las primeras filas mientras se carga el resto."""
+        self.preview_table.load_dataframe(df, max_rows=max_rows)
+    
+    def set_cancelling(self):
+        """Indica que la cancelación está pendiente."""
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.status_label.config(text="Cancelando...")
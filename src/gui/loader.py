@@ -0,0 +1,175 @@
+"""
+Carga de archivos de ventas en segundo plano para la GUI.
+"""
+
+import os
+import threading
+
+# Filas del primer bloque: llegan en milisegundos y alimentan la vista previa
+PREVIEW_ROWS = 50
+LOAD_CHUNKSIZE = 100_000
+# Bytes del comienzo del archivo con los que se estiman sus filas
+MUESTRA_BYTES = 1 << 20
+
+
+class FileLoader:
+    """Lee un CSV o Excel en un thread, informando el avance en bytes.
+
+    Los callbacks se llaman desde el thread de carga (la ventana debe
+    pasarlos al hilo de Tk con root.after):
+
+    - on_preview(df): primer bloque de filas, antes de leer el resto.
+    - on_progress(leidos, total): bytes leídos del archivo.
+    - on_done(df): DataFrame completo.
+    - on_error(exc) / on_cancel(): la carga terminó sin resultado.
+
+    cancel() detiene la lectura entre un bloque y el siguiente.
+    """
+
+    def __init__(self, filepath, on_preview=None, on_progress=None, on_done=None,
+                 on_error=None, on_cancel=None, chunksize=LOAD_CHUNKSIZE,
+                 preview_rows=PREVIEW_ROWS):
+        self.filepath = filepath
+        self.on_preview = on_preview
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_cancel = on_cancel
+        self.chunksize = chunksize
+        self.preview_rows = preview_rows
+        self.cancel_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Inicia la carga en un thread daemon."""
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def cancel(self):
+        """Pide detener la carga; on_cancel se llama al terminar el bloque actual."""
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def run(self):
+        """Carga el archivo en el thread actual y llama al callback que corresponda."""
+        try:
+            ext = os.path.splitext(self.filepath)[1].lower()
+            if ext == '.csv':
+                df = self._read_csv()
+            else:
+                df = self._read_excel()
+        except Exception as e:
+            self._notify(self.on_error, e)
+            return
+
+        if df is None:
+            self._notify(self.on_cancel)
+        else:
+            self._notify(self.on_done, df)
+
+    def _read_csv(self):
+        """Lee el CSV por bloques; retorna None si se canceló.
+
+        La vista previa sale del primer bloque, sin recorrer antes el
+        archivo. Cada bloque se copia en columnas reservadas con las filas
+        estimadas (_estimar_filas) y se descarta: el pico de memoria es el
+        DataFrame final más un bloque, en lugar de todos los bloques más la
+        copia de pd.concat.
+        """
+        import numpy as np
+        import pandas as pd
+
+        total = os.path.getsize(self.filepath)
+        columnas = None
+        filas = 0
+        with open(self.filepath, 'rb') as f:
+            with pd.read_csv(f, chunksize=self.chunksize) as reader:
+                # El primer bloque es pequeño para mostrar la vista previa cuanto antes
+                size = self.preview_rows
+                while not self.cancelled:
+                    try:
+                        chunk = reader.get_chunk(size)
+                    except StopIteration:
+                        break
+                    if columnas is None:
+                        self._notify(self.on_preview, chunk)
+                        capacidad = max(self._estimar_filas(total), len(chunk))
+                        columnas = {
+                            col: np.empty(capacidad, dtype=chunk[col].to_numpy().dtype)
+                            for col in chunk.columns
+                        }
+                    # Posición en el archivo: incluye lo que el parser ya leyó por adelantado
+                    leidos = f.tell()
+                    # Si hay que crecer, a las filas que anticipan los bytes leídos
+                    fin = filas + len(chunk)
+                    filas = self._copiar_bloque(columnas, chunk, filas, int(fin * total / leidos * 1.05))
+                    self._notify(self.on_progress, leidos, total)
+                    size = self.chunksize
+
+        if self.cancelled:
+            return None
+        self._notify(self.on_progress, total, total)
+        if columnas is None:
+            return pd.read_csv(self.filepath)
+        # copy=False: cada columna queda en su propio bloque, sin consolidar (ni copiar)
+        return pd.DataFrame({col: valores[:filas] for col, valores in columnas.items()}, copy=False)
+
+    def _estimar_filas(self, total):
+        """Filas del archivo según los saltos de línea de su primer MB, con 5 % de margen
+
+        Es una cota aproximada (las filas pueden variar de largo): si el
+        archivo trae más, _copiar_bloque hace crecer las columnas.
+        """
+        with open(self.filepath, 'rb') as f:
+            muestra = f.read(MUESTRA_BYTES)
+        return int(muestra.count(b'\n') * total / max(len(muestra), 1) * 1.05)
+
+    @staticmethod
+    def _copiar_bloque(columnas, chunk, inicio, capacidad):
+        """Copia el bloque a partir de la fila inicio; retorna la próxima fila libre
+
+        Si un bloque trae un tipo distinto (p. ej. NaN en una columna entera)
+        la columna se convierte al tipo común, con el mismo criterio que
+        pd.concat; si no entra en lo reservado, la columna crece a capacidad
+        filas.
+        """
+        import numpy as np
+
+        fin = inicio + len(chunk)
+        for col, destino in columnas.items():
+            valores = chunk[col].to_numpy()
+            tipo = destino.dtype
+            if valores.dtype != tipo:
+                numericos = tipo.kind in 'iuf' and valores.dtype.kind in 'iuf'
+                tipo = np.result_type(tipo, valores.dtype) if numericos else np.dtype(object)
+            if tipo != destino.dtype or fin > len(destino):
+                tamaño = len(destino) if fin <= len(destino) else max(fin, capacidad)
+                nuevo = np.empty(tamaño, dtype=tipo)
+                nuevo[:inicio] = destino[:inicio]
+                destino = columnas[col] = nuevo
+            destino[inicio:fin] = valores
+        return fin
+
+    def _read_excel(self):
+        """Lee el Excel (no admite bloques): vista previa con nrows y luego el archivo entero."""
+        import pandas as pd
+
+        total = os.path.getsize(self.filepath)
+        self._notify(self.on_preview, pd.read_excel(self.filepath, nrows=self.preview_rows))
+        if self.cancelled:
+            return None
+
+        df = pd.read_excel(self.filepath)
+        if self.cancelled:
+            return None
+        self._notify(self.on_progress, total, total)
+        return df
+
+    @staticmethod
+    def _notify(callback, *args):
+        if callback is not None:
+            callback(*args)
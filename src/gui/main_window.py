@@ -5,20 +5,22 @@ Ventana principal de la aplicación.
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
+import importlib
 import os
 import sys
-import pandas as pd
 from pathlib import Path
 
 # Añadir el directorio raíz al path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.gui.styles import *
-from src.gui.components import DropZone, MetricCard, ProgressFrame, DataPreviewTable
-from src.data_processor import DataProcessor
-from src.analyzer import SalesAnalyzer
-from src.visualizer import SalesVisualizer
-from src.database import DatabaseManager
+from src.gui.components import DropZone, MetricCard, ProgressFrame, DataPreviewTable, LoadingFrame
+from src.gui.loader import FileLoader
+
+# pandas y los módulos de análisis se importan en los métodos que los usan
+# (y se precargan en segundo plano al abrir la ventana); matplotlib/seaborn
+# solo al generar gráficos y openpyxl al exportar a Excel
+MODULOS_PRECARGA = ('pandas', 'src.data_processor', 'src.analyzer', 'src.database')
 
 
 class MainWindow:
@@ -35,6 +37,7 @@ class MainWindow:
         self.df = None
         self.processed_df = None
         self.results = {}
+        self.file_loader = None
         
         # Configurar estilo
         self.setup_styles()
@@ -44,6 +47,23 @@ class MainWindow:
         
         # Centrar ventana
         self.center_window()
+        
+        # Importar pandas y el análisis mientras el usuario elige un archivo
+        self.root.after(100, self.start_preload)
+    
+    def start_preload(self):
+        """Importa en un thread los módulos pesados que usará el análisis."""
+        thread = threading.Thread(target=self.preload_modules)
+        thread.daemon = True
+        thread.start()
+    
+    def preload_modules(self):
+        """Importa MODULOS_PRECARGA; los errores se informan al usarlos."""
+        for modulo in MODULOS_PRECARGA:
+            try:
+                importlib.import_module(modulo)
+            except ImportError:
+                return
     
     def setup_styles(self):
         """Configura los estilos de ttk."""
@@ -503,21 +523,82 @@ class MainWindow:
             )
             return
         
-        try:
-            # Cargar datos
-            if ext == '.csv':
-                self.df = pd.read_csv(filepath)
-            else:
-                self.df = pd.read_excel(filepath)
-            
-            self.current_file = filepath
-            self.show_preview_view()
-            
-        except Exception as e:
-            messagebox.showerror(
-                "Error al cargar archivo",
-                f"No se pudo cargar el archivo:\n{str(e)}"
-            )
+        # Cargar datos en un thread para no bloquear la ventana
+        self.start_file_load(filepath)
+    
+    def start_file_load(self, filepath):
+        """Muestra la vista de carga y lee el archivo en segundo plano."""
+        # Si otra carga sigue en curso se cancela: sus callbacks ya no aplican
+        if self.file_loader is not None:
+            self.file_loader.cancel()
+        self.clear_content()
+        
+        self.loading_frame = LoadingFrame(
+            self.content_frame,
+            os.path.basename(filepath),
+            on_cancel=self.cancel_file_load
+        )
+        self.loading_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Los callbacks llegan desde el thread de carga: se pasan al hilo de Tk
+        loader = FileLoader(filepath)
+        loader.on_preview = lambda df: self.root.after(0, self.on_load_preview, loader, df)
+        loader.on_progress = lambda leidos, total: self.root.after(0, self.on_load_progress, loader, leidos, total)
+        loader.on_done = lambda df: self.root.after(0, self.on_load_done, loader, df)
+        loader.on_error = lambda e: self.root.after(0, self.on_load_error, loader, e)
+        loader.on_cancel = lambda: self.root.after(0, self.on_load_cancelled, loader)
+        self.file_loader = loader
+        loader.start()
+    
+    def cancel_file_load(self):
+        """Cancela la carga en curso."""
+        if self.file_loader is not None:
+            self.file_loader.cancel()
+            self.loading_frame.set_cancelling()
+    
+    def on_load_preview(self, loader, df):
+        """Muestra el primer bloque del archivo."""
+        if loader is self.file_loader and not loader.cancelled:
+            self.loading_frame.show_preview(df)
+    
+    def on_load_progress(self, loader, leidos, total):
+        """Actualiza la barra de carga."""
+        if loader is self.file_loader and not loader.cancelled:
+            self.loading_frame.update_progress(leidos, total)
+    
+    def on_load_done(self, loader, df):
+        """Archivo cargado: pasa a la vista previa con opciones."""
+        if loader is not self.file_loader:
+            return
+        if loader.cancelled:
+            # Se canceló con el resultado ya en camino: se descarta
+            self.on_load_cancelled(loader)
+            return
+        self.file_loader = None
+        self.df = df
+        self.current_file = loader.filepath
+        self.show_preview_view()
+    
+    def on_load_error(self, loader, error):
+        """Informa el error de carga y vuelve a la vista inicial."""
+        if loader is not self.file_loader:
+            return
+        if loader.cancelled:
+            self.on_load_cancelled(loader)
+            return
+        self.file_loader = None
+        messagebox.showerror(
+            "Error al cargar archivo",
+            f"No se pudo cargar el archivo:\n{str(error)}"
+        )
+        self.show_upload_view()
+    
+    def on_load_cancelled(self, loader):
+        """Carga cancelada: vuelve a la vista inicial."""
+        if loader is not self.file_loader:
+            return
+        self.file_loader = None
+        self.show_upload_view()
     
     def start_analysis(self):
         """Inicia el análisis en un thread separado."""
@@ -531,6 +612,10 @@ class MainWindow:
     def run_analysis(self):
         """Ejecuta el análisis de datos."""
         try:
+            from src.data_processor import DataProcessor
+            from src.analyzer import SalesAnalyzer
+            from src.database import get_database
+            
             # 1. Limpieza de datos
             self.update_progress("Limpiando datos...")
             processor = DataProcessor()
@@ -560,7 +645,7 @@ class MainWindow:
             
             # 3. Guardar en base de datos
             self.update_progress("Guardando en base de datos...")
-            db_manager = DatabaseManager()
+            db_manager = get_database()
             db_manager.insert_ventas_data(self.processed_df)
             self.log_step("Datos guardados en BD", success=True)
             
@@ -568,10 +653,15 @@ class MainWindow:
             graficos_paths = []
             if self.option_graficos.get():
                 self.update_progress("Generando gráficos...")
-                visualizer = SalesVisualizer()
-                # Generar gráficos desde la BD
-                path1 = visualizer.generar_grafico_mensual('facturacion_mensual.png')
-                path2 = visualizer.generar_grafico_productos(top_n=5)
+                from src.visualizer import SalesVisualizer
+                visualizer = SalesVisualizer(db=db_manager)
+                # Generar gráficos con los agregados ya calculados (sin volver a consultar la BD)
+                path1 = visualizer.generar_grafico_mensual(
+                    'facturacion_mensual.png', datos=analyzer.facturacion_por_mes()
+                )
+                path2 = visualizer.generar_grafico_productos(
+                    top_n=5, datos=analyzer.get_top_productos_cantidad(5)
+                )
                 graficos_paths = [path1, path2]
                 self.log_step(f"{len(graficos_paths)} gráficos generados", success=True)
             
@@ -615,6 +705,8 @@ class MainWindow:
     
     def export_to_excel(self, stats):
         """Exporta los resultados a Excel."""
+        import pandas as pd
+        
         output_dir = Path("output")
         output_dir.mkdir(exist_ok=True)
         
@@ -0,0 +1,236 @@
+"""
+Agregación paralela del cubo producto × mes para DataFrames muy grandes.
+
+El proceso principal solo copia las columnas a memoria compartida (fecha,
+códigos de producto y las medidas en float64); cada proceso del pool calcula
+los meses y las claves de su rango de filas y los suma con np.bincount, y el
+proceso principal combina los parciales, que tienen a lo sumo productos ×
+meses entradas. Si producto no es categórico (DataProcessor lo carga como
+category) se factoriza una vez en el proceso principal: enviar los textos a
+los procesos cuesta más que factorizarlos.
+
+Los procesos se crean con spawn, como en SalesVisualizer.render_batch: el
+análisis puede lanzarse desde la GUI, que tiene hilos vivos, y fork no es
+seguro en ese caso. Este módulo importa pandas solo en el proceso principal
+para que los procesos arranquen rápido.
+
+Como en la ruta serial (groupby con dropna=False), las filas sin producto o
+sin fecha forman grupos con clave nula y los valores nulos de las medidas
+suman cero. El índice y los tipos de columna son los de la ruta serial. Los
+conteos y cantidades son exactos (cantidades enteras hasta 2**53 por grupo).
+Los totales en punto flotante pueden diferir en el redondeo: groupby suma con
+compensación de Kahan y np.bincount sin ella, así que para un grupo de n
+filas |total_paralelo - total_serial| <= n * eps * suma(|total|), con
+eps = np.finfo(float).eps.
+"""
+
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+
+# Por debajo de este número de filas el costo de lanzar procesos y copiar a
+# memoria compartida supera la ganancia; SalesAnalyzer usa la ruta serial.
+PARALLEL_MIN_ROWS = 5_000_000
+
+
+def resolve_n_jobs(n_jobs):
+    """Normaliza n_jobs: None o 1 = serial, -1 = todos los núcleos"""
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return max(1, n_jobs)
+
+
+class _SharedColumns:
+    """Copia arreglos NumPy a bloques de memoria compartida y los libera al salir"""
+
+    def __init__(self, **arrays):
+        self.blocks = []
+        self.specs = {}
+        try:
+            for nombre, array in arrays.items():
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self.blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+                self.specs[nombre] = (block.name, array.shape, array.dtype.str)
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+def _partial_cube(specs, inicio, fin, n_productos):
+    """Suma cantidad, total y ventas por (producto, mes) en las filas [inicio, fin)
+
+    Retorna (mes_min, n_meses, claves, cantidad, total, ventas) solo con las
+    claves presentes. La clave es código_producto * (n_meses + 1) + mes,
+    con n_productos como código de producto nulo y n_meses como mes nulo.
+    """
+    blocks = []
+    try:
+        columnas = {}
+        for nombre, (shm_name, shape, dtype) in specs.items():
+            block = shared_memory.SharedMemory(name=shm_name)
+            blocks.append(block)
+            columnas[nombre] = np.ndarray(shape, dtype=dtype, buffer=block.buf)[inicio:fin]
+
+        # Meses desde 1970-01, que es el ordinal de Period con frecuencia 'M'
+        fechas = columnas['fecha']
+        nat = np.isnat(fechas)
+        ordinales = fechas.astype('datetime64[M]').astype(np.int64)
+        if nat.all():
+            mes_min, n_meses = 0, 0
+        else:
+            validos = ordinales[~nat]
+            mes_min = int(validos.min())
+            n_meses = int(validos.max()) - mes_min + 1
+        codigos_mes = np.where(nat, n_meses, ordinales - mes_min)
+        codigos = columnas['producto'].astype(np.int64)
+        codigos[codigos < 0] = n_productos
+
+        claves = codigos * (n_meses + 1) + codigos_mes
+        n_claves = (n_productos + 1) * (n_meses + 1)
+        ventas = np.bincount(claves, minlength=n_claves)
+        cantidad = np.bincount(claves, weights=columnas['cantidad'], minlength=n_claves)
+        total = np.bincount(claves, weights=columnas['total'], minlength=n_claves)
+        # Soltar las vistas antes de cerrar los bloques
+        del fechas, columnas
+
+        presentes = np.flatnonzero(ventas)
+        return mes_min, n_meses, presentes, cantidad[presentes], total[presentes], ventas[presentes]
+    finally:
+        for block in blocks:
+            block.close()
+
+
+def _row_ranges(filas, partes):
+    """Divide [0, filas) en rangos contiguos de tamaño similar"""
+    limites = np.linspace(0, filas, partes + 1, dtype=np.int64)
+    return [(int(a), int(b)) for a, b in zip(limites[:-1], limites[1:]) if b > a]
+
+
+def _combinar(parciales, n_productos):
+    """Combina los parciales en arreglos densos sobre los meses de todos ellos
+
+    Retorna (meses, cantidad, total, ventas) con la clave
+    código_producto * len(meses) + mes; el último mes es NaT.
+    """
+    import pandas as pd
+
+    con_fecha = [(mes_min, n_meses) for mes_min, n_meses, *_ in parciales if n_meses]
+    mes_min = min((m for m, _ in con_fecha), default=0)
+    mes_fin = max((m + n for m, n in con_fecha), default=0)
+    n_meses = mes_fin - mes_min
+    n_claves = (n_productos + 1) * (n_meses + 1)
+
+    cantidad = np.zeros(n_claves)
+    total = np.zeros(n_claves)
+    ventas = np.zeros(n_claves, dtype=np.int64)
+    # En el orden de los rangos para que el resultado sea determinista
+    for parcial_min, parcial_meses, claves, parcial_cantidad, parcial_total, parcial_ventas in parciales:
+        codigos_producto, codigos_mes = np.divmod(claves, parcial_meses + 1)
+        codigos_mes = np.where(codigos_mes == parcial_meses, n_meses, codigos_mes + parcial_min - mes_min)
+        globales = codigos_producto * (n_meses + 1) + codigos_mes
+        cantidad += np.bincount(globales, weights=parcial_cantidad, minlength=n_claves)
+        total += np.bincount(globales, weights=parcial_total, minlength=n_claves)
+        ventas += np.bincount(globales, weights=parcial_ventas, minlength=n_claves).astype(np.int64)
+
+    meses = np.append(np.arange(mes_min, mes_fin), pd.NaT.value)
+    return meses, cantidad, total, ventas
+
+
+def _tipo_de_suma(sumas, dtype):
+    """Convierte sumas exactas al tipo que da groupby().sum() para una columna de tipo dtype
+
+    groupby conserva el tipo entero de la columna si las sumas caben en él
+    y, si no, usa el entero de 64 bits del mismo signo.
+    """
+    import pandas as pd
+
+    if not pd.api.types.is_integer_dtype(dtype):
+        return pd.array(sumas, dtype=dtype) if pd.api.types.is_float_dtype(dtype) else sumas
+    unsigned = pd.api.types.is_unsigned_integer_dtype(dtype)
+    enteros = np.rint(sumas).astype(np.uint64 if unsigned else np.int64)
+    info = np.iinfo(getattr(dtype, 'numpy_dtype', dtype))
+    if len(enteros) and (enteros.min() < info.min or enteros.max() > info.max):
+        if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+            dtype = 'UInt64' if unsigned else 'Int64'
+        else:
+            dtype = np.uint64 if unsigned else np.int64
+    return pd.array(enteros, dtype=dtype)
+
+
+def parallel_cubo(df, n_jobs):
+    """Agregado producto × mes calculado en un pool de procesos
+
+    Produce el mismo DataFrame que la ruta serial de SalesAnalyzer: índice
+    (producto, año_mes) con las columnas cantidad, total y ventas, con los
+    mismos tipos (ver el docstring del módulo sobre el redondeo de total).
+    """
+    import pandas as pd
+
+    n_jobs = resolve_n_jobs(n_jobs)
+    if len(df) == 0:
+        raise ValueError("No hay datos para agregar")
+
+    if isinstance(df['producto'].dtype, pd.CategoricalDtype):
+        codigos_producto = df['producto'].cat.codes.to_numpy()
+        productos = df['producto'].dtype
+    else:
+        codigos_producto, categorias = pd.factorize(df['producto'], sort=True)
+        productos = pd.CategoricalDtype(categorias)
+    n_productos = len(productos.categories)
+
+    fechas = df['fecha']
+    if fechas.dt.tz is not None:
+        # to_period usa la hora local de cada fecha
+        fechas = fechas.dt.tz_localize(None)
+
+    rangos = _row_ranges(len(df), n_jobs)
+    with _SharedColumns(
+        fecha=fechas.to_numpy(),
+        producto=codigos_producto,
+        cantidad=df['cantidad'].to_numpy(dtype=np.float64, na_value=0.0),
+        total=df['total'].to_numpy(dtype=np.float64, na_value=0.0)
+    ) as shared:
+        # spawn: el proceso que llama puede tener hilos (GUI) y fork no es seguro
+        with ProcessPoolExecutor(max_workers=len(rangos), mp_context=get_context('spawn')) as pool:
+            futures = [
+                pool.submit(_partial_cube, shared.specs, inicio, fin, n_productos)
+                for inicio, fin in rangos
+            ]
+            parciales = [future.result() for future in futures]
+
+    meses, cantidad, total, ventas = _combinar(parciales, n_productos)
+    presentes = np.flatnonzero(ventas)
+    codigos_producto, codigos_mes = np.divmod(presentes, len(meses))
+    # El código extra (producto nulo) vuelve a ser -1
+    codigos_producto = np.where(codigos_producto == n_productos, -1, codigos_producto)
+    index = pd.MultiIndex.from_arrays(
+        [
+            # Categórico si la columna lo es; si no, las etiquetas (como groupby)
+            pd.CategoricalIndex(pd.Categorical.from_codes(codigos_producto, dtype=productos))
+            if isinstance(df['producto'].dtype, pd.CategoricalDtype)
+            else productos.categories.take(codigos_producto, allow_fill=True, fill_value=np.nan),
+            pd.PeriodIndex.from_ordinals(meses[codigos_mes], freq='M'),
+        ],
+        names=['producto', 'año_mes']
+    )
+    return pd.DataFrame({
+        'cantidad': _tipo_de_suma(cantidad[presentes], df['cantidad'].dtype),
+        'total': _tipo_de_suma(total[presentes], df['total'].dtype),
+        'ventas': ventas[presentes]
+    }, index=index)
@@ -0,0 +1,406 @@
+"""
+Almacenamiento de ventas particionado por mes.
+
+Cada mes vive en su propia tabla (ventas_pAAAA_MM) con sus índices; la tabla
+particiones_ventas hace de catálogo (filas y facturación de cada partición)
+y la vista ventas_particionadas une las particiones activas. Las particiones
+se derivan de la tabla ventas, que sigue siendo la fuente de las filas: toda
+escritura pasa por ventas y reconstruye desde ella los meses afectados. Las
+consultas por rango de fechas solo leen las particiones del rango, recargar
+un mes reescribe solo su tabla y los meses antiguos pueden archivarse en
+archivos SQLite por año que se adjuntan (ATTACH) cuando se consultan.
+"""
+
+import os
+import pandas as pd
+from .database import (
+    VENTAS_COLUMNS, VENTAS_GENERATED_COLUMNS, DatabaseManager, get_database
+)
+
+PARTICION_PREFIX = 'ventas_p'
+VISTA_PARTICIONES = 'ventas_particionadas'
+
+# Índices de cada partición (sufijo -> columnas). fecha sirve los rangos
+# parciales dentro de un mes; el segundo cubre las agregaciones por producto.
+PARTICION_INDEXES = {
+    'fecha': 'fecha',
+    'producto': 'producto, cantidad, total, precio_unitario',
+}
+
+DEFAULT_ARCHIVE_DIR = "output/database/archivo"
+
+
+def _periodo(valor):
+    """Normaliza 'AAAA-MM', fechas o Periods a pd.Period mensual"""
+    return pd.Period(valor, freq='M')
+
+
+def _tabla(periodo):
+    return f"{PARTICION_PREFIX}{periodo.year:04d}_{periodo.month:02d}"
+
+
+class PartitionedVentasStore:
+    """Tabla de ventas particionada por mes sobre la base de un DatabaseManager"""
+
+    def __init__(self, db=None, archive_dir=DEFAULT_ARCHIVE_DIR):
+        self.db = db if db is not None else get_database()
+        self.archive_dir = archive_dir
+        self.create_tables()
+
+    def create_tables(self):
+        """Crea el catálogo de particiones y la vista de unión (lo llama __init__)"""
+        with self.db.get_connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS particiones_ventas (
+                    periodo TEXT PRIMARY KEY,
+                    tabla TEXT NOT NULL,
+                    archivo TEXT,
+                    filas INTEGER NOT NULL,
+                    facturacion_total REAL NOT NULL,
+                    actualizado TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            self._refresh_view(conn)
+
+    def particiones(self, desde=None, hasta=None):
+        """Catálogo de particiones con desde <= periodo < hasta"""
+        query = '''
+            SELECT periodo, tabla, archivo, filas, facturacion_total
+            FROM particiones_ventas
+            WHERE (? IS NULL OR periodo >= ?) AND (? IS NULL OR periodo < ?)
+            ORDER BY periodo
+        '''
+        desde = str(_periodo(desde)) if desde is not None else None
+        hasta = str(_periodo(hasta)) if hasta is not None else None
+        with self.db.get_connection() as conn:
+            return pd.read_sql_query(query, conn, params=(desde, desde, hasta, hasta))
+
+    # --- Escritura -------------------------------------------------------
+
+    def load(self, df):
+        """Agrega ventas a la tabla ventas y actualiza las particiones de sus meses
+
+        ventas es la única fuente de las filas: las particiones de los meses
+        presentes en df se reconstruyen desde ella (como sync_months), en la
+        misma transacción. Los meses archivados se rechazan con ValueError.
+        Retorna el número de filas insertadas.
+        """
+        if len(df) == 0:
+            return 0
+        meses = set(df['fecha'].dt.to_period('M').dropna())
+        archivados = sorted(str(periodo) for periodo in meses if self._archivada(periodo))
+        if archivados:
+            raise ValueError(
+                f"Las particiones {', '.join(archivados)} están archivadas; restaurarlas antes de cargarlas"
+            )
+
+        with self.db.get_connection() as conn:
+            conn.execute("BEGIN")
+            try:
+                desde_id = DatabaseManager._max_venta_id(conn)
+                DatabaseManager._insert_ventas(conn, df)
+                self.db._refresh_resumenes(conn, desde_id)
+                self._sync(conn, meses)
+                DatabaseManager._bump_data_version(conn)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return len(df)
+
+    def replace_month(self, periodo, df):
+        """Reemplaza por completo el contenido de un mes sin reescribir los demás
+
+        Reemplaza las filas del mes en ventas y reconstruye solo su partición.
+        """
+        periodo = _periodo(periodo)
+        fuera = df['fecha'].dt.to_period('M') != periodo
+        if fuera.any():
+            raise ValueError(f"{int(fuera.sum())} filas no pertenecen al mes {periodo}")
+        if self._archivada(periodo):
+            raise ValueError(f"La partición {periodo} está archivada; restaurarla antes de recargarla")
+
+        with self.db.get_connection() as conn:
+            conn.execute("BEGIN")
+            try:
+                conn.execute("DELETE FROM ventas WHERE mes = ?", (str(periodo),))
+                DatabaseManager._insert_ventas(conn, df)
+                # Se borraron filas: los resúmenes se reconstruyen completos
+                self.db._refresh_resumenes(conn)
+                self._sync(conn, [periodo])
+                DatabaseManager._bump_data_version(conn)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return len(df)
+
+    def drop_month(self, periodo):
+        """Elimina las ventas de un mes, su partición y su copia archivada, si la hay"""
+        periodo = _periodo(periodo)
+        info = self._info(periodo)
+        if info is None:
+            return False
+
+        with self.db.get_connection() as conn:
+            esquema = self._attach(conn, info['archivo'])
+            conn.execute("BEGIN")
+            try:
+                conn.execute("DELETE FROM ventas WHERE mes = ?", (str(periodo),))
+                self.db._refresh_resumenes(conn)
+                conn.execute(f"DROP TABLE IF EXISTS {esquema}.{info['tabla']}")
+                conn.execute("DELETE FROM particiones_ventas WHERE periodo = ?", (str(periodo),))
+                self._refresh_view(conn)
+                DatabaseManager._bump_data_version(conn)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return True
+
+    def sync_months(self, meses):
+        """Reconstruye desde la tabla ventas las particiones de los meses dados
+
+        Lo usa DatabaseManager.insert_ventas_data(particionar=True): cada mes
+        queda con las mismas filas que ventas (leídas por idx_ventas_mes) y se
+        elimina si ventas ya no tiene filas de ese mes. Los meses archivados
+        no se modifican. Retorna los periodos actualizados.
+        """
+        with self.db.get_connection() as conn:
+            conn.execute("BEGIN")
+            try:
+                actualizados = self._sync(conn, meses)
+                DatabaseManager._bump_data_version(conn)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return actualizados
+
+    def _sync(self, conn, meses):
+        """sync_months dentro de la transacción actual"""
+        columnas = ', '.join(VENTAS_COLUMNS)
+        actualizados = []
+        for periodo in sorted({_periodo(mes) for mes in meses}):
+            tabla = _tabla(periodo)
+            row = conn.execute(
+                "SELECT archivo FROM particiones_ventas WHERE periodo = ?", (str(periodo),)
+            ).fetchone()
+            if row is not None and row[0] is not None:
+                print(f"La partición {periodo} está archivada; no se actualiza")
+                continue
+            conn.execute(f"DROP TABLE IF EXISTS main.{tabla}")
+            filas = conn.execute(
+                "SELECT COUNT(*) FROM ventas WHERE mes = ?", (str(periodo),)
+            ).fetchone()[0]
+            if filas == 0:
+                conn.execute("DELETE FROM particiones_ventas WHERE periodo = ?", (str(periodo),))
+            else:
+                self._create_partition(conn, 'main', tabla)
+                conn.execute(
+                    f"INSERT INTO main.{tabla} ({columnas}) SELECT {columnas} FROM ventas WHERE mes = ?",
+                    (str(periodo),)
+                )
+                self._update_catalog(conn, periodo, 'main', tabla, archivo=None)
+            actualizados.append(str(periodo))
+        self._refresh_view(conn)
+        return actualizados
+
+    @staticmethod
+    def _create_partition(conn, esquema, tabla):
+        generated = ', '.join(f"{name} {definition}" for name, definition in VENTAS_GENERATED_COLUMNS.items())
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {esquema}.{tabla} (
+                id INTEGER PRIMARY KEY,
+                fecha DATE,
+                producto TEXT,
+                cantidad INTEGER,
+                precio_unitario REAL,
+                total REAL,
+                {generated}
+            )
+        ''')
+        for sufijo, columnas in PARTICION_INDEXES.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {esquema}.idx_{tabla}_{sufijo} ON {tabla} ({columnas})")
+
+    @staticmethod
+    def _update_catalog(conn, periodo, esquema, tabla, archivo):
+        """Recalcula filas y facturación de una partición (costo de un solo mes)"""
+        filas, facturacion = conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(total), 0) FROM {esquema}.{tabla}"
+        ).fetchone()
+        conn.execute('''
+            INSERT INTO particiones_ventas (periodo, tabla, archivo, filas, facturacion_total)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (periodo) DO UPDATE SET
+                tabla = excluded.tabla,
+                archivo = excluded.archivo,
+                filas = excluded.filas,
+                facturacion_total = excluded.facturacion_total,
+                actualizado = CURRENT_TIMESTAMP
+        ''', (str(periodo), tabla, archivo, filas, facturacion))
+
+    @staticmethod
+    def _refresh_view(conn):
+        """Recrea la vista de unión sobre las particiones activas (no archivadas)
+
+        Una vista persistente no puede referirse a bases adjuntas, por eso las
+        particiones archivadas se consultan con read_range / resumen_productos.
+        """
+        tablas = [row[0] for row in conn.execute(
+            "SELECT tabla FROM particiones_ventas WHERE archivo IS NULL ORDER BY periodo"
+        )]
+        conn.execute(f"DROP VIEW IF EXISTS {VISTA_PARTICIONES}")
+        columnas = ', '.join(['fecha', 'producto', 'cantidad', 'precio_unitario', 'total', *VENTAS_GENERATED_COLUMNS])
+        if tablas:
+            union = ' UNION ALL '.join(f"SELECT {columnas} FROM {tabla}" for tabla in tablas)
+        else:
+            # Vista vacía con las mismas columnas
+            union = f"SELECT {', '.join(f'NULL AS {c}' for c in columnas.split(', '))} WHERE 0"
+        conn.execute(f"CREATE VIEW {VISTA_PARTICIONES} AS {union}")
+
+    def _info(self, periodo):
+        with self.db.get_connection() as conn:
+            row = conn.execute(
+                "SELECT tabla, archivo FROM particiones_ventas WHERE periodo = ?", (str(periodo),)
+            ).fetchone()
+        return None if row is None else {'tabla': row[0], 'archivo': row[1]}
+
+    def _archivada(self, periodo):
+        info = self._info(periodo)
+        return info is not None and info['archivo'] is not None
+
+    # --- Consultas por rango ---------------------------------------------
+
+    def _union_rango(self, conn, desde, hasta, columnas):
+        """SELECT UNION ALL solo sobre las particiones que intersecan [desde, hasta)"""
+        partes = []
+        params = []
+        inicio = pd.Timestamp(desde).strftime('%Y-%m-%d %H:%M:%S') if desde is not None else None
+        fin = pd.Timestamp(hasta).strftime('%Y-%m-%d %H:%M:%S') if hasta is not None else None
+
+        # hasta es exclusivo: el mes de hasta entra solo si hasta no es su primer instante
+        periodo_hasta = None
+        if hasta is not None:
+            periodo_hasta = _periodo(hasta)
+            if pd.Timestamp(hasta) > periodo_hasta.start_time:
+                periodo_hasta += 1
+        particiones = self.particiones(desde, periodo_hasta)
+
+        # Solo los límites indicados, para que cada partición busque por idx_*_fecha
+        condiciones = []
+        limites = []
+        if inicio is not None:
+            condiciones.append('fecha >= ?')
+            limites.append(inicio)
+        if fin is not None:
+            condiciones.append('fecha < ?')
+            limites.append(fin)
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ''
+
+        for periodo, tabla, archivo in particiones[['periodo', 'tabla', 'archivo']].itertuples(index=False):
+            esquema = self._attach(conn, archivo)
+            partes.append(f"SELECT {columnas} FROM {esquema}.{tabla} {where}")
+            params += limites
+        return ' UNION ALL '.join(partes), params
+
+    def read_range(self, desde=None, hasta=None):
+        """Ventas con desde <= fecha < hasta, leyendo solo las particiones del rango"""
+        columnas = ', '.join(VENTAS_COLUMNS)
+        with self.db.get_connection() as conn:
+            union, params = self._union_rango(conn, desde, hasta, columnas)
+            if not union:
+                return pd.DataFrame(columns=VENTAS_COLUMNS)
+            df = pd.read_sql_query(f"{union} ORDER BY fecha", conn, params=params)
+        df['fecha'] = pd.to_datetime(df['fecha'])
+        return df
+
+    def resumen_productos(self, desde=None, hasta=None):
+        """Cantidad, facturación y ventas por producto en un rango de fechas"""
+        with self.db.get_connection() as conn:
+            union, params = self._union_rango(conn, desde, hasta, 'producto, cantidad, total')
+            if not union:
+                return pd.DataFrame(columns=['producto', 'cantidad_total', 'facturacion_total', 'numero_ventas'])
+            return pd.read_sql_query(f'''
+                SELECT producto, SUM(cantidad) as cantidad_total,
+                       SUM(total) as facturacion_total, COUNT(*) as numero_ventas
+                FROM ({union})
+                GROUP BY producto
+                ORDER BY facturacion_total DESC, producto
+            ''', conn, params=params)
+
+    def facturacion_mensual(self, desde=None, hasta=None):
+        """Facturación por mes leída del catálogo (no recorre ninguna partición)"""
+        return self.particiones(desde, hasta)[['periodo', 'facturacion_total']].rename(
+            columns={'periodo': 'mes'}
+        )
+
+    # --- Archivo y compactación ------------------------------------------
+
+    def _archive_path(self, year):
+        return os.path.join(self.archive_dir, f"ventas_{year:04d}.db")
+
+    @staticmethod
+    def _alias(archivo):
+        return 'archivo_' + os.path.splitext(os.path.basename(archivo))[0]
+
+    def _attach(self, conn, archivo):
+        """Adjunta el archivo a la conexión si hace falta; retorna el esquema a usar"""
+        if archivo is None:
+            return 'main'
+        alias = self._alias(archivo)
+        adjuntas = {row[1] for row in conn.execute("PRAGMA database_list")}
+        if alias not in adjuntas:
+            conn.execute("ATTACH DATABASE ? AS " + alias, (archivo,))
+        return alias
+
+    def archive(self, hasta, vacuum=True):
+        """Mueve las particiones con periodo < hasta a archivos SQLite por año
+
+        Cada partición se copia a su archivo y se elimina de la base
+        principal en una transacción (las filas siguen en ventas); con
+        vacuum=True se compacta la base principal para liberar el espacio.
+        Retorna los periodos archivados.
+        """
+        pendientes = self.particiones(hasta=hasta)
+        pendientes = pendientes[pendientes['archivo'].isna()]
+        if pendientes.empty:
+            return []
+        os.makedirs(self.archive_dir, exist_ok=True)
+
+        archivados = []
+        with self.db.get_connection() as conn:
+            for periodo, tabla in pendientes[['periodo', 'tabla']].itertuples(index=False):
+                archivo = self._archive_path(_periodo(periodo).year)
+                # ATTACH no puede ejecutarse dentro de una transacción
+                esquema = self._attach(conn, archivo)
+                conn.execute("BEGIN")
+                try:
+                    conn.execute(f"DROP TABLE IF EXISTS {esquema}.{tabla}")
+                    self._create_partition(conn, esquema, tabla)
+                    columnas = ', '.join(['id', *VENTAS_COLUMNS])
+                    conn.execute(f"INSERT INTO {esquema}.{tabla} ({columnas}) SELECT {columnas} FROM main.{tabla}")
+                    conn.execute(f"DROP TABLE main.{tabla}")
+                    self._update_catalog(conn, periodo, esquema, tabla, archivo)
+                    self._refresh_view(conn)
+                    DatabaseManager._bump_data_version(conn)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                archivados.append(periodo)
+
+        if vacuum:
+            self.compact()
+        print(f"Particiones archivadas: {len(archivados)}")
+        return archivados
+
+    def compact(self):
+        """Compacta (VACUUM) la base principal y los archivos adjuntos"""
+        with self.db.get_connection() as conn:
+            archivos = [row[0] for row in conn.execute(
+                "SELECT DISTINCT archivo FROM particiones_ventas WHERE archivo IS NOT NULL"
+            )]
+            conn.execute("VACUUM")
+            for archivo in archivos:
+                conn.execute(f"VACUUM {self._attach(conn, archivo)}")
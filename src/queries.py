@@ -0,0 +1,134 @@
+"""
+Registro de consultas con nombre cargadas desde sql/queries.sql.
+
+El archivo se lee y se separa una sola vez; cada consulta se ejecuta siempre
+con el mismo texto SQL y sus parámetros enlazados, de modo que sqlite3 reusa
+la sentencia ya compilada de su caché por conexión (las conexiones de
+DatabaseManager se reutilizan por hilo).
+
+Los filtros opcionales "(:param IS NULL OR condición)" se resuelven antes de
+ejecutar: queda la condición si el parámetro tiene valor y 1 si no. Así el
+planificador de SQLite ve "fecha >= ?" (puede buscar por rango en el índice)
+o ningún filtro (los índices de cobertura siguen siéndolo), en lugar de un OR
+que le impide usar ambos. Hay un texto SQL por combinación de parámetros.
+"""
+
+import os
+import re
+import threading
+import pandas as pd
+
+DEFAULT_QUERIES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sql', 'queries.sql'
+)
+
+# Parámetros de fecha: se convierten al formato de texto de la columna fecha
+PARAMETROS_FECHA = ('desde', 'hasta')
+
+_NAME_TAG = re.compile(r'^--\s*name:\s*(\w+)\s*$', re.MULTILINE)
+_PARAMETRO = re.compile(r'(?<![:\w]):([A-Za-z_]\w*)')
+_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_FILTRO_OPCIONAL = re.compile(r'\(\s*:(\w+)\s+IS\s+NULL\s+OR\s+([^()]*?)\s*\)', re.IGNORECASE)
+
+
+class NamedQuery:
+    """Consulta del registro: nombre, descripción, SQL y parámetros que usa"""
+
+    def __init__(self, name, sql, descripcion=''):
+        self.name = name
+        self.sql = sql
+        self.descripcion = descripcion
+        sin_literales = _LITERAL.sub("''", sql)
+        self.parametros = tuple(dict.fromkeys(_PARAMETRO.findall(sin_literales)))
+        self._variantes = {}
+
+    def bind(self, params):
+        """Arma el diccionario de parámetros; los no indicados quedan en NULL"""
+        desconocidos = set(params) - set(self.parametros)
+        if desconocidos:
+            raise ValueError(f"Parámetros no usados por {self.name}: {', '.join(sorted(desconocidos))}")
+
+        bound = dict.fromkeys(self.parametros)
+        for nombre, valor in params.items():
+            if nombre in PARAMETROS_FECHA and valor is not None:
+                valor = pd.Timestamp(valor).strftime('%Y-%m-%d %H:%M:%S')
+            bound[nombre] = valor
+        return bound
+
+    def render(self, bound):
+        """SQL con solo los filtros opcionales cuyos parámetros tienen valor"""
+        presentes = frozenset(nombre for nombre, valor in bound.items() if valor is not None)
+        sql = self._variantes.get(presentes)
+        if sql is None:
+            sql = self._variantes[presentes] = _FILTRO_OPCIONAL.sub(
+                lambda m: m.group(2) if m.group(1) in presentes else '1', self.sql
+            )
+        return sql
+
+
+class QueryRegistry:
+    """Consultas con nombre de un archivo .sql (etiquetas "-- name: ...")"""
+
+    def __init__(self, path=DEFAULT_QUERIES_PATH):
+        self.path = path
+        with open(path, encoding='utf-8') as f:
+            self.queries = self.parse(f.read())
+
+    @staticmethod
+    def parse(texto):
+        """Separa el texto en NamedQuery según las etiquetas -- name:"""
+        etiquetas = list(_NAME_TAG.finditer(texto))
+        queries = {}
+        for actual, siguiente in zip(etiquetas, etiquetas[1:] + [None]):
+            cuerpo = texto[actual.end():siguiente.start() if siguiente else len(texto)]
+            lineas = cuerpo.strip().splitlines()
+            comentarios = [l for l in lineas if l.startswith('--')]
+            descripcion = comentarios[0].lstrip('- ').strip() if comentarios else ''
+            sql = '\n'.join(l for l in lineas if not l.startswith('--')).strip().rstrip(';')
+            queries[actual.group(1)] = NamedQuery(actual.group(1), sql, descripcion)
+        return queries
+
+    def names(self):
+        return list(self.queries)
+
+    def __getitem__(self, name):
+        try:
+            return self.queries[name]
+        except KeyError:
+            raise KeyError(f"Consulta desconocida: {name}") from None
+
+    def run(self, db, name, dtype_backend=None, **params):
+        """Ejecuta una consulta con parámetros enlazados y retorna un DataFrame
+
+        Pasa por DatabaseManager.read_sql, que reutiliza el resultado
+        mientras la versión de los datos no cambie.
+
+        dtype_backend: None (NumPy), 'numpy_nullable' o 'pyarrow'.
+        """
+        query = self[name]
+        bound = query.bind(params)
+        return db.read_sql(query.render(bound), bound, dtype_backend)
+
+    def run_all(self, db, dtype_backend=None, **params):
+        """Ejecuta todas las consultas; a cada una se le pasan solo los parámetros que usa"""
+        return {
+            name: self.run(
+                db, name, dtype_backend,
+                **{k: v for k, v in params.items() if k in query.parametros}
+            )
+            for name, query in self.queries.items()
+        }
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_query_registry(path=DEFAULT_QUERIES_PATH):
+    """Registro compartido por ruta: el archivo .sql se lee una sola vez"""
+    path = os.path.abspath(path)
+    with _registries_lock:
+        registry = _registries.get(path)
+        if registry is None:
+            registry = _registries[path] = QueryRegistry(path)
+        return registry
@@ -0,0 +1,88 @@
+"""
+Análisis de ventas ejecutado dentro de SQLite.
+
+SQLSalesAnalyzer ofrece los mismos métodos que SalesAnalyzer pero resuelve
+cada agregación con SQL sobre las tablas de resumen que DatabaseManager
+mantiene en cada carga, sin traer la tabla ventas a pandas.
+"""
+
+import pandas as pd
+from .database import get_database
+
+
+class SQLSalesAnalyzer:
+    """Analizador sobre la base de datos (mismos resultados que SalesAnalyzer)
+
+    Los empates se resuelven por nombre de producto, igual que la ruta en
+    pandas, y cantidades y conteos coinciden exactamente. Las facturaciones
+    son sumas de REAL: SQLite las acumula sin compensación y por lotes de
+    carga, pandas con compensación de Kahan, así que para un grupo de n
+    ventas |facturación_sql - facturación_pandas| <= n * eps * suma(|total|)
+    (eps = 2**-52). Solo dos facturaciones más cercanas que esa cota pueden
+    quedar en distinto orden en los top.
+    """
+
+    def __init__(self, db=None):
+        self.db = db if db is not None else get_database()
+
+    def _fetchall(self, query, params=()):
+        with self.db.get_connection() as conn:
+            return conn.execute(query, params).fetchall()
+
+    def _top_productos(self, medida, top_n):
+        """Top N (producto, valor) de resumen_producto ordenado por medida"""
+        # medida viene de una lista cerrada, nunca de la entrada del usuario
+        filas = self._fetchall(f'''
+            SELECT producto, {medida}
+            FROM resumen_producto
+            ORDER BY {medida} DESC, producto
+            LIMIT ?
+        ''', (top_n,))
+        if not filas:
+            raise ValueError("No hay ventas en la base de datos")
+        return filas
+
+    def producto_mas_vendido(self):
+        """Calcula el producto más vendido por cantidad"""
+        producto_top, cantidad_top = self._top_productos('cantidad_total', 1)[0]
+
+        return {
+            'producto': producto_top,
+            'cantidad_total': cantidad_top
+        }
+
+    def producto_mayor_facturacion(self):
+        """Calcula el producto con mayor facturación total"""
+        producto_top, facturacion_top = self._top_productos('facturacion_total', 1)[0]
+
+        return {
+            'producto': producto_top,
+            'facturacion_total': facturacion_top
+        }
+
+    def facturacion_por_mes(self):
+        """Calcula la facturación total por mes (claves pd.Period como en SalesAnalyzer)"""
+        filas = self._fetchall('''
+            SELECT mes, facturacion_total
+            FROM resumen_mes
+            ORDER BY mes
+        ''')
+        return {pd.Period(mes, freq='M'): total for mes, total in filas}
+
+    def get_top_productos_cantidad(self, top_n=3):
+        """Obtiene los top N productos por cantidad"""
+        return dict(self._top_productos('cantidad_total', top_n))
+
+    def get_top_productos_facturacion(self, top_n=3):
+        """Obtiene los top N productos por facturación"""
+        return dict(self._top_productos('facturacion_total', top_n))
+
+    def get_resumen_completo(self):
+        """Genera resumen completo de análisis"""
+        return {
+            'producto_mas_vendido': self.producto_mas_vendido(),
+            'producto_mayor_facturacion': self.producto_mayor_facturacion(),
+            'facturacion_mensual': self.facturacion_por_mes(),
+            'top_3_cantidad': self.get_top_productos_cantidad(),
+            'top_3_facturacion': self.get_top_productos_facturacion()
+        }
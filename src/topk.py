@@ -0,0 +1,203 @@
+"""
+Top-K de productos por streaming con memoria acotada.
+
+Cada contador recibe bloques de ventas limpias (p. ej. de iter_clean_chunks)
+y suma una medida ('cantidad' o 'total') por producto:
+
+- ExactTopK: exacto, guarda una entrada por producto distinto.
+- SpaceSavingTopK: aproximado con `capacidad` contadores; cada valor
+  reportado sobreestima el real como mucho en su error.
+- CountMinTopK: aproximado con un sketch Count-Min de tamaño fijo más los
+  k mejores candidatos; error <= e/ancho * peso total con probabilidad
+  1 - e^-profundidad.
+
+Todos ordenan de mayor a menor valor y resuelven empates por nombre de
+producto, como SalesAnalyzer.
+"""
+
+import heapq
+import math
+import numpy as np
+import pandas as pd
+
+
+def _ordenar(items, n):
+    """Los n pares (producto, valor) mayores; empates por producto ascendente"""
+    return heapq.nsmallest(n, items, key=lambda par: (-par[1], par[0]))
+
+
+class _StreamingTopK:
+    """Base: agrega cada bloque por producto y delega la actualización"""
+
+    def __init__(self, medida='cantidad'):
+        self.medida = medida
+        self.peso_total = 0
+        self.filas_procesadas = 0
+
+    def update(self, df):
+        """Incorpora un bloque; sirve como consumidor de process_in_chunks"""
+        pesos = df.groupby('producto', observed=True, sort=False)[self.medida].sum()
+        pesos = pesos[pesos > 0]
+        self.peso_total += pesos.sum().item() if len(pesos) else 0
+        self.filas_procesadas += len(df)
+        self._update(pesos)
+        return self
+
+    def _update(self, pesos):
+        raise NotImplementedError
+
+    def top(self, n=3):
+        """Top N productos como {producto: valor} (valor estimado si es aproximado)"""
+        return {producto: valor for producto, valor, _ in self._top(n)}
+
+    def top_con_error(self, n=3):
+        """Top N con la sobreestimación máxima de cada valor (0 si es exacto)"""
+        return pd.DataFrame(self._top(n), columns=['producto', 'valor', 'error_maximo'])
+
+    def _top(self, n):
+        raise NotImplementedError
+
+
+class ExactTopK(_StreamingTopK):
+    """Top-K exacto: una suma por producto y selección con heap"""
+
+    def __init__(self, medida='cantidad'):
+        super().__init__(medida)
+        self.sumas = {}
+
+    def _update(self, pesos):
+        sumas = self.sumas
+        for producto, peso in pesos.items():
+            sumas[producto] = sumas.get(producto, 0) + peso
+
+    def _top(self, n):
+        return [(producto, valor, 0) for producto, valor in _ordenar(self.sumas.items(), n)]
+
+
+class SpaceSavingTopK(_StreamingTopK):
+    """Space-Saving ponderado (Metwally et al.) con `capacidad` contadores
+
+    Un producto no monitoreado reemplaza al contador mínimo y hereda su
+    valor como error. El valor real de cada producto monitoreado está en
+    [valor - error, valor] y ningún error supera peso_total / capacidad.
+    """
+
+    def __init__(self, capacidad=10_000, medida='cantidad'):
+        super().__init__(medida)
+        self.capacidad = capacidad
+        self.contadores = {}
+        # Entradas (valor, producto) del mínimo; las obsoletas se descartan al sacarlas
+        self._heap = []
+
+    def _update(self, pesos):
+        # Los pesos grandes primero: así desplazan contadores chicos y no al revés
+        for producto, peso in pesos.sort_values(ascending=False).items():
+            self._agregar(producto, peso)
+
+    def _agregar(self, producto, peso):
+        contador = self.contadores.get(producto)
+        if contador is not None:
+            contador[0] += peso
+        elif len(self.contadores) < self.capacidad:
+            contador = self.contadores[producto] = [peso, 0]
+        else:
+            minimo, victima = self._pop_min()
+            del self.contadores[victima]
+            contador = self.contadores[producto] = [minimo + peso, minimo]
+        heapq.heappush(self._heap, (contador[0], producto))
+
+        if len(self._heap) > 4 * self.capacidad:
+            self._heap = [(valor, producto) for producto, (valor, _) in self.contadores.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        """Saca el contador de menor valor, saltando entradas obsoletas"""
+        while True:
+            valor, producto = heapq.heappop(self._heap)
+            contador = self.contadores.get(producto)
+            if contador is not None and contador[0] == valor:
+                return valor, producto
+
+    @property
+    def error_maximo(self):
+        """Cota de la sobreestimación de cualquier producto (0 hasta llenar los contadores)"""
+        if len(self.contadores) < self.capacidad:
+            return 0
+        return min(valor for valor, _ in self.contadores.values())
+
+    def _top(self, n):
+        mejores = _ordenar(((p, c[0]) for p, c in self.contadores.items()), n)
+        return [(producto, valor, self.contadores[producto][1]) for producto, valor in mejores]
+
+
+class CountMinTopK(_StreamingTopK):
+    """Sketch Count-Min de ancho × profundidad más los k mejores candidatos"""
+
+    def __init__(self, k=100, ancho=2 ** 16, profundidad=4, medida='cantidad'):
+        super().__init__(medida)
+        self.k = k
+        self.ancho = ancho
+        self.profundidad = profundidad
+        self.tabla = np.zeros((profundidad, ancho))
+        self.candidatos = {}
+
+    def _posiciones(self, productos):
+        """Columna de cada producto en cada fila del sketch (doble hashing)"""
+        valores = np.asarray(productos, dtype=object)
+        h1 = pd.util.hash_array(valores, hash_key='countmin-sketch1')
+        h2 = pd.util.hash_array(valores, hash_key='countmin-sketch2') | np.uint64(1)
+        filas = np.arange(self.profundidad, dtype=np.uint64)[:, None]
+        return ((h1 + filas * h2) % np.uint64(self.ancho)).astype(np.intp)
+
+    def estimar(self, productos):
+        """Estimación (sobreestimada) del valor acumulado de cada producto"""
+        posiciones = self._posiciones(productos)
+        return self.tabla[np.arange(self.profundidad)[:, None], posiciones].min(axis=0)
+
+    def _update(self, pesos):
+        if len(pesos) == 0:
+            return
+        posiciones = self._posiciones(pesos.index)
+        valores = pesos.to_numpy(dtype=np.float64)
+        for fila in range(self.profundidad):
+            np.add.at(self.tabla[fila], posiciones[fila], valores)
+
+        # Reestimar candidatos previos y productos del bloque; quedan los k mayores
+        productos = list(self.candidatos.keys() | set(pesos.index))
+        estimados = self.estimar(productos)
+        self.candidatos = dict(_ordenar(zip(productos, estimados.tolist()), self.k))
+
+    @property
+    def error_maximo(self):
+        """Cota e/ancho * peso total, válida con probabilidad 1 - e^-profundidad"""
+        return math.e / self.ancho * self.peso_total
+
+    @property
+    def probabilidad_cota(self):
+        return 1 - math.exp(-self.profundidad)
+
+    def _top(self, n):
+        return [(producto, valor, self.error_maximo)
+                for producto, valor in _ordenar(self.candidatos.items(), n)]
+
+
+METODOS_TOPK = {
+    'exacto': ExactTopK,
+    'space_saving': SpaceSavingTopK,
+    'count_min': CountMinTopK,
+}
+
+
+def top_productos_streaming(chunks, medida='cantidad', metodo='exacto', **opciones):
+    """Recorre los bloques con el contador indicado y lo retorna
+
+    metodo: 'exacto', 'space_saving' (opción capacidad) o 'count_min'
+    (opciones k, ancho, profundidad).
+    """
+    if metodo not in METODOS_TOPK:
+        raise ValueError(f"Método de top-K desconocido: {metodo}")
+
+    contador = METODOS_TOPK[metodo](medida=medida, **opciones)
+    for chunk in chunks:
+        contador.update(chunk)
+    return contador
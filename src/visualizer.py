@@ -1,104 +1,289 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
 import pandas as pd
 import os
-from .database import DatabaseManager
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from importlib import metadata
+from multiprocessing import get_context
+from .database import get_database
+
+# matplotlib y seaborn se importan al dibujar el primer gráfico: cargarlos
+# aquí retrasaría el arranque de la GUI y del CLI aunque no se generen gráficos
+
+DEFAULT_DPI = 300
+ESTILO = 'seaborn-v0_8'
+
+# Manifiesto con la huella de cada gráfico generado (en output_dir). Subir
+# RENDER_VERSION al cambiar el dibujo para invalidar las imágenes existentes.
+MANIFEST_FILE = 'manifest.json'
+RENDER_VERSION = 1
+
+# Archivo por defecto de cada tipo de gráfico
+ARCHIVOS_POR_DEFECTO = {
+    'mensual': 'grafico.png',
+    'productos': 'top_productos.png',
+}
+
+
+def _dibujar_mensual(fig, datos, spec):
+    """Barras de facturación total por mes"""
+    from matplotlib.ticker import FuncFormatter
+    
+    ax = fig.add_subplot()
+    
+    bars = ax.bar(datos['mes'], datos['facturacion_total'],
+                  color='steelblue', alpha=0.7, edgecolor='navy')
+    
+    ax.set_title(spec.get('titulo', 'Facturación Total por Mes'), fontsize=16, fontweight='bold')
+    ax.set_xlabel('Mes', fontsize=12)
+    ax.set_ylabel('Facturación Total ($)', fontsize=12)
+    ax.tick_params(axis='x', labelrotation=45)
+    
+    # Agregar valores en las barras
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'${height:,.0f}',
+                ha='center', va='bottom', fontsize=10)
+    
+    ax.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'${x:,.0f}'))
+    fig.tight_layout()
+    ax.grid(axis='y', alpha=0.3)
+
+
+def _dibujar_productos(fig, datos, spec):
+    """Barras horizontales de top productos por cantidad"""
+    ax = fig.add_subplot()
+    top_n = spec.get('top_n', len(datos))
+    
+    bars = ax.barh(datos['producto'], datos['cantidad_total'],
+                   color='lightcoral', alpha=0.7, edgecolor='darkred')
+    
+    ax.set_title(spec.get('titulo', f'Top {top_n} Productos por Cantidad Vendida'),
+                 fontsize=16, fontweight='bold')
+    ax.set_xlabel('Cantidad Total', fontsize=12)
+    ax.set_ylabel('Producto', fontsize=12)
+    
+    # Agregar valores
+    for bar in bars:
+        width = bar.get_width()
+        ax.text(width, bar.get_y() + bar.get_height()/2.,
+                f'{width:,.0f}',
+                ha='left', va='center', fontsize=10)
+    
+    fig.tight_layout()
+
+
+DIBUJOS = {
+    'mensual': (_dibujar_mensual, (12, 6)),
+    'productos': (_dibujar_productos, (10, 6)),
+}
+
+
+def render_chart(spec):
+    """Dibuja un gráfico con la API orientada a objetos (Figure + Agg) y lo guarda
+    
+    No usa el estado global de pyplot, por lo que puede ejecutarse en
+    paralelo en procesos distintos. spec necesita 'tipo', 'datos' y 'path'.
+    """
+    import seaborn as sns
+    from cycler import cycler
+    from matplotlib import rc_context, style
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    
+    dibujar, figsize = DIBUJOS[spec['tipo']]
+    with style.context(ESTILO), rc_context({'axes.prop_cycle': cycler(color=sns.color_palette('husl'))}):
+        fig = Figure(figsize=spec.get('figsize', figsize))
+        FigureCanvasAgg(fig)
+        dibujar(fig, spec['datos'], spec)
+        fig.savefig(spec['path'], dpi=spec.get('dpi', DEFAULT_DPI), bbox_inches='tight')
+    return spec['path']
+
+
+def _como_frame(datos, columnas):
+    """Convierte un dict {clave: valor}, una Series o un DataFrame en un DataFrame de dos columnas"""
+    if isinstance(datos, pd.DataFrame):
+        return datos
+    if isinstance(datos, dict):
+        datos = pd.Series(datos) if datos else pd.Series(dtype='float64')
+    return pd.DataFrame({columnas[0]: datos.index, columnas[1]: datos.to_numpy()})
+
+
+def datos_mensuales(datos):
+    """Normaliza la facturación mensual: dict de SalesAnalyzer.facturacion_por_mes,
+    Series o DataFrame (mes, facturacion_total), con mes como texto 'AAAA-MM'
+    """
+    df = _como_frame(datos, ('mes', 'facturacion_total'))
+    if not df.empty and not isinstance(df['mes'].iloc[0], str):
+        df = df.assign(mes=[str(mes) for mes in df['mes']])
+    return df
+
+
+def datos_top_productos(datos, top_n):
+    """Normaliza el top de productos: dict de get_top_productos_cantidad, Series o
+    DataFrame (producto, cantidad_total), con a lo sumo top_n filas de mayor a menor
+    """
+    df = _como_frame(datos, ('producto', 'cantidad_total'))
+    if len(df) > top_n:
+        df = df.nlargest(top_n, 'cantidad_total')
+    return df
+
+
+NORMALIZADORES = {
+    'mensual': lambda datos, spec: datos_mensuales(datos),
+    'productos': lambda datos, spec: datos_top_productos(datos, spec.get('top_n', len(datos))),
+}
+
+
+@lru_cache(maxsize=None)
+def _version_matplotlib():
+    """Versión instalada de matplotlib, leída de los metadatos sin importarlo"""
+    return metadata.version('matplotlib')
+
+
+def chart_fingerprint(spec):
+    """Huella SHA-256 de los datos y parámetros que determinan la imagen"""
+    datos = spec['datos']
+    parametros = {
+        'tipo': spec['tipo'],
+        'render_version': RENDER_VERSION,
+        'estilo': ESTILO,
+        'matplotlib': _version_matplotlib(),
+        'columnas': [str(c) for c in datos.columns],
+        **{k: spec.get(k) for k in ('top_n', 'titulo', 'figsize', 'dpi')},
+    }
+    h = hashlib.sha256(json.dumps(parametros, sort_keys=True, default=str).encode())
+    h.update(pd.util.hash_pandas_object(datos, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
 
 class SalesVisualizer:
     
-    def __init__(self):
+    def __init__(self, db=None):
+        # Reutiliza el DatabaseManager compartido en lugar de crear uno por gráfico
+        self.db = db if db is not None else get_database()
         self.output_dir = "output/graficos"
         self.ensure_directory()
-        
-        # Configurar estilo
-        plt.style.use('seaborn-v0_8')
-        sns.set_palette("husl")
     
     def ensure_directory(self):
         """Crea directorio de salida si no existe"""
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
     
-    def generar_grafico_mensual(self, save_path="grafico.png"):
-        """Genera gráfico de facturación total por mes"""
+    def generar_grafico_mensual(self, save_path="grafico.png", datos=None):
+        """Genera gráfico de facturación total por mes
         
-        # Obtener datos desde BD
-        db = DatabaseManager()
-        df_mensual = db.get_facturacion_mensual_query()
+        datos: facturación ya calculada (p. ej. SalesAnalyzer.facturacion_por_mes());
+        si es None se consulta en la BD.
+        """
+        
+        # Obtener datos desde BD solo si no vienen precalculados
+        df_mensual = self.db.get_facturacion_mensual_query() if datos is None else datos_mensuales(datos)
         
         if df_mensual.empty:
             print("No hay datos para generar gráfico")
             return
         
-        # Crear gráfico
-        plt.figure(figsize=(12, 6))
-        
-        # Convertir mes a datetime para mejor visualización
-        df_mensual['mes_dt'] = pd.to_datetime(df_mensual['mes'])
-        
-        # Gráfico de barras
-        bars = plt.bar(df_mensual['mes'], df_mensual['facturacion_total'], 
-                      color='steelblue', alpha=0.7, edgecolor='navy')
-        
-        # Personalización
-        plt.title('Facturación Total por Mes', fontsize=16, fontweight='bold')
-        plt.xlabel('Mes', fontsize=12)
-        plt.ylabel('Facturación Total ($)', fontsize=12)
-        plt.xticks(rotation=45)
-        
-        # Agregar valores en las barras
-        for bar in bars:
-            height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width()/2., height,
-                    f'${height:,.0f}',
-                    ha='center', va='bottom', fontsize=10)
-        
-        # Formatear eje Y
-        plt.gca().yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
-        
-        # Ajustar layout
-        plt.tight_layout()
-        plt.grid(axis='y', alpha=0.3)
-        
-        # Guardar
-        full_path = os.path.join(self.output_dir, save_path)
-        plt.savefig(full_path, dpi=300, bbox_inches='tight')
-        plt.close()
+        spec = self._preparar_spec({'tipo': 'mensual', 'archivo': save_path, 'datos': df_mensual})
+        full_path = self._render_specs([spec], n_jobs=1)[0]
         
         print(f"Gráfico guardado en: {full_path}")
         return full_path
     
-    def generar_grafico_productos(self, top_n=5):
-        """Genera gráfico de top productos por cantidad"""
+    def generar_grafico_productos(self, top_n=5, datos=None):
+        """Genera gráfico de top productos por cantidad
+        
+        datos: top ya calculado (p. ej. SalesAnalyzer.get_top_productos_cantidad(top_n));
+        si es None se consulta en la BD.
+        """
         
-        db = DatabaseManager()
-        df_productos = db.get_top_productos_query(top_n)
+        spec = self._preparar_spec({'tipo': 'productos', 'top_n': top_n, 'datos': datos})
+        save_path = self._render_specs([spec], n_jobs=1)[0]
         
-        plt.figure(figsize=(10, 6))
+        print(f"Gráfico de productos guardado en: {save_path}")
+        return save_path
+    
+    def _preparar_spec(self, spec):
+        """Completa un spec con sus datos (consultados en la BD si faltan) y la ruta de salida"""
+        tipo = spec.get('tipo')
+        if tipo not in DIBUJOS:
+            raise ValueError(f"Tipo de gráfico desconocido: {tipo}")
         
-        # Gráfico horizontal
-        bars = plt.barh(df_productos['producto'], df_productos['cantidad_total'],
-                       color='lightcoral', alpha=0.7, edgecolor='darkred')
+        spec = dict(spec)
+        if spec.get('datos') is None:
+            if tipo == 'mensual':
+                spec['datos'] = self.db.get_facturacion_mensual_query()
+            else:
+                spec['datos'] = self.db.get_top_productos_query(spec.setdefault('top_n', 5))
+        else:
+            spec['datos'] = NORMALIZADORES[tipo](spec['datos'], spec)
+        spec['path'] = os.path.join(self.output_dir, spec.pop('archivo', ARCHIVOS_POR_DEFECTO[tipo]))
+        return spec
+    
+    def _manifest_path(self):
+        return os.path.join(self.output_dir, MANIFEST_FILE)
+    
+    def _load_manifest(self):
+        """Lee el manifiesto de huellas ({ruta: huella}); vacío si no existe o está dañado"""
+        try:
+            with open(self._manifest_path(), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_manifest(self, manifest):
+        """Escribe el manifiesto de forma atómica"""
+        tmp_path = self._manifest_path() + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self._manifest_path())
+    
+    def _render_specs(self, specs, n_jobs, force=False):
+        """Dibuja solo los gráficos cuya huella cambió y actualiza el manifiesto"""
+        manifest = self._load_manifest()
+        huellas = [chart_fingerprint(spec) for spec in specs]
+        pendientes = []
+        for spec, huella in zip(specs, huellas):
+            if force or manifest.get(spec['path']) != huella or not os.path.exists(spec['path']):
+                pendientes.append(spec)
+            else:
+                print(f"Gráfico sin cambios, se reutiliza: {spec['path']}")
         
-        plt.title(f'Top {top_n} Productos por Cantidad Vendida', fontsize=16, fontweight='bold')
-        plt.xlabel('Cantidad Total', fontsize=12)
-        plt.ylabel('Producto', fontsize=12)
+        if n_jobs == 1 or len(pendientes) <= 1:
+            for spec in pendientes:
+                render_chart(spec)
+        else:
+            # spawn: el proceso que llama puede tener hilos (GUI) y fork no es seguro
+            workers = min(n_jobs, len(pendientes))
+            with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool:
+                list(pool.map(render_chart, pendientes, chunksize=max(1, len(pendientes) // (workers * 4))))
         
-        # Agregar valores
-        for i, bar in enumerate(bars):
-            width = bar.get_width()
-            plt.text(width, bar.get_y() + bar.get_height()/2.,
-                    f'{width:,.0f}',
-                    ha='left', va='center', fontsize=10)
+        if pendientes:
+            manifest.update((spec['path'], huella) for spec, huella in zip(specs, huellas))
+            self._save_manifest(manifest)
+        return [spec['path'] for spec in specs]
+    
+    def render_batch(self, specs, n_jobs=None, force=False):
+        """Genera varios gráficos en paralelo y retorna sus rutas (en el orden de specs)
         
-        plt.tight_layout()
+        Cada spec es un dict con 'tipo' ('mensual' o 'productos'), 'archivo'
+        y opcionalmente 'datos' (DataFrame con las columnas de la consulta
+        correspondiente, o el dict/Series de SalesAnalyzer), 'top_n', 'titulo', 'figsize' y 'dpi'. Los datos que
+        falten se consultan una vez en este proceso; el dibujo ocurre en un
+        pool de n_jobs procesos (None = todos los núcleos, 1 = sin pool).
         
-        save_path = os.path.join(self.output_dir, 'top_productos.png')
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.close()
+        Los gráficos cuya huella (datos + parámetros) coincide con la del
+        manifiesto se reutilizan sin volver a dibujarse; force=True los
+        regenera todos.
+        """
+        specs = [self._preparar_spec(spec) for spec in specs]
+        n_jobs = n_jobs or os.cpu_count() or 1
+        paths = self._render_specs(specs, n_jobs, force)
         
-        print(f"Gráfico de productos guardado en: {save_path}")
-        return save_path
+        print(f"{len(paths)} gráficos generados en: {self.output_dir}")
+        return paths
 
 def main():
     """Función principal para generar gráficos"""
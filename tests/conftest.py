@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 import pandas as pd
 import os
 import tempfile
@@ -27,6 +28,33 @@ def sample_csv_file(test_data_dir):
     
     return csv_path
 
+@pytest.fixture
+def sample_data():
+    """Fixture con datos de ventas limpios (dos meses, tres productos)"""
+    return pd.DataFrame({
+        'fecha': pd.to_datetime(['2024-01-01', '2024-01-02', '2024-02-01', '2024-02-02']),
+        'producto': ['ProductoA', 'ProductoB', 'ProductoA', 'ProductoC'],
+        'cantidad': [10, 5, 15, 8],
+        'precio_unitario': [100.0, 200.0, 100.0, 150.0],
+        'total': [1000.0, 1000.0, 1500.0, 1200.0]
+    })
+
+@pytest.fixture
+def ventas_aleatorias():
+    """Fábrica de ventas aleatorias reproducibles (fechas en [desde, desde + dias))"""
+    def generar(seed, filas, desde='2023-01-01', dias=365,
+                productos=('ProductoA', 'ProductoB', 'ProductoC'), cantidad_max=10):
+        rng = np.random.default_rng(seed)
+        df = pd.DataFrame({
+            'fecha': pd.Timestamp(desde) + pd.to_timedelta(rng.integers(0, dias, filas), unit='D'),
+            'producto': rng.choice(list(productos), filas),
+            'cantidad': rng.integers(1, cantidad_max, filas),
+            'precio_unitario': rng.integers(100, 10000, filas) / 100
+        })
+        df['total'] = df['cantidad'] * df['precio_unitario']
+        return df
+    return generar
+
 @pytest.fixture
 def sample_invalid_csv_file(test_data_dir):
     """Crea archivo CSV con datos inválidos para testing"""
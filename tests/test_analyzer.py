@@ -1,5 +1,6 @@
 import pytest
 import pandas as pd
+import numpy as np
 from datetime import datetime
 import sys
 import os
@@ -10,7 +11,7 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from src.data_processor import DataProcessor
-from src.analyzer import SalesAnalyzer
+from src.analyzer import SalesAnalyzer, IncrementalSalesAnalyzer
 
 class TestDataProcessor:
     
@@ -53,17 +54,6 @@ class TestDataProcessor:
 
 class TestSalesAnalyzer:
     
-    @pytest.fixture
-    def sample_data(self):
-        """Fixture con datos de prueba"""
-        return pd.DataFrame({
-            'fecha': pd.to_datetime(['2024-01-01', '2024-01-02', '2024-02-01', '2024-02-02']),
-            'producto': ['ProductoA', 'ProductoB', 'ProductoA', 'ProductoC'],
-            'cantidad': [10, 5, 15, 8],
-            'precio_unitario': [100.0, 200.0, 100.0, 150.0],
-            'total': [1000.0, 1000.0, 1500.0, 1200.0]
-        })
-    
     def test_producto_mas_vendido(self, sample_data):
         """Test para producto más vendido por cantidad"""
         analyzer = SalesAnalyzer(sample_data)
@@ -106,4 +96,319 @@ class TestSalesAnalyzer:
         # Debe retornar los 2 productos con más cantidad
         assert len(result) == 2
         assert 'ProductoA' in result
-        assert result['ProductoA'] == 25
\ No newline at end of file
+        assert result['ProductoA'] == 25
+    
+    def test_totales_por_producto_incluyen_ventas_sin_fecha(self, sample_data):
+        """Test que verifica que una venta sin fecha cuenta para su producto pero no para ningún mes"""
+        sin_fecha = pd.DataFrame({
+            'fecha': pd.to_datetime([None]),
+            'producto': ['ProductoB'],
+            'cantidad': [30],
+            'precio_unitario': [200.0],
+            'total': [6000.0]
+        })
+        analyzer = SalesAnalyzer(pd.concat([sample_data, sin_fecha], ignore_index=True))
+        
+        # ProductoB: 5 + 30 = 35 unidades y 1000 + 6000 = 7000 de facturación
+        assert analyzer.producto_mas_vendido() == {'producto': 'ProductoB', 'cantidad_total': 35}
+        assert analyzer.get_top_productos_facturacion(1) == {'ProductoB': 7000.0}
+        assert list(analyzer.facturacion_por_mes().values()) == [2000.0, 2700.0]
+        assert len(analyzer.agregar(('producto', 'año_mes'), 'ventas')) == 4
+    
+    def test_resumen_completo_usa_un_solo_agregado(self, sample_data):
+        """Test que verifica el resumen derivado del agregado producto × mes"""
+        columnas_originales = list(sample_data.columns)
+        analyzer = SalesAnalyzer(sample_data)
+        result = analyzer.get_resumen_completo()
+        cubo = analyzer._get_cubo()
+        
+        assert analyzer.get_resumen_completo() == result
+        assert analyzer._get_cubo() is cubo
+        assert result['top_3_facturacion'] == {'ProductoA': 2500.0, 'ProductoC': 1200.0, 'ProductoB': 1000.0}
+        assert list(result['facturacion_mensual'].values()) == [2000.0, 2700.0]
+        # No se agregan columnas auxiliares al DataFrame original
+        assert list(sample_data.columns) == columnas_originales
+
+class TestAggregationCache:
+    
+    def test_top_n_distintos_reutilizan_agregado(self, sample_data):
+        """Test que verifica que distintos top_n se sirven desde la caché"""
+        analyzer = SalesAnalyzer(sample_data)
+        analyzer.get_top_productos_cantidad(1)
+        misses = analyzer.cache_misses
+        
+        result = analyzer.get_top_productos_cantidad(3)
+        
+        assert analyzer.cache_misses == misses
+        assert analyzer.cache_hits >= 1
+        assert list(result) == ['ProductoA', 'ProductoC', 'ProductoB']
+    
+    def test_cache_se_invalida_al_cambiar_datos(self, sample_data):
+        """Test que verifica la invalidación al reasignar o ampliar el DataFrame"""
+        analyzer = SalesAnalyzer(sample_data)
+        assert analyzer.producto_mas_vendido()['producto'] == 'ProductoA'
+        
+        nuevas = pd.DataFrame({
+            'fecha': pd.to_datetime(['2024-03-01']),
+            'producto': ['ProductoC'],
+            'cantidad': [50],
+            'precio_unitario': [150.0],
+            'total': [7500.0]
+        })
+        analyzer.df = pd.concat([sample_data, nuevas], ignore_index=True)
+        
+        assert analyzer.producto_mas_vendido() == {'producto': 'ProductoC', 'cantidad_total': 58}
+        
+        analyzer.df.loc[len(analyzer.df)] = [pd.Timestamp('2024-03-02'), 'ProductoB', 100, 200.0, 20000.0]
+        
+        assert analyzer.producto_mas_vendido()['producto'] == 'ProductoB'
+    
+    def test_cache_se_invalida_al_editar_valores(self, sample_data):
+        """Test que verifica que con verificar_contenido las ediciones in-place invalidan la caché"""
+        analyzer = SalesAnalyzer(sample_data, verificar_contenido=True)
+        assert analyzer.producto_mas_vendido()['producto'] == 'ProductoA'
+        
+        sample_data.loc[1, 'cantidad'] = 100
+        assert analyzer.producto_mas_vendido() == {'producto': 'ProductoB', 'cantidad_total': 100}
+        
+        # Intercambiar valores entre filas no cambia la suma de la columna
+        sample_data.loc[[1, 2], 'total'] = [1500.0, 1000.0]
+        assert analyzer.agregar('producto', 'total').to_dict() == {
+            'ProductoA': 2000.0, 'ProductoB': 1500.0, 'ProductoC': 1200.0
+        }
+    
+    def test_edicion_in_place_requiere_invalidar(self, sample_data):
+        """Test que verifica invalidate() con la huella O(1) por defecto"""
+        analyzer = SalesAnalyzer(sample_data)
+        analyzer.producto_mas_vendido()
+        
+        sample_data.loc[1, 'cantidad'] = 100
+        assert analyzer.producto_mas_vendido()['producto'] == 'ProductoA'
+        
+        analyzer.invalidate()
+        assert analyzer.producto_mas_vendido()['producto'] == 'ProductoB'
+    
+    def test_resumen_verifica_la_huella_una_vez(self, sample_data, monkeypatch):
+        """Test que verifica que get_resumen_completo calcula la huella una sola vez"""
+        analyzer = SalesAnalyzer(sample_data, verificar_contenido=True)
+        llamadas = []
+        original = analyzer._df_fingerprint
+        monkeypatch.setattr(analyzer, '_df_fingerprint', lambda: llamadas.append(1) or original())
+        
+        analyzer.get_resumen_completo()
+        analyzer.get_resumen_completo()
+        
+        assert len(llamadas) == 2
+    
+    def test_cache_lru_y_filtro_de_fechas(self, sample_data):
+        """Test que verifica el límite LRU y los agregados filtrados por fecha"""
+        analyzer = SalesAnalyzer(sample_data, cache_size=2)
+        
+        febrero = analyzer.agregar('producto', 'total', filtro=('2024-02-01', None))
+        
+        assert febrero.to_dict() == {'ProductoA': 1500.0, 'ProductoC': 1200.0}
+        assert analyzer.cache_info()['size'] <= 2
+
+class TestIncrementalSalesAnalyzer:
+    
+    @pytest.fixture
+    def sample_data(self, sample_data):
+        """Fixture con los datos de prueba y una venta más en marzo"""
+        marzo = pd.DataFrame({
+            'fecha': pd.to_datetime(['2024-03-05']),
+            'producto': ['ProductoB'],
+            'cantidad': [7],
+            'precio_unitario': [200.0],
+            'total': [1400.0]
+        })
+        return pd.concat([sample_data, marzo], ignore_index=True)
+    
+    def test_lotes_equivalen_al_analisis_completo(self, sample_data):
+        """Test que verifica que procesar por lotes da el mismo resumen que SalesAnalyzer"""
+        incremental = IncrementalSalesAnalyzer()
+        incremental.update(sample_data.iloc[:2])
+        incremental.update(sample_data.iloc[2:])
+        
+        resumen = incremental.get_resumen_completo()
+        
+        assert resumen == SalesAnalyzer(sample_data).get_resumen_completo()
+        assert resumen['top_3_cantidad'] == {'ProductoA': 25, 'ProductoB': 12, 'ProductoC': 8}
+        assert resumen['top_3_facturacion'] == {'ProductoA': 2500.0, 'ProductoB': 2400.0, 'ProductoC': 1200.0}
+        assert list(resumen['facturacion_mensual'].values()) == [2000.0, 2700.0, 1400.0]
+        assert incremental.filas_procesadas == 5
+        assert incremental.ticket_promedio_por_producto()['ProductoB'] == 1200.0
+    
+    def test_save_y_load_retoman_el_estado(self, sample_data, tmp_path):
+        """Test que verifica que el estado serializado se puede retomar"""
+        path = tmp_path / 'estado.json'
+        IncrementalSalesAnalyzer().update(sample_data.iloc[:3]).save(path)
+        
+        restaurado = IncrementalSalesAnalyzer.load(path)
+        restaurado.update(sample_data.iloc[3:])
+        
+        assert restaurado.facturacion_por_mes() == SalesAnalyzer(sample_data).facturacion_por_mes()
+        assert restaurado.get_top_productos_cantidad(2) == {'ProductoA': 25, 'ProductoB': 12}
+    
+    def test_desde_bloques_del_csv(self, sample_csv_file):
+        """Test que verifica la integración con la lectura por bloques"""
+        processor = DataProcessor()
+        incremental = IncrementalSalesAnalyzer.from_chunks(
+            processor.iter_clean_chunks(sample_csv_file, chunksize=2)
+        )
+        
+        processor.load_data(sample_csv_file)
+        processor.clean_data()
+        processor.calculate_totals()
+        
+        assert incremental.get_resumen_completo() == SalesAnalyzer(processor.df).get_resumen_completo()
+
+class TestParallelAggregation:
+    
+    @pytest.fixture
+    def sample_data(self, ventas_aleatorias):
+        """Fixture con ventas de tipos compactos (producto categórico, cantidad uint8)"""
+        df = ventas_aleatorias(
+            seed=0, filas=5000, dias=400, cantidad_max=20,
+            productos=('ProductoA', 'ProductoB', 'ProductoC', 'ProductoD')
+        )
+        return df.astype({'producto': 'category', 'cantidad': 'uint8'})
+    
+    def _assert_cubos_equivalentes(self, paralelo, serial, filas):
+        """Índice, tipos, cantidades y conteos idénticos; total dentro de la cota documentada"""
+        pd.testing.assert_frame_equal(paralelo[['cantidad', 'ventas']], serial[['cantidad', 'ventas']])
+        pd.testing.assert_series_equal(
+            paralelo['total'], serial['total'],
+            check_exact=False, rtol=filas * np.finfo(float).eps, atol=0
+        )
+    
+    def test_ruta_paralela_coincide_con_la_serial(self, sample_data):
+        """Test que verifica que la agregación en procesos da los mismos resultados"""
+        df = sample_data
+        
+        serial = SalesAnalyzer(df)
+        paralelo = SalesAnalyzer(df, n_jobs=2, parallel_min_rows=0)
+        
+        self._assert_cubos_equivalentes(paralelo._get_cubo(), serial._get_cubo(), len(df))
+        assert paralelo.get_top_productos_cantidad(4) == serial.get_top_productos_cantidad(4)
+        assert paralelo.producto_mayor_facturacion()['producto'] == serial.producto_mayor_facturacion()['producto']
+        pd.testing.assert_series_equal(
+            paralelo.agregar(('producto', 'año_mes'), 'ventas'),
+            serial.agregar(('producto', 'año_mes'), 'ventas')
+        )
+    
+    def test_ruta_paralela_con_producto_y_fecha_nulos(self, sample_data):
+        """Test que verifica que filas sin producto o sin fecha se agrupan como en la ruta serial"""
+        df = sample_data
+        df.loc[[3, 10], 'producto'] = np.nan
+        df.loc[[4, 11], 'fecha'] = pd.NaT
+        
+        serial = SalesAnalyzer(df)
+        paralelo = SalesAnalyzer(df, n_jobs=2, parallel_min_rows=0)
+        
+        self._assert_cubos_equivalentes(paralelo._get_cubo(), serial._get_cubo(), len(df))
+        assert paralelo._get_cubo()['ventas'].sum() == len(df)
+        assert paralelo.agregar('producto', 'ventas').sum() == len(df) - 2
+        assert paralelo.agregar('año_mes', 'ventas').sum() == len(df) - 2
+
+    def test_ruta_paralela_valores_conocidos_en_procesos_spawn(self, monkeypatch):
+        """Test que verifica sumas calculadas a mano, cantidad nulable y el contexto spawn del pool"""
+        import src.parallel
+        contextos = []
+        original = src.parallel.ProcessPoolExecutor
+        
+        class PoolRegistrado(original):
+            def __init__(self, *args, **kwargs):
+                contextos.append(kwargs.get('mp_context'))
+                super().__init__(*args, **kwargs)
+        
+        monkeypatch.setattr(src.parallel, 'ProcessPoolExecutor', PoolRegistrado)
+        df = pd.DataFrame({
+            'fecha': pd.to_datetime(['2024-01-05', '2024-03-01', '2024-01-20', None, '2024-03-31']),
+            'producto': pd.Categorical(['ProductoA', 'ProductoA', 'ProductoB', 'ProductoB', 'ProductoA']),
+            'cantidad': pd.array([2, pd.NA, 4, 5, 3], dtype='Int32'),
+            'total': [20.0, 15.0, 40.0, 50.0, 30.0]
+        })
+        
+        analyzer = SalesAnalyzer(df, n_jobs=2, parallel_min_rows=0)
+        
+        assert analyzer.agregar('producto', 'cantidad').to_dict() == {'ProductoA': 5, 'ProductoB': 9}
+        assert analyzer.agregar('producto', 'total').to_dict() == {'ProductoA': 65.0, 'ProductoB': 90.0}
+        # Febrero no tiene ventas; la venta sin fecha no entra en ningún mes
+        assert analyzer.facturacion_por_mes() == {
+            pd.Period('2024-01', freq='M'): 60.0, pd.Period('2024-03', freq='M'): 45.0
+        }
+        assert [contexto.get_start_method() for contexto in contextos] == ['spawn']
+
+class TestTimeSeries:
+    
+    @pytest.fixture
+    def sample_data(self, ventas_aleatorias):
+        """Fixture con dos años de ventas en orden aleatorio"""
+        return ventas_aleatorias(seed=1, filas=3000, dias=730)
+    
+    @pytest.mark.parametrize('frecuencia', ['D', 'W'])
+    def test_serie_coincide_con_resample(self, sample_data, frecuencia):
+        """Test que verifica la serie diaria y semanal contra resample de pandas"""
+        analyzer = SalesAnalyzer(sample_data)
+        
+        esperado = sample_data.set_index('fecha')['total'].resample(frecuencia).sum()
+        resultado = analyzer.serie_temporal(frecuencia)
+        
+        pd.testing.assert_series_equal(resultado, esperado, check_names=False, check_freq=False)
+    
+    def test_serie_mensual_y_acumulado(self, sample_data):
+        """Test que verifica la serie mensual, el acumulado y las ventanas móviles"""
+        analyzer = SalesAnalyzer(sample_data)
+        
+        mensual = analyzer.serie_temporal('M')
+        
+        assert mensual.to_dict() == pytest.approx(analyzer.facturacion_por_mes())
+        assert analyzer.acumulado('M').iloc[-1] == pytest.approx(sample_data['total'].sum())
+        assert analyzer.media_movil(3, 'M').iloc[2] == pytest.approx(mensual.iloc[:3].mean())
+        assert analyzer.suma_movil(7, 'D', 'ventas').max() <= len(sample_data)
+    
+    def test_serie_omite_fechas_nulas(self, sample_data):
+        """Test que verifica que las filas sin fecha se omiten como en facturacion_por_mes"""
+        sample_data.loc[[0, 5], 'fecha'] = pd.NaT
+        sample_data.loc[7, 'total'] = np.nan
+        analyzer = SalesAnalyzer(sample_data)
+        
+        mensual = analyzer.serie_temporal('M')
+        diaria = analyzer.serie_temporal('D', 'ventas')
+        
+        assert mensual.to_dict() == pytest.approx(analyzer.facturacion_por_mes())
+        assert diaria.sum() == len(sample_data) - 2
+        assert analyzer.acumulado('M').iloc[-1] == pytest.approx(sample_data['total'].drop([0, 5]).sum())
+    
+    def test_crecimiento_con_un_mes_sin_ventas(self):
+        """Test que verifica que un mes sin ventas vale 0 y corta la comparación (a diferencia de LAG en SQL)"""
+        df = pd.DataFrame({
+            'fecha': pd.to_datetime(['2024-01-10', '2024-03-05', '2024-04-20']),
+            'producto': ['ProductoA', 'ProductoA', 'ProductoB'],
+            'cantidad': [1, 2, 3],
+            'precio_unitario': [100.0, 100.0, 100.0],
+            'total': [100.0, 200.0, 300.0]
+        })
+        
+        mom = SalesAnalyzer(df).crecimiento_mensual()
+        
+        assert mom['total'].tolist() == [100.0, 0.0, 200.0, 300.0]
+        assert mom['anterior'].tolist()[1:] == [100.0, 0.0, 200.0]
+        assert mom['crecimiento_porcentual'].tolist()[1] == -100.0
+        assert np.isnan(mom['crecimiento_porcentual'].iloc[2])
+        assert mom['crecimiento_porcentual'].iloc[3] == 50.0
+    
+    def test_crecimiento_mensual_e_interanual(self, sample_data):
+        """Test que verifica el crecimiento mes a mes (consulta 7) y año a año"""
+        analyzer = SalesAnalyzer(sample_data)
+        mensual = analyzer.serie_temporal('M')
+        
+        mom = analyzer.crecimiento_mensual()
+        yoy = analyzer.crecimiento_interanual()
+        
+        assert np.isnan(mom['crecimiento_porcentual'].iloc[0])
+        assert mom['crecimiento_porcentual'].iloc[1] == pytest.approx(
+            (mensual.iloc[1] - mensual.iloc[0]) / mensual.iloc[0] * 100
+        )
+        assert yoy['anterior'][pd.Period('2024-03', freq='M')] == mensual[pd.Period('2023-03', freq='M')]
+        assert yoy['crecimiento_porcentual'].iloc[:12].isna().all()
@@ -0,0 +1,209 @@
+import pytest
+import pandas as pd
+import sys
+import os
+
+# Agregar el directorio del proyecto al path para poder importar el paquete src
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.data_processor import DataProcessor
+from src.database import DatabaseManager
+
+class TestChunkedProcessing:
+    
+    def test_iter_clean_chunks_respeta_tamano_de_bloque(self, sample_csv_file):
+        """Test que verifica que ningún bloque supera chunksize"""
+        processor = DataProcessor()
+        chunks = list(processor.iter_clean_chunks(sample_csv_file, chunksize=2))
+        
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        assert processor.df is None
+        assert all('total' in chunk.columns for chunk in chunks)
+    
+    def test_iter_clean_chunks_filtra_invalidos(self, sample_invalid_csv_file):
+        """Test que verifica que la limpieza se aplica en cada bloque"""
+        processor = DataProcessor()
+        chunks = list(processor.iter_clean_chunks(sample_invalid_csv_file, chunksize=2))
+        result = pd.concat(chunks)
+        
+        assert result['producto'].tolist() == ['ProductoA']
+        assert result['total'].tolist() == [1000.0]
+    
+    def test_iter_clean_chunks_omite_bloques_vacios(self, sample_invalid_csv_file):
+        """Test que verifica que los bloques sin filas válidas no se entregan"""
+        processor = DataProcessor()
+        chunks = list(processor.iter_clean_chunks(sample_invalid_csv_file, chunksize=2))
+        
+        assert [len(chunk) for chunk in chunks] == [1]
+        assert sum(processor.rejection_counts.values()) == 4
+    
+    def test_process_in_chunks_alimenta_la_bd(self, sample_csv_file, tmp_path):
+        """Test que verifica el streaming hacia SQLite"""
+        processor = DataProcessor()
+        db = DatabaseManager(str(tmp_path / "ventas.db"))
+        db.clear_ventas()
+        
+        filas = processor.process_in_chunks(
+            sample_csv_file, [db.append_ventas_data], chunksize=2
+        )
+        
+        assert filas == 5
+        top = db.get_top_productos_query(1)
+        assert top['producto'].tolist() == ['ProductoA']
+        assert top['cantidad_total'].tolist() == [25]
+
+class TestSchema:
+    
+    def test_load_data_aplica_esquema_compacto(self, sample_csv_file):
+        """Test que verifica los tipos declarados al cargar y tras limpiar"""
+        processor = DataProcessor()
+        df = processor.load_data(sample_csv_file)
+        
+        assert isinstance(df['producto'].dtype, pd.CategoricalDtype)
+        assert pd.api.types.is_datetime64_any_dtype(df['fecha'])
+        
+        processor.clean_data()
+        processor.calculate_totals()
+        result = processor.get_clean_data()
+        
+        assert result['cantidad'].dtype == 'uint8'
+        assert result['total'].tolist() == [1000.0, 1000.0, 1500.0, 1200.0, 2400.0]
+    
+    def test_load_data_fecha_invalida_queda_nat(self, sample_invalid_csv_file):
+        """Test que verifica que las fechas inválidas se descartan en limpieza"""
+        processor = DataProcessor()
+        df = processor.load_data(sample_invalid_csv_file)
+        
+        assert df['fecha'].isna().sum() == 1
+        assert len(processor.clean_data()) == 1
+
+    def test_load_data_acepta_fechas_con_hora(self, tmp_path):
+        """Test que verifica que las fechas con hora u otro formato no se rechazan"""
+        csv_path = tmp_path / "ventas_con_hora.csv"
+        csv_path.write_text(
+            "fecha,producto,cantidad,precio_unitario\n"
+            "2024-01-05 10:30:00,ProductoA,1,100.0\n"
+            "2024-01-06,ProductoB,2,50.0\n"
+            "01/07/2024,ProductoC,3,10.0\n"
+            "invalid-date,ProductoD,4,10.0\n"
+        )
+        processor = DataProcessor()
+        df = processor.load_data(str(csv_path))
+        
+        assert df['fecha'].tolist()[:3] == [
+            pd.Timestamp('2024-01-05 10:30:00'),
+            pd.Timestamp('2024-01-06'),
+            pd.Timestamp('2024-01-07'),
+        ]
+        assert df['fecha'].isna().tolist() == [False, False, False, True]
+        
+        processor.clean_data()
+        assert processor.rejection_counts['fecha_invalida'] == 1
+
+class TestCleanCache:
+    
+    def _build_cache(self, csv_path, cache_path):
+        processor = DataProcessor()
+        processor.load_data(csv_path)
+        processor.clean_data()
+        processor.calculate_totals()
+        processor.save_cache(cache_path, csv_path)
+        return processor.get_clean_data()
+    
+    def test_load_cache_reutiliza_datos_limpios(self, sample_csv_file, tmp_path):
+        """Test que verifica que la caché devuelve el mismo DataFrame"""
+        cache_path = str(tmp_path / "ventas_clean.feather")
+        expected = self._build_cache(sample_csv_file, cache_path)
+        
+        result = DataProcessor().load_cache(cache_path, sample_csv_file)
+        
+        pd.testing.assert_frame_equal(result, expected.reset_index(drop=True))
+    
+    def test_load_cache_invalida_si_cambia_origen(self, sample_csv_file, tmp_path):
+        """Test que verifica que un CSV modificado invalida la caché"""
+        cache_path = str(tmp_path / "ventas_clean.feather")
+        self._build_cache(sample_csv_file, cache_path)
+        
+        with open(sample_csv_file, 'a') as f:
+            f.write("\n2024-03-01,ProductoA,1,100.0")
+        
+        assert DataProcessor().load_cache(cache_path, sample_csv_file) is None
+    
+    def test_load_cache_invalida_si_cambian_reglas_o_esquema(self, sample_csv_file, tmp_path):
+        """Test que verifica que la caché depende de las reglas y del esquema de lectura"""
+        from src.validation import RuleSet, NotNullRule
+        cache_path = str(tmp_path / "ventas_clean.feather")
+        self._build_cache(sample_csv_file, cache_path)
+        
+        otras_reglas = DataProcessor(reglas=RuleSet([NotNullRule()]))
+        assert otras_reglas.load_cache(cache_path, sample_csv_file) is None
+        assert DataProcessor().load_cache(cache_path, sample_csv_file, dtypes=None) is None
+        assert DataProcessor().load_cache(cache_path, sample_csv_file) is not None
+    
+    def test_load_cache_valida_la_cuarentena(self, sample_invalid_csv_file, tmp_path):
+        """Test que verifica que la caché solo se usa si la cuarentena de esa ejecución sigue intacta"""
+        cache_path = str(tmp_path / "ventas_clean.feather")
+        quarantine_path = str(tmp_path / "rechazadas.csv")
+        processor = DataProcessor(quarantine_path=quarantine_path)
+        processor.load_data(sample_invalid_csv_file)
+        processor.clean_data()
+        processor.calculate_totals()
+        processor.save_cache(cache_path, sample_invalid_csv_file)
+        
+        cached = DataProcessor(quarantine_path=quarantine_path)
+        assert cached.load_cache(cache_path, sample_invalid_csv_file) is not None
+        assert cached.rejection_counts == processor.rejection_counts
+        
+        assert DataProcessor().load_cache(cache_path, sample_invalid_csv_file) is None
+        os.remove(quarantine_path)
+        assert cached.load_cache(cache_path, sample_invalid_csv_file) is None
+    
+    def test_load_cache_sin_copia(self, sample_csv_file, tmp_path):
+        """Test que verifica que las columnas numéricas son vistas de solo lectura del mapeo"""
+        cache_path = str(tmp_path / "ventas_clean.feather")
+        self._build_cache(sample_csv_file, cache_path)
+        
+        result = DataProcessor().load_cache(cache_path, sample_csv_file)
+        
+        for columna in ('fecha', 'cantidad', 'precio_unitario', 'total'):
+            assert not result[columna].to_numpy().flags.writeable
+        assert isinstance(result['producto'].dtype, pd.CategoricalDtype)
+    
+    def test_load_cache_sin_archivo(self, sample_csv_file, tmp_path):
+        """Test que verifica el caso sin caché previa"""
+        cache_path = str(tmp_path / "no_existe.feather")
+        assert DataProcessor().load_cache(cache_path, sample_csv_file) is None
+
+class TestFusedCleaning:
+    
+    def test_clean_data_reporta_rechazos_por_regla(self, sample_invalid_csv_file):
+        """Test que verifica el conteo de filas descartadas por cada regla"""
+        processor = DataProcessor()
+        processor.load_data(sample_invalid_csv_file, dtypes=None, fecha_format=None)
+        result = processor.clean_data()
+        
+        assert result['producto'].tolist() == ['ProductoA']
+        assert pd.api.types.is_datetime64_any_dtype(result['fecha'])
+        assert processor.rejection_counts == {
+            'fecha_invalida': 1,
+            'valores_nulos': 1,
+            'cantidad_no_positiva': 1,
+            'precio_no_positivo': 1,
+            'producto_vacio': 0,
+        }
+    
+    def test_clean_data_descarta_productos_en_blanco(self):
+        """Test que verifica la regla de producto vacío"""
+        processor = DataProcessor()
+        processor.df = pd.DataFrame({
+            'fecha': ['2024-01-01', '2024-01-02'],
+            'producto': ['ProductoA', '   '],
+            'cantidad': [1, 2],
+            'precio_unitario': [10.0, 20.0]
+        })
+        result = processor.clean_data()
+        
+        assert len(result) == 1
+        assert processor.rejection_counts['producto_vacio'] == 1
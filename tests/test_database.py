@@ -0,0 +1,237 @@
+import pytest
+import sqlite3
+import threading
+import pandas as pd
+import sys
+import os
+
+# Agregar el directorio del proyecto al path para poder importar el paquete src
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.database import DatabaseManager, RESUMEN_TABLES, get_database
+
+class TestDatabaseManager:
+    
+    @pytest.fixture
+    def db(self, tmp_path):
+        """Fixture con una base de datos temporal"""
+        return DatabaseManager(str(tmp_path / "ventas.db"))
+    
+    def _count_ventas(self, db):
+        with db.get_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM ventas").fetchone()[0]
+    
+    def test_insert_incremental_es_idempotente(self, db, sample_data):
+        """Test que verifica que recargar el mismo delta no duplica filas"""
+        db.insert_ventas_data(sample_data)
+        
+        assert db.insert_ventas_data(sample_data, incremental=True) == 0
+        assert self._count_ventas(db) == 4
+    
+    def test_insert_incremental_agrega_solo_nuevas(self, db, sample_data):
+        """Test que verifica que solo se agregan filas con clave nueva"""
+        db.insert_ventas_data(sample_data.iloc[:2], incremental=True)
+        
+        inserted = db.insert_ventas_data(sample_data, incremental=True)
+        
+        assert inserted == 2
+        assert self._count_ventas(db) == 4
+        top = db.get_top_productos_query(1)
+        assert top['cantidad_total'].tolist() == [25]
+    
+    def test_bulk_insert_reconstruye_indices(self, db, sample_data):
+        """Test que verifica los índices y el formato de fecha tras la carga masiva"""
+        db.bulk_insert_ventas(sample_data, batch_size=3)
+        db.bulk_insert_ventas(sample_data, replace=True, batch_size=3)
+        
+        assert self._count_ventas(db) == 4
+        with db.get_connection() as conn:
+            indices = {row[1] for row in conn.execute("PRAGMA index_list(ventas)")}
+            fechas = [row[0] for row in conn.execute("SELECT fecha FROM ventas ORDER BY id")]
+        assert 'idx_ventas_clave' in indices
+        assert fechas[0] == '2024-01-01 00:00:00'
+    
+    def test_bulk_insert_guarda_fecha_nula_como_null(self, db, sample_data):
+        """Test que verifica que una fecha NaT se guarda como NULL y no como otra fecha"""
+        sample_data.loc[1, 'fecha'] = pd.NaT
+        
+        db.bulk_insert_ventas(sample_data, replace=True)
+        
+        with db.get_connection() as conn:
+            fechas = [row[0] for row in conn.execute("SELECT fecha FROM ventas ORDER BY id")]
+        assert fechas == ['2024-01-01 00:00:00', None, '2024-02-01 00:00:00', '2024-02-02 00:00:00']
+    
+    def test_bulk_append_pequeno_mantiene_indices(self, db, sample_data):
+        """Test que verifica que un agregado pequeño no reconstruye los índices"""
+        db.bulk_insert_ventas(pd.concat([sample_data] * 5, ignore_index=True), replace=True)
+        sentencias = []
+        db.get_connection().set_trace_callback(sentencias.append)
+        
+        db.bulk_insert_ventas(sample_data.iloc[:1])
+        db.get_connection().set_trace_callback(None)
+        
+        assert not any('DROP INDEX' in sql or 'CREATE INDEX' in sql for sql in sentencias)
+        assert self._count_ventas(db) == 21
+        
+        sentencias.clear()
+        db.get_connection().set_trace_callback(sentencias.append)
+        db.bulk_insert_ventas(sample_data, replace=True)
+        db.get_connection().set_trace_callback(None)
+        assert any('DROP INDEX' in sql for sql in sentencias)
+    
+    def test_migra_tabla_ventas_anterior(self, tmp_path, sample_data):
+        """Test que verifica la migración de una tabla ventas sin columnas generadas"""
+        db_path = str(tmp_path / "legacy.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('''
+                CREATE TABLE ventas (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    fecha DATE, producto TEXT, cantidad INTEGER,
+                    precio_unitario REAL, total REAL
+                )
+            ''')
+        
+        db = DatabaseManager(db_path)
+        db.insert_ventas_data(sample_data)
+        result = db.get_facturacion_mensual_query()
+        
+        assert result['mes'].tolist() == ['2024-01', '2024-02']
+        assert result['facturacion_total'].tolist() == [2000.0, 2700.0]
+    
+    def _query_plan(self, db, sql, params=()):
+        with db.get_connection() as conn:
+            return ' | '.join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+    
+    def test_plan_agregaciones_por_producto_usa_indice_de_cobertura(self, db, sample_data):
+        """Test que verifica que las agregaciones por producto no leen la tabla"""
+        db.insert_ventas_data(sample_data)
+        
+        for sql in (
+            "SELECT producto, SUM(cantidad) FROM ventas GROUP BY producto",
+            "SELECT producto, SUM(total), ROUND(AVG(precio_unitario), 2), COUNT(*) FROM ventas GROUP BY producto",
+        ):
+            assert 'USING COVERING INDEX idx_ventas_producto' in self._query_plan(db, sql)
+    
+    def test_plan_agregaciones_por_mes_y_dia_recorren_indice(self, db, sample_data):
+        """Test que verifica que agrupar por columnas generadas no ordena en un B-tree temporal"""
+        db.insert_ventas_data(sample_data)
+        
+        plan = self._query_plan(db, "SELECT mes, SUM(total), COUNT(*) FROM ventas GROUP BY mes ORDER BY mes")
+        assert 'USING INDEX idx_ventas_mes' in plan or 'USING COVERING INDEX idx_ventas_mes' in plan
+        assert 'TEMP B-TREE' not in plan
+        
+        plan = self._query_plan(db, "SELECT dia_semana, SUM(total) FROM ventas GROUP BY dia_semana")
+        assert 'idx_ventas_dia_semana' in plan
+        assert 'TEMP B-TREE FOR GROUP BY' not in plan
+    
+    def test_resumenes_coinciden_con_ventas(self, db, sample_data):
+        """Test que verifica que las tablas resumen igualan la agregación de ventas"""
+        db.insert_ventas_data(sample_data.iloc[:2])
+        db.append_ventas_data(sample_data.iloc[2:3])
+        db.insert_ventas_data(sample_data, incremental=True)
+        
+        with db.get_connection() as conn:
+            for table, keys in RESUMEN_TABLES.items():
+                key_list = ', '.join(keys)
+                resumen = conn.execute(f'''
+                    SELECT {key_list}, cantidad_total, facturacion_total, numero_ventas
+                    FROM {table} ORDER BY {key_list}
+                ''').fetchall()
+                esperado = conn.execute(f'''
+                    SELECT {key_list}, SUM(cantidad), SUM(total), COUNT(*)
+                    FROM ventas GROUP BY {key_list} ORDER BY {key_list}
+                ''').fetchall()
+                assert resumen == esperado, table
+        
+        assert db.get_top_productos_query(1)['cantidad_total'].tolist() == [25]
+        assert db.get_resumen_productos_query()['precio_promedio'].tolist() == [100.0, 150.0, 200.0]
+
+class TestConnectionReuse:
+    
+    def test_conexion_reutilizada_por_hilo(self, tmp_path):
+        """Test que verifica una conexión por hilo, en modo WAL"""
+        db = DatabaseManager(str(tmp_path / "ventas.db"))
+        conn = db.get_connection()
+        
+        otras = []
+        hilo = threading.Thread(target=lambda: otras.append(db.get_connection()))
+        hilo.start()
+        hilo.join()
+        
+        assert db.get_connection() is conn
+        assert otras[0] is not conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        db.close()
+    
+    def test_hilos_terminados_no_dejan_conexiones_abiertas(self, tmp_path):
+        """Test que verifica que la conexión de un hilo terminado se reutiliza y no se acumula"""
+        db = DatabaseManager(str(tmp_path / "ventas.db"))
+        usadas = []
+        
+        for _ in range(20):
+            hilo = threading.Thread(target=lambda: usadas.append(id(db.get_connection())))
+            hilo.start()
+            hilo.join()
+        
+        assert len(db._connections) == 2
+        assert len(set(usadas)) == 1
+        db.close()
+        assert db._connections == []
+    
+    def test_get_database_comparte_instancia(self, tmp_path):
+        """Test que verifica que la misma ruta devuelve el mismo DatabaseManager"""
+        db_path = str(tmp_path / "ventas.db")
+        
+        assert get_database(db_path) is get_database(db_path)
+
+class TestQueryCache:
+    
+    def test_version_cambia_con_cada_escritura(self, tmp_path, sample_data):
+        """Test que verifica que inserciones y borrados incrementan la versión"""
+        db = DatabaseManager(str(tmp_path / "ventas.db"))
+        versiones = [db.get_data_version()]
+        
+        db.insert_ventas_data(sample_data)
+        versiones.append(db.get_data_version())
+        db.append_ventas_data(sample_data.iloc[:1])
+        versiones.append(db.get_data_version())
+        db.clear_ventas()
+        versiones.append(db.get_data_version())
+        
+        assert versiones == sorted(set(versiones))
+    
+    def test_resultado_cacheado_hasta_nueva_escritura(self, tmp_path, sample_data, monkeypatch):
+        """Test que verifica que la consulta no se re-ejecuta si los datos no cambian"""
+        db = DatabaseManager(str(tmp_path / "ventas.db"))
+        db.insert_ventas_data(sample_data)
+        ejecuciones = []
+        original = pd.read_sql_query
+        monkeypatch.setattr(pd, 'read_sql_query', lambda *a, **k: ejecuciones.append(a[0]) or original(*a, **k))
+        
+        primero = db.get_top_productos_query(3)
+        primero.loc[0, 'cantidad_total'] = -1
+        segundo = db.get_top_productos_query(3)
+        
+        assert len(ejecuciones) == 1
+        assert segundo['cantidad_total'].tolist() == [25, 8, 5]
+        
+        db.append_ventas_data(sample_data.iloc[1:2])
+        
+        assert db.get_top_productos_query(3)['cantidad_total'].tolist() == [25, 10, 8]
+        assert len(ejecuciones) == 2
+    
+    def test_cache_persistida_entre_instancias(self, tmp_path, sample_data, monkeypatch):
+        """Test que verifica la caché en la tabla cache_consultas"""
+        path = str(tmp_path / "ventas.db")
+        db = DatabaseManager(path, persist_query_cache=True)
+        db.insert_ventas_data(sample_data)
+        esperado = db.run_query('facturacion_mensual')
+        db.close()
+        
+        monkeypatch.setattr(pd, 'read_sql_query', lambda *a, **k: pytest.fail("no debió consultar"))
+        otra = DatabaseManager(path, persist_query_cache=True)
+        
+        pd.testing.assert_frame_equal(otra.run_query('facturacion_mensual'), esperado)
+        otra.close()
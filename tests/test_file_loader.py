@@ -0,0 +1,203 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+import tracemalloc
+
+# Agregar el directorio del proyecto al path para poder importar el paquete src
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.gui.loader import FileLoader
+
+
+class TestFileLoader:
+    
+    @pytest.fixture
+    def ventas(self):
+        """Fixture con ventas de ejemplo"""
+        return pd.DataFrame({
+            'fecha': [f'2024-01-{dia:02d}' for dia in range(1, 29)] * 10,
+            'producto': ['ProductoA', 'ProductoB', 'ProductoC', 'ProductoD'] * 70,
+            'cantidad': range(280),
+            'precio_unitario': [10.5, 20.0, 7.25, 3.0] * 70,
+        })
+    
+    @pytest.fixture
+    def csv_path(self, tmp_path, ventas):
+        path = tmp_path / "ventas.csv"
+        ventas.to_csv(path, index=False)
+        return str(path)
+    
+    def cargar(self, path, **opciones):
+        """Ejecuta la carga en el thread actual y registra los callbacks"""
+        eventos = []
+        loader = FileLoader(
+            path,
+            on_preview=lambda df: eventos.append(('preview', df)),
+            on_progress=lambda leidos, total: eventos.append(('progress', (leidos, total))),
+            on_done=lambda df: eventos.append(('done', df)),
+            on_error=lambda e: eventos.append(('error', e)),
+            on_cancel=lambda: eventos.append(('cancel', None)),
+            **opciones
+        )
+        return loader, eventos
+    
+    def test_csv_completo_por_bloques(self, csv_path, ventas):
+        """La carga por bloques da el mismo DataFrame que read_csv"""
+        loader, eventos = self.cargar(csv_path, chunksize=64, preview_rows=10)
+        loader.run()
+        
+        tipos = [tipo for tipo, _ in eventos]
+        assert tipos[0] == 'preview'
+        assert tipos[-1] == 'done'
+        pd.testing.assert_frame_equal(eventos[-1][1], pd.read_csv(csv_path))
+        assert len(eventos[-1][1]) == len(ventas)
+    
+    def test_preview_con_el_primer_bloque(self, csv_path):
+        """La vista previa llega con las primeras preview_rows filas antes de cualquier avance"""
+        loader, eventos = self.cargar(csv_path, chunksize=64, preview_rows=10)
+        loader.run()
+        
+        preview = eventos[0][1]
+        assert len(preview) == 10
+        pd.testing.assert_frame_equal(preview, pd.read_csv(csv_path, nrows=10))
+    
+    def test_progreso_en_bytes(self, csv_path):
+        """El avance crece hasta el tamaño del archivo"""
+        loader, eventos = self.cargar(csv_path, chunksize=64, preview_rows=10)
+        loader.run()
+        
+        avance = [valor for tipo, valor in eventos if tipo == 'progress']
+        total = os.path.getsize(csv_path)
+        leidos = [l for l, _ in avance]
+        
+        assert all(t == total for _, t in avance)
+        assert leidos == sorted(leidos)
+        assert leidos[-1] == total
+    
+    def test_cancelar(self, csv_path):
+        """Cancelar tras la vista previa detiene la lectura sin entregar el resultado"""
+        loader, eventos = self.cargar(csv_path, chunksize=64, preview_rows=10)
+        loader.on_preview = lambda df: loader.cancel()
+        loader.run()
+        
+        tipos = [tipo for tipo, _ in eventos]
+        assert tipos[-1] == 'cancel'
+        assert 'done' not in tipos
+        assert loader.cancelled
+    
+    def test_excel(self, tmp_path, ventas):
+        """Los Excel se cargan enteros, con la vista previa leída por nrows"""
+        pytest.importorskip('openpyxl')
+        path = str(tmp_path / "ventas.xlsx")
+        ventas.to_excel(path, index=False)
+        
+        loader, eventos = self.cargar(path, preview_rows=5)
+        loader.run()
+        
+        assert len(eventos[0][1]) == 5
+        assert eventos[-1][0] == 'done'
+        assert len(eventos[-1][1]) == len(ventas)
+    
+    def test_error(self, tmp_path):
+        """Un archivo inexistente termina en on_error"""
+        loader, eventos = self.cargar(str(tmp_path / "no_existe.csv"))
+        loader.run()
+        
+        assert [tipo for tipo, _ in eventos] == ['error']
+    
+    def test_start_en_thread(self, csv_path):
+        """start() carga en un thread daemon"""
+        loader, eventos = self.cargar(csv_path)
+        loader.start()
+        loader.thread.join(timeout=10)
+        
+        assert loader.thread.daemon
+        assert eventos[-1][0] == 'done'
+    
+    def test_tipos_que_cambian_entre_bloques(self, tmp_path):
+        """Una columna que cambia de tipo en un bloque posterior queda como con pd.concat"""
+        path = str(tmp_path / "mixto.csv")
+        pd.DataFrame({
+            'cantidad': [1, 2, 3, 4, None, 6],
+            'codigo': [1, 2, 3, 4, 5, 'X7'],
+            'activo': [True, False, True, True, False, True],
+        }).to_csv(path, index=False, lineterminator='\n')
+        with open(path, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            f.truncate()  # sin salto de línea final
+        
+        loader, eventos = self.cargar(path, chunksize=2, preview_rows=2)
+        loader.run()
+        
+        esperado = pd.concat(pd.read_csv(path, chunksize=2), ignore_index=True)
+        pd.testing.assert_frame_equal(eventos[-1][1], esperado)
+        assert eventos[-1][1]['cantidad'].dtype == np.float64
+    
+    def test_mas_filas_que_las_estimadas(self, tmp_path, monkeypatch):
+        """Si la muestra subestima las filas (filas largas al comienzo) las columnas crecen"""
+        monkeypatch.setattr('src.gui.loader.MUESTRA_BYTES', 256)
+        path = str(tmp_path / "desparejo.csv")
+        pd.DataFrame({
+            'producto': ['Producto con un nombre muy largo ' * 4] * 3 + ['A'] * 500,
+            'cantidad': range(503),
+        }).to_csv(path, index=False)
+        
+        loader, eventos = self.cargar(path, chunksize=50, preview_rows=2)
+        assert loader._estimar_filas(os.path.getsize(path)) < 503
+        loader.run()
+        
+        pd.testing.assert_frame_equal(eventos[-1][1], pd.read_csv(path))
+    
+    def test_pico_de_memoria_sin_concat(self, tmp_path):
+        """Los bloques se copian al resultado: el pico no duplica el DataFrame final"""
+        filas = 400_000
+        path = str(tmp_path / "grande.csv")
+        rng = np.random.default_rng(0)
+        pd.DataFrame({
+            'cantidad': rng.integers(1, 10, filas),
+            'precio_unitario': rng.random(filas),
+            'total': rng.random(filas),
+            'id': np.arange(filas),
+        }).to_csv(path, index=False)
+        loader, eventos = self.cargar(path, chunksize=20_000)
+        
+        tracemalloc.start()
+        try:
+            loader.run()
+            pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        
+        df = eventos[-1][1]
+        assert len(df) == filas
+        assert pico < 1.5 * df.memory_usage(index=False).sum()
+    
+    def test_ventana_descarta_resultado_cancelado(self, csv_path):
+        """Si la carga se cancela con el resultado en camino, la ventana no lo usa"""
+        pytest.importorskip('tkinter')
+        from src.gui.main_window import MainWindow
+        
+        vistas = []
+        ventana = MainWindow.__new__(MainWindow)  # sin Tk: solo los handlers de carga
+        ventana.df = None
+        ventana.show_preview_view = lambda: vistas.append('preview')
+        ventana.show_upload_view = lambda: vistas.append('upload')
+        
+        loader, _ = self.cargar(csv_path)
+        ventana.file_loader = loader
+        loader.cancel()
+        ventana.on_load_done(loader, pd.read_csv(csv_path))
+        
+        assert ventana.df is None
+        assert ventana.file_loader is None
+        assert vistas == ['upload']
+        
+        # El resultado de una carga reemplazada tampoco se usa
+        anterior, _ = self.cargar(csv_path)
+        ventana.file_loader = loader
+        ventana.on_load_done(anterior, pd.read_csv(csv_path))
+        assert ventana.df is None and vistas == ['upload']
@@ -0,0 +1,186 @@
+import pytest
+import pandas as pd
+import sys
+import os
+
+# Agregar el directorio del proyecto al path para poder importar el paquete src
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.database import DatabaseManager
+from src.partitions import PartitionedVentasStore, VISTA_PARTICIONES
+
+class TestPartitionedVentasStore:
+    
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Fixture con un almacén particionado en una base temporal"""
+        db = DatabaseManager(str(tmp_path / "ventas.db"))
+        store = PartitionedVentasStore(db, archive_dir=str(tmp_path / "archivo"))
+        yield store
+        db.close()
+    
+    @pytest.fixture
+    def sample_data(self, ventas_aleatorias):
+        """Fixture con ventas de varios meses de dos años"""
+        return ventas_aleatorias(seed=5, filas=600, desde='2023-10-01', dias=180)
+    
+    def _tablas(self, store):
+        with store.db.get_connection() as conn:
+            return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    
+    def test_carga_reparte_por_mes(self, store, sample_data):
+        """Test que verifica una partición por mes y la vista de unión"""
+        store.load(sample_data)
+        
+        particiones = store.particiones()
+        
+        assert particiones['periodo'].tolist() == ['2023-10', '2023-11', '2023-12', '2024-01', '2024-02', '2024-03']
+        assert particiones['filas'].sum() == len(sample_data)
+        assert 'ventas_p2024_01' in self._tablas(store)
+        with store.db.get_connection() as conn:
+            assert conn.execute(f"SELECT COUNT(*) FROM {VISTA_PARTICIONES}").fetchone()[0] == len(sample_data)
+        
+        mensual = store.facturacion_mensual('2024-01', '2024-03')
+        esperado = sample_data.groupby(sample_data['fecha'].dt.strftime('%Y-%m'))['total'].sum()
+        assert mensual['mes'].tolist() == ['2024-01', '2024-02']
+        assert mensual['facturacion_total'].tolist() == pytest.approx(esperado[['2024-01', '2024-02']].tolist())
+    
+    def test_rango_y_recarga_de_un_mes(self, store, sample_data):
+        """Test que verifica las consultas por rango y la recarga de un solo mes"""
+        store.load(sample_data)
+        antes = store.particiones().set_index('periodo')
+        
+        rango = store.read_range('2023-11-15', '2024-01-10')
+        mascara = (sample_data['fecha'] >= '2023-11-15') & (sample_data['fecha'] < '2024-01-10')
+        assert len(rango) == mascara.sum()
+        assert rango['total'].sum() == pytest.approx(sample_data.loc[mascara, 'total'].sum())
+        
+        diciembre = sample_data[sample_data['fecha'].dt.strftime('%Y-%m') == '2023-12'].iloc[:5]
+        store.replace_month('2023-12', diciembre)
+        despues = store.particiones().set_index('periodo')
+        
+        assert despues.loc['2023-12', 'filas'] == 5
+        assert despues.drop(index='2023-12')['filas'].equals(antes.drop(index='2023-12')['filas'])
+        with pytest.raises(ValueError):
+            store.replace_month('2023-11', diciembre)
+    
+    def test_archivar_y_consultar_archivo(self, store, sample_data):
+        """Test que verifica que los meses archivados salen de la base principal y siguen consultables"""
+        store.load(sample_data)
+        resumen_antes = store.resumen_productos()
+        
+        archivados = store.archive('2024-01')
+        
+        assert archivados == ['2023-10', '2023-11', '2023-12']
+        assert 'ventas_p2023_10' not in self._tablas(store)
+        assert os.path.exists(os.path.join(store.archive_dir, 'ventas_2023.db'))
+        pd.testing.assert_frame_equal(store.resumen_productos(), resumen_antes)
+        assert len(store.read_range('2023-10-01', '2023-11-01')) == (sample_data['fecha'] < '2023-11-01').sum()
+        
+        assert store.drop_month('2023-10')
+        assert store.particiones()['periodo'].iloc[0] == '2023-11'
+    
+    def test_escrituras_incrementan_version_de_datos(self, store, sample_data):
+        """Test que verifica que cada escritura invalida la caché de consultas"""
+        versiones = [store.db.get_data_version()]
+        
+        store.load(sample_data)
+        versiones.append(store.db.get_data_version())
+        store.replace_month('2023-12', sample_data[sample_data['fecha'].dt.strftime('%Y-%m') == '2023-12'])
+        versiones.append(store.db.get_data_version())
+        store.archive('2023-11', vacuum=False)
+        versiones.append(store.db.get_data_version())
+        store.drop_month('2023-10')
+        versiones.append(store.db.get_data_version())
+        
+        assert versiones == sorted(set(versiones))
+    
+    def test_carga_de_la_base_actualiza_particiones(self, tmp_path, sample_data):
+        """Test que verifica insert_ventas_data(particionar=True) sobre una base nueva"""
+        db = DatabaseManager(str(tmp_path / "ventas.db"))
+        try:
+            db.insert_ventas_data(sample_data, particionar=True)
+            particiones = db.partitions.particiones().set_index('periodo')
+            esperado = sample_data.groupby(sample_data['fecha'].dt.strftime('%Y-%m'))['total'].sum()
+            
+            assert particiones['filas'].sum() == len(sample_data)
+            assert particiones['facturacion_total'].tolist() == pytest.approx(esperado.tolist())
+            
+            # Carga incremental: solo se reconstruyen los meses del delta
+            marzo = sample_data[sample_data['fecha'].dt.strftime('%Y-%m') == '2024-03'].copy()
+            marzo['cantidad'] += 100
+            db.insert_ventas_data(marzo, incremental=True, particionar=True)
+            assert db.partitions.particiones().set_index('periodo').loc['2024-03', 'filas'] == 2 * len(marzo)
+            
+            # Carga completa: los meses que ya no tienen ventas se eliminan
+            db.insert_ventas_data(marzo, particionar=True)
+            assert db.partitions.particiones()['periodo'].tolist() == ['2024-03']
+            assert len(db.partitions.read_range()) == len(marzo)
+        finally:
+            db.close()
+    
+    def _filas_por_mes(self, store):
+        with store.db.get_connection() as conn:
+            return dict(conn.execute("SELECT mes, COUNT(*) FROM ventas GROUP BY mes ORDER BY mes").fetchall())
+    
+    def test_escrituras_pasan_por_ventas(self, store, sample_data):
+        """Test que verifica que las particiones quedan iguales a ventas tras cada escritura"""
+        store.load(sample_data)
+        diciembre = sample_data[sample_data['fecha'].dt.strftime('%Y-%m') == '2023-12'].iloc[:5]
+        store.replace_month('2023-12', diciembre)
+        store.drop_month('2024-02')
+        
+        catalogo = store.particiones()
+        filas = self._filas_por_mes(store)
+        assert dict(zip(catalogo['periodo'], catalogo['filas'])) == filas
+        assert filas['2023-12'] == 5 and '2024-02' not in filas
+        
+        # Reconstruir desde ventas no cambia nada
+        store.sync_months(catalogo['periodo'])
+        pd.testing.assert_frame_equal(store.particiones(), catalogo)
+    
+    def test_carga_rechaza_meses_archivados(self, store, sample_data):
+        """Test que verifica que load no recrea en la base principal un mes archivado"""
+        store.load(sample_data)
+        store.archive('2024-01', vacuum=False)
+        antes = store.particiones()
+        filas_antes = self._filas_por_mes(store)
+        
+        noviembre = sample_data[sample_data['fecha'].dt.strftime('%Y-%m') == '2023-11']
+        with pytest.raises(ValueError, match='2023-11'):
+            store.load(noviembre)
+        
+        pd.testing.assert_frame_equal(store.particiones(), antes)
+        assert self._filas_por_mes(store) == filas_antes
+        assert 'ventas_p2023_11' not in self._tablas(store)
+    
+    def test_valores_conocidos(self, store):
+        """Test con valores calculados a mano: catálogo, rangos y resumen, antes y después de archivar"""
+        store.load(pd.DataFrame({
+            'fecha': pd.to_datetime(['2023-12-31', '2024-01-01', '2024-01-15', '2024-02-01']),
+            'producto': ['ProductoA', 'ProductoA', 'ProductoB', 'ProductoC'],
+            'cantidad': [1, 10, 5, 8],
+            'precio_unitario': [100.0, 100.0, 200.0, 150.0],
+            'total': [100.0, 1000.0, 1000.0, 1200.0]
+        }))
+        
+        catalogo = store.particiones()
+        assert catalogo['periodo'].tolist() == ['2023-12', '2024-01', '2024-02']
+        assert catalogo['filas'].tolist() == [1, 2, 1]
+        assert catalogo['facturacion_total'].tolist() == [100.0, 2000.0, 1200.0]
+        assert store.facturacion_mensual('2024-01', '2024-03')['facturacion_total'].tolist() == [2000.0, 1200.0]
+        assert store.read_range('2024-01-01', '2024-02-01')['producto'].tolist() == ['ProductoA', 'ProductoB']
+        
+        esperado = pd.DataFrame({
+            'producto': ['ProductoC', 'ProductoA', 'ProductoB'],
+            'cantidad_total': [8, 11, 5],
+            'facturacion_total': [1200.0, 1100.0, 1000.0],
+            'numero_ventas': [1, 2, 1]
+        })
+        pd.testing.assert_frame_equal(store.resumen_productos(), esperado)
+        
+        store.archive('2024-01', vacuum=False)
+        pd.testing.assert_frame_equal(store.resumen_productos(), esperado)
+        assert store.read_range('2023-12-01', '2024-01-01')['total'].tolist() == [100.0]
@@ -0,0 +1,90 @@
+import pytest
+import sys
+import os
+
+# Agregar el directorio del proyecto al path para poder importar el paquete src
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.database import DatabaseManager
+from src.queries import QueryRegistry, get_query_registry
+
+class TestQueryRegistry:
+    
+    @pytest.fixture
+    def db(self, tmp_path, sample_data):
+        """Fixture con una base temporal con ventas de dos meses"""
+        db = DatabaseManager(str(tmp_path / "ventas.db"))
+        db.insert_ventas_data(sample_data)
+        yield db
+        db.close()
+    
+    def test_carga_las_ocho_consultas(self):
+        """Test que verifica que se cargan todas las consultas con sus parámetros"""
+        registry = get_query_registry()
+        
+        assert len(registry.names()) == 8
+        assert registry is get_query_registry()
+        assert registry['top_productos_cantidad'].parametros == ('desde', 'hasta', 'limit')
+        assert registry['crecimiento_mensual'].descripcion == '7. Análisis de crecimiento mensual'
+    
+    def test_parametros_de_rango_y_limite(self, db):
+        """Test que verifica los filtros de fecha, producto y límite"""
+        top = db.run_query('top_productos_cantidad', limit=1)
+        febrero = db.run_query('top_productos_cantidad', desde='2024-02-01', hasta='2024-03-01')
+        mensual = db.run_query('facturacion_mensual', producto='ProductoA')
+        
+        assert top.to_dict('records') == [{'producto': 'ProductoA', 'cantidad_total': 25}]
+        assert febrero['producto'].tolist() == ['ProductoA', 'ProductoC']
+        assert mensual['facturacion_total'].tolist() == [1000.0, 1500.0]
+        with pytest.raises(ValueError):
+            db.run_query('resultados_guardados', producto='ProductoA')
+    
+    def test_ejecuta_todas_y_backend_arrow(self, db):
+        """Test que verifica la ejecución de todos los reportes y el backend pyarrow"""
+        reportes = db.run_all_queries(desde='2024-01-01', limit=2)
+        crecimiento = db.run_query('crecimiento_mensual', dtype_backend='pyarrow')
+        
+        assert set(reportes) == set(get_query_registry().names())
+        assert len(reportes['top_productos_facturacion']) == 2
+        assert str(crecimiento['facturacion_total'].dtype) == 'double[pyarrow]'
+        assert crecimiento['crecimiento_porcentual'].iloc[1] == 35.0
+    
+    def test_parse_ignora_parametros_en_literales(self):
+        """Test que verifica que ':' dentro de textos no se toma como parámetro"""
+        queries = QueryRegistry.parse(
+            "-- name: q\nSELECT strftime('%H:%M', fecha) FROM ventas WHERE producto = :producto;"
+        )
+        
+        assert queries['q'].parametros == ('producto',)
+        assert not queries['q'].sql.endswith(';')
+    
+    def _query_plan(self, db, name, **params):
+        query = get_query_registry()[name]
+        bound = query.bind(params)
+        with db.get_connection() as conn:
+            return ' | '.join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query.render(bound)}", bound))
+    
+    def test_render_quita_filtros_sin_valor(self):
+        """Test que verifica que solo quedan los filtros de los parámetros indicados"""
+        query = get_query_registry()['facturacion_mensual']
+        
+        sin_filtros = query.render(query.bind({}))
+        con_rango = query.render(query.bind({'desde': '2024-01-01', 'hasta': '2024-02-01'}))
+        
+        assert 'IS NULL' not in sin_filtros and ':desde' not in sin_filtros
+        assert 'fecha >= :desde' in con_rango and 'fecha < :hasta' in con_rango
+        assert ':producto' not in con_rango
+        assert query.render(query.bind({})) is sin_filtros
+    
+    def test_plan_usa_cobertura_sin_filtros_y_busca_por_rango(self, db):
+        """Test que verifica los planes: índice de cobertura sin filtros y búsqueda por rango de fecha"""
+        for name in ('top_productos_cantidad', 'top_productos_facturacion', 'resumen_productos'):
+            assert 'COVERING INDEX idx_ventas_producto' in self._query_plan(db, name)
+        
+        plan_producto = self._query_plan(db, 'resumen_productos', producto='ProductoA')
+        plan_rango = self._query_plan(db, 'top_productos_facturacion', desde='2024-01-01', hasta='2024-02-01')
+        
+        assert 'COVERING INDEX idx_ventas_producto (producto=?)' in plan_producto
+        assert 'SEARCH ventas USING INDEX idx_ventas_clave (fecha>? AND fecha<?)' in plan_rango
@@ -0,0 +1,73 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Agregar el directorio del proyecto al path para poder importar el paquete src
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.analyzer import SalesAnalyzer
+from src.database import DatabaseManager
+from src.sql_analyzer import SQLSalesAnalyzer
+
+class TestSQLSalesAnalyzer:
+    
+    @pytest.fixture
+    def db(self, tmp_path):
+        """Fixture con una base de datos temporal"""
+        return DatabaseManager(str(tmp_path / "ventas.db"))
+    
+    @pytest.fixture
+    def sample_data(self, ventas_aleatorias):
+        """Fixture con ventas aleatorias de varios meses"""
+        return ventas_aleatorias(
+            seed=7, filas=2000, dias=500, cantidad_max=20,
+            productos=('ProductoA', 'ProductoB', 'ProductoC', 'ProductoD', 'ProductoE')
+        )
+    
+    def test_coincide_con_analisis_en_pandas(self, db, sample_data):
+        """Test que verifica que el análisis en SQL coincide con SalesAnalyzer"""
+        db.insert_ventas_data(sample_data)
+        
+        esperado = SalesAnalyzer(sample_data).get_resumen_completo()
+        resultado = SQLSalesAnalyzer(db).get_resumen_completo()
+        
+        # Cota documentada en SQLSalesAnalyzer: n * eps relativo a la suma (totales positivos)
+        tolerancia = len(sample_data) * np.finfo(float).eps
+        
+        assert resultado['producto_mas_vendido'] == esperado['producto_mas_vendido']
+        assert resultado['top_3_cantidad'] == esperado['top_3_cantidad']
+        assert list(resultado['top_3_facturacion']) == list(esperado['top_3_facturacion'])
+        assert resultado['top_3_facturacion'] == pytest.approx(esperado['top_3_facturacion'], rel=tolerancia, abs=0)
+        assert resultado['producto_mayor_facturacion']['producto'] == esperado['producto_mayor_facturacion']['producto']
+        assert resultado['producto_mayor_facturacion']['facturacion_total'] == pytest.approx(
+            esperado['producto_mayor_facturacion']['facturacion_total'], rel=tolerancia, abs=0
+        )
+        assert list(resultado['facturacion_mensual']) == list(esperado['facturacion_mensual'])
+        assert resultado['facturacion_mensual'] == pytest.approx(esperado['facturacion_mensual'], rel=tolerancia, abs=0)
+    
+    def test_empates_por_nombre_de_producto(self, db):
+        """Test que verifica que los empates se resuelven como en pandas"""
+        df = pd.DataFrame({
+            'fecha': pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-03']),
+            'producto': ['ProductoC', 'ProductoA', 'ProductoB'],
+            'cantidad': [5, 5, 5],
+            'precio_unitario': [10.0, 10.0, 10.0],
+            'total': [50.0, 50.0, 50.0]
+        })
+        db.insert_ventas_data(df)
+        
+        analyzer = SQLSalesAnalyzer(db)
+        
+        assert analyzer.get_top_productos_cantidad(2) == SalesAnalyzer(df).get_top_productos_cantidad(2)
+        assert analyzer.producto_mayor_facturacion()['producto'] == 'ProductoA'
+    
+    def test_base_vacia(self, db):
+        """Test que verifica el error cuando no hay ventas cargadas"""
+        db.create_tables()
+        
+        with pytest.raises(ValueError):
+            SQLSalesAnalyzer(db).producto_mas_vendido()
@@ -0,0 +1,67 @@
+import pytest
+import json
+import subprocess
+import sys
+import os
+
+# Agregar el directorio del proyecto al path para poder importar el paquete src
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# Presupuesto de importación de la ventana principal (la medición local es ~40 ms)
+GUI_IMPORT_BUDGET_S = 0.5
+MODULOS_PESADOS = ('pandas', 'matplotlib', 'seaborn', 'openpyxl')
+
+
+def importar_en_subproceso(codigo):
+    """Ejecuta codigo en un intérprete limpio y retorna (segundos, módulos pesados cargados)"""
+    script = (
+        "import json, sys, time\n"
+        "inicio = time.perf_counter()\n"
+        f"{codigo}\n"
+        "segundos = time.perf_counter() - inicio\n"
+        f"print(json.dumps([segundos, [m for m in {MODULOS_PESADOS!r} if m in sys.modules]]))\n"
+    )
+    resultado = subprocess.run(
+        [sys.executable, '-c', script], cwd=project_root,
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+
+class TestStartupImports:
+    
+    def test_gui_no_importa_modulos_pesados(self):
+        """La ventana principal se importa sin pandas, matplotlib, seaborn ni openpyxl"""
+        pytest.importorskip('tkinter')
+        segundos, cargados = importar_en_subproceso("import src.gui.main_window")
+        
+        assert cargados == []
+        assert segundos < GUI_IMPORT_BUDGET_S
+    
+    def test_paquete_src_es_perezoso(self):
+        """import src no carga pandas, pero las clases siguen disponibles desde el paquete"""
+        _, cargados = importar_en_subproceso("import src")
+        assert cargados == []
+        
+        _, cargados = importar_en_subproceso(
+            "from src import DataProcessor, SalesAnalyzer, DatabaseManager"
+        )
+        assert 'pandas' in cargados
+        assert 'matplotlib' not in cargados
+    
+    def test_visualizer_difiere_matplotlib(self):
+        """Importar el visualizador no carga matplotlib ni seaborn hasta dibujar"""
+        _, cargados = importar_en_subproceso("import src.visualizer")
+        
+        assert 'matplotlib' not in cargados
+        assert 'seaborn' not in cargados
+    
+    def test_cli_no_importa_graficos_ni_excel(self):
+        """main.py solo carga lo necesario para el análisis"""
+        _, cargados = importar_en_subproceso("import main")
+        
+        assert 'matplotlib' not in cargados
+        assert 'seaborn' not in cargados
+        assert 'openpyxl' not in cargados
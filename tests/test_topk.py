@@ -0,0 +1,93 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Agregar el directorio del proyecto al path para poder importar el paquete src
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.analyzer import SalesAnalyzer
+from src.data_processor import DataProcessor
+from src.topk import ExactTopK, SpaceSavingTopK, CountMinTopK, top_productos_streaming
+
+class TestStreamingTopK:
+    
+    @pytest.fixture
+    def sample_data(self):
+        """Fixture con ventas de distribución sesgada (pocos productos muy vendidos)"""
+        rng = np.random.default_rng(3)
+        filas = 20000
+        df = pd.DataFrame({
+            'fecha': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 60, filas), unit='D'),
+            'producto': [f"SKU{i:05d}" for i in rng.zipf(1.5, filas) % 5000],
+            'cantidad': rng.integers(1, 10, filas),
+            'precio_unitario': rng.integers(100, 10000, filas) / 100
+        })
+        df['total'] = df['cantidad'] * df['precio_unitario']
+        return df
+    
+    def _chunks(self, df, size=3000):
+        return (df.iloc[i:i + size] for i in range(0, len(df), size))
+    
+    def test_exacto_coincide_con_pandas(self, sample_data):
+        """Test que verifica que el top-K exacto por bloques coincide con SalesAnalyzer"""
+        contador = top_productos_streaming(self._chunks(sample_data), medida='cantidad')
+        
+        assert contador.top(5) == SalesAnalyzer(sample_data).get_top_productos_cantidad(5)
+        assert contador.top_con_error(5)['error_maximo'].eq(0).all()
+    
+    def test_space_saving_respeta_cotas(self, sample_data):
+        """Test que verifica que los valores reales quedan dentro de [valor - error, valor]"""
+        contador = SpaceSavingTopK(capacidad=200, medida='total')
+        for chunk in self._chunks(sample_data):
+            contador.update(chunk)
+        
+        reales = sample_data.groupby('producto')['total'].sum()
+        resultado = contador.top_con_error(10)
+        
+        assert len(contador.contadores) <= 200
+        assert contador.error_maximo <= contador.peso_total / 200
+        for fila in resultado.itertuples():
+            assert fila.valor - fila.error_maximo - 1e-6 <= reales[fila.producto] <= fila.valor + 1e-6
+        assert list(resultado['producto'][:3]) == list(reales.nlargest(3).index)
+    
+    def test_space_saving_valores_conocidos(self):
+        """Test con valores calculados a mano: C reemplaza a B (3) y hereda su valor como error"""
+        contador = SpaceSavingTopK(capacidad=2, medida='cantidad')
+        contador.update(pd.DataFrame({'producto': ['A', 'B'], 'cantidad': [5, 3]}))
+        contador.update(pd.DataFrame({'producto': ['C'], 'cantidad': [1]}))
+        contador.update(pd.DataFrame({'producto': ['A'], 'cantidad': [2]}))
+        
+        resultado = contador.top_con_error(2)
+        
+        assert resultado.to_dict('list') == {'producto': ['A', 'C'], 'valor': [7, 4], 'error_maximo': [0, 3]}
+        assert contador.peso_total == 11
+    
+    def test_count_min_sobreestima_dentro_de_la_cota(self, sample_data):
+        """Test que verifica que Count-Min nunca subestima y encuentra los más vendidos"""
+        contador = CountMinTopK(k=20, ancho=2048, profundidad=4)
+        for chunk in self._chunks(sample_data):
+            contador.update(chunk)
+        
+        reales = sample_data.groupby('producto')['cantidad'].sum()
+        resultado = contador.top_con_error(5)
+        
+        for fila in resultado.itertuples():
+            assert reales[fila.producto] <= fila.valor <= reales[fila.producto] + fila.error_maximo
+        assert list(resultado['producto']) == list(reales.nlargest(5).index)
+    
+    def test_consumidor_de_process_in_chunks(self, sample_csv_file):
+        """Test que verifica el uso como consumidor de la lectura por bloques"""
+        contador = ExactTopK(medida='total')
+        DataProcessor().process_in_chunks(sample_csv_file, consumers=[contador.update], chunksize=2)
+        
+        processor = DataProcessor()
+        processor.load_data(sample_csv_file)
+        processor.clean_data()
+        processor.calculate_totals()
+        
+        assert contador.top(3) == SalesAnalyzer(processor.df).get_top_productos_facturacion(3)
+        assert contador.top(3) == {'ProductoB': 3400.0, 'ProductoA': 2500.0, 'ProductoC': 1200.0}
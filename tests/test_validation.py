@@ -0,0 +1,81 @@
+import pytest
+import pandas as pd
+import sys
+import os
+
+# Agregar el directorio del proyecto al path para poder importar el paquete src
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.data_processor import DataProcessor
+from src.validation import (
+    RuleSet, NotNullRule, RangeRule, AllowedValuesRule, DateWindowRule, DuplicateRule
+)
+
+class TestRuleSet:
+    
+    @pytest.fixture
+    def sample_data(self):
+        """Fixture con filas que incumplen distintas reglas"""
+        return pd.DataFrame({
+            'fecha': pd.to_datetime(['2024-01-01', '2023-12-31', '2024-01-02', '2024-01-02', '2024-01-03']),
+            'producto': ['ProductoA', 'ProductoA', 'ProductoX', 'ProductoB', 'ProductoB'],
+            'cantidad': [10, 5, 3, 500, 2],
+            'precio_unitario': [100.0, 100.0, 50.0, 200.0, 200.0]
+        })
+    
+    def test_evaluate_asigna_primer_motivo(self, sample_data):
+        """Test que verifica el motivo asignado a cada fila"""
+        reglas = RuleSet([
+            DateWindowRule('fecha', desde='2024-01-01'),
+            AllowedValuesRule('producto', ['ProductoA', 'ProductoB']),
+            RangeRule('cantidad', min_value=1, max_value=100),
+        ])
+        motivos, _ = reglas.evaluate(sample_data)
+        
+        assert reglas.reason_labels(motivos).tolist() == [
+            '', 'fecha_fuera_de_rango', 'producto_no_permitido', 'cantidad_fuera_de_rango', ''
+        ]
+        assert reglas.count_rejections(motivos) == {
+            'fecha_fuera_de_rango': 1,
+            'producto_no_permitido': 1,
+            'cantidad_fuera_de_rango': 1,
+        }
+    
+    def test_duplicate_rule_conserva_primera_aparicion(self, sample_data):
+        """Test que verifica la detección de duplicados por columnas clave"""
+        reglas = RuleSet([DuplicateRule(['fecha', 'producto'])])
+        motivos, _ = reglas.evaluate(sample_data)
+        
+        assert reglas.reason_labels(motivos).tolist() == ['', '', '', '', '']
+        
+        reglas = RuleSet([DuplicateRule(['producto'])])
+        motivos, _ = reglas.evaluate(sample_data)
+        
+        assert reglas.count_rejections(motivos) == {'fila_duplicada': 2}
+
+class TestQuarantine:
+    
+    def test_clean_data_escribe_cuarentena(self, sample_invalid_csv_file, tmp_path):
+        """Test que verifica el archivo de filas rechazadas con su motivo"""
+        quarantine_path = str(tmp_path / "rechazadas.csv")
+        processor = DataProcessor(quarantine_path=quarantine_path)
+        processor.load_data(sample_invalid_csv_file)
+        processor.clean_data()
+        
+        rechazadas = pd.read_csv(quarantine_path)
+        assert len(rechazadas) == 4
+        assert sorted(rechazadas['motivo']) == [
+            'cantidad_no_positiva', 'fecha_invalida', 'precio_no_positivo', 'valores_nulos'
+        ]
+    
+    def test_cuarentena_por_bloques(self, sample_invalid_csv_file, tmp_path):
+        """Test que verifica que la cuarentena acumula todos los bloques"""
+        quarantine_path = str(tmp_path / "rechazadas.csv")
+        processor = DataProcessor(quarantine_path=quarantine_path)
+        list(processor.iter_clean_chunks(sample_invalid_csv_file, chunksize=2))
+        
+        rechazadas = pd.read_csv(quarantine_path)
+        assert len(rechazadas) == 4
+        assert processor.rejection_counts['valores_nulos'] == 1
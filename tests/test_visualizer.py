@@ -0,0 +1,114 @@
+import pytest
+import pandas as pd
+import json
+import sys
+import os
+
+# Agregar el directorio del proyecto al path para poder importar el paquete src
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.analyzer import SalesAnalyzer
+from src.database import DatabaseManager
+from src.visualizer import SalesVisualizer
+
+class TestBatchRendering:
+    
+    @pytest.fixture
+    def visualizer(self, tmp_path, sample_data):
+        """Fixture con un visualizador sobre una base y carpeta temporales"""
+        db = DatabaseManager(str(tmp_path / "ventas.db"))
+        db.insert_ventas_data(sample_data)
+        visualizer = SalesVisualizer(db=db)
+        visualizer.output_dir = str(tmp_path / "graficos")
+        visualizer.ensure_directory()
+        yield visualizer
+        db.close()
+    
+    def test_render_batch_en_procesos(self, visualizer):
+        """Test que verifica que el lote se dibuja en paralelo y respeta el orden"""
+        specs = [
+            {'tipo': 'productos', 'archivo': f'producto_{i}.png', 'top_n': 2,
+             'datos': pd.DataFrame({'producto': [f'P{i}', 'Q'], 'cantidad_total': [i + 1, 1]}), 'dpi': 50}
+            for i in range(4)
+        ]
+        specs.append({'tipo': 'mensual', 'archivo': 'mensual.png', 'dpi': 50})
+        
+        paths = visualizer.render_batch(specs, n_jobs=2)
+        
+        assert [os.path.basename(p) for p in paths] == [f'producto_{i}.png' for i in range(4)] + ['mensual.png']
+        for path in paths:
+            with open(path, 'rb') as f:
+                assert f.read(8) == b'\x89PNG\r\n\x1a\n'
+    
+    def test_metodos_individuales_usan_la_misma_ruta(self, visualizer):
+        """Test que verifica los métodos existentes con el dibujo orientado a objetos"""
+        path_mensual = visualizer.generar_grafico_mensual('facturacion_mensual.png')
+        path_productos = visualizer.generar_grafico_productos(top_n=2)
+        
+        assert os.path.exists(path_mensual)
+        assert os.path.basename(path_productos) == 'top_productos.png'
+        with pytest.raises(ValueError):
+            visualizer.render_batch([{'tipo': 'torta'}], n_jobs=1)
+
+class TestChartCache:
+    
+    @pytest.fixture
+    def visualizer(self, tmp_path):
+        """Fixture con un visualizador sobre una base y carpeta temporales"""
+        db = DatabaseManager(str(tmp_path / "ventas.db"))
+        visualizer = SalesVisualizer(db=db)
+        visualizer.output_dir = str(tmp_path / "graficos")
+        visualizer.ensure_directory()
+        yield visualizer
+        db.close()
+    
+    def test_reutiliza_grafico_si_no_cambian_datos(self, visualizer, monkeypatch):
+        """Test que verifica que solo se redibujan los gráficos con huella nueva"""
+        dibujados = []
+        monkeypatch.setattr('src.visualizer.render_chart', lambda spec: dibujados.append(spec['path']) or open(spec['path'], 'wb').close())
+        datos = pd.DataFrame({'producto': ['A', 'B'], 'cantidad_total': [3, 1]})
+        spec = {'tipo': 'productos', 'archivo': 'top.png', 'datos': datos, 'top_n': 2}
+        
+        visualizer.render_batch([spec], n_jobs=1)
+        visualizer.render_batch([spec], n_jobs=1)
+        visualizer.render_batch([dict(spec, dpi=100)], n_jobs=1)
+        visualizer.render_batch([dict(spec, datos=datos.assign(cantidad_total=[4, 1]))], n_jobs=1)
+        visualizer.render_batch([spec], n_jobs=1, force=True)
+        
+        assert len(dibujados) == 4
+        with open(os.path.join(visualizer.output_dir, 'manifest.json')) as f:
+            assert list(json.load(f)) == [dibujados[0]]
+    
+    def test_regenera_si_falta_la_imagen(self, visualizer):
+        """Test que verifica que una imagen borrada se vuelve a generar"""
+        spec = {'tipo': 'mensual', 'archivo': 'mensual.png', 'dpi': 30,
+                'datos': pd.DataFrame({'mes': ['2024-01'], 'facturacion_total': [10.0]})}
+        path = visualizer.render_batch([spec], n_jobs=1)[0]
+        os.remove(path)
+        
+        visualizer.render_batch([spec], n_jobs=1)
+        
+        assert os.path.exists(path)
+
+class TestPrecomputedAggregates:
+    
+    def test_graficos_desde_resultados_del_analizador(self, tmp_path, sample_data, monkeypatch):
+        """Test que verifica que los agregados de SalesAnalyzer se grafican sin consultar la BD"""
+        analyzer = SalesAnalyzer(sample_data)
+        db = DatabaseManager(str(tmp_path / "ventas.db"))
+        visualizer = SalesVisualizer(db=db)
+        visualizer.output_dir = str(tmp_path / "graficos")
+        visualizer.ensure_directory()
+        monkeypatch.setattr(db, 'get_facturacion_mensual_query', lambda: pytest.fail("no debió consultar"))
+        monkeypatch.setattr(db, 'get_top_productos_query', lambda n: pytest.fail("no debió consultar"))
+        capturados = []
+        monkeypatch.setattr('src.visualizer.render_chart', lambda spec: capturados.append(spec) or spec['path'])
+        
+        visualizer.generar_grafico_mensual('mensual.png', datos=analyzer.facturacion_por_mes())
+        visualizer.generar_grafico_productos(top_n=1, datos=analyzer.get_top_productos_cantidad(3))
+        
+        assert capturados[0]['datos'].to_dict('list') == {'mes': ['2024-01', '2024-02'], 'facturacion_total': [2000.0, 2700.0]}
+        assert capturados[1]['datos'].to_dict('list') == {'producto': ['ProductoA'], 'cantidad_total': [25]}
+        db.close()